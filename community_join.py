@@ -0,0 +1,83 @@
+"""
+    Joining building energy data to community income data
+
+    Community names are spelled differently across the Chicago csvs ("WEST RIDGE" in the grocery store csv, "West Ridge"
+    in the census csv), so names are normalized before they are matched. Each distinct community name is looked up once,
+    giving an income for every community code, and the income of every building is then gathered from those codes in
+    one array operation.
+"""
+import numpy as np
+
+
+def normalize_community(community_name):
+    """
+    Takes a community name and returns it in a form that ignores case and extra whitespace
+    :param community_name: (str) a community name, such as "WEST RIDGE" or " West  Ridge"
+    :return: (str) the normalized community name, such as "west ridge"
+    """
+    return " ".join(community_name.split()).casefold()
+
+
+def community_incomes(community_names, income_dict):
+    """
+    Takes a list of community names and a dictionary of community incomes and returns the income of each name
+    :param community_names: (list) the community name that each community code stands for
+    :param income_dict: (dict) a dictionary mapping community name strings to ints representing the average income
+    of the community
+    :return: (tuple) an int64 array of the income of each community code and a boolean array that is True for the
+    codes whose community was found in income_dict
+    """
+    # the first spelling of a community in income_dict wins
+    normalized_incomes = {}
+    for community_name, income in income_dict.items():
+        normalized_incomes.setdefault(normalize_community(community_name), income)
+
+    incomes = np.zeros(len(community_names), dtype=np.int64)
+    matched = np.zeros(len(community_names), dtype=bool)
+    for community_code, community_name in enumerate(community_names):
+        normalized_name = normalize_community(community_name)
+        if normalized_name in normalized_incomes:
+            incomes[community_code] = normalized_incomes[normalized_name]
+            matched[community_code] = True
+    return incomes, matched
+
+
+def join_income_and_energy(income_dict, community_codes, community_names, energy_values):
+    """
+    Takes a dictionary of community incomes and the community code and energy use of every building, and returns the
+    community income and energy use of every building whose community has an income, as two aligned arrays
+    :param income_dict: (dict) a dictionary mapping community name strings to ints representing the average income
+    of the community
+    :param community_codes: (array) the int community code of each building
+    :param community_names: (list) the community name that each community code stands for
+    :param energy_values: (array) the annual energy usage (kw/person) of each building
+    :return: (tuple) an int64 array of average incomes, a float64 array of energy usages, and the int number of
+    buildings whose community had no income
+    """
+    incomes, matched = community_incomes(community_names, income_dict)
+    community_codes = np.asarray(community_codes, dtype=np.intp)
+
+    building_matched = matched[community_codes]
+    income_values = incomes[community_codes[building_matched]]
+    energy_values = np.asarray(energy_values, dtype=np.float64)[building_matched]
+    return income_values, energy_values, int(len(community_codes) - np.count_nonzero(building_matched))
+
+
+def join_income_and_energy_list(income_dict, energy_list):
+    """
+    Takes a dictionary of community incomes and a list of (community name, energy use) tuples and returns the
+    community income and energy use of every building whose community has an income, as two aligned arrays
+    :param income_dict: (dict) a dictionary mapping community name strings to ints representing the average income
+    of the community
+    :param energy_list: (list) a list of tuples with the data (community name, annual energy usage (kw/person) of a
+    residential building)
+    :return: (tuple) an int64 array of average incomes, a float64 array of energy usages, and the int number of
+    buildings whose community had no income
+    """
+    # give each distinct community name a code
+    codes_by_name = {}
+    community_codes = np.array([codes_by_name.setdefault(energy_tuple[0], len(codes_by_name))
+                                for energy_tuple in energy_list], dtype=np.intp)
+    energy_values = np.array([energy_tuple[1] for energy_tuple in energy_list], dtype=np.float64)
+
+    return join_income_and_energy(income_dict, community_codes, list(codes_by_name), energy_values)
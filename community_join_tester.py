@@ -0,0 +1,71 @@
+"""
+Tester code for community_join.py
+"""
+
+from community_join import *
+
+
+def test_normalize_community():
+    """
+    Runs a series of tests for normalize_community
+    :return: (bool) were all tests successful
+    """
+    assert normalize_community("WEST RIDGE") == normalize_community("West Ridge")
+    assert normalize_community(" West  Ridge\n") == "west ridge"
+
+    return True
+
+
+def test_join_income_and_energy():
+    """
+    Runs a series of tests for join_income_and_energy
+    :return: (bool) were all tests successful
+    """
+    income_dict = {"Rogers Park": 23939, "West Ridge": 23040}
+    community_names = ["WEST RIDGE", "Ashburn", "Rogers Park"]
+
+    income_values, energy_values, unmatched_count = join_income_and_energy(income_dict, np.array([0, 1, 2, 0]),
+                                                                          community_names,
+                                                                          np.array([1.5, 2.5, 3.5, 4.5]))
+
+    # check that names are matched regardless of case, and that unmatched buildings are counted and left out
+    assert income_values.tolist() == [23040, 23939, 23040]
+    assert energy_values.tolist() == [1.5, 3.5, 4.5]
+    assert unmatched_count == 1
+
+    # check the types of the joined values
+    assert type(income_values.tolist()[0]) == int
+    assert type(energy_values.tolist()[0]) == float
+
+    return True
+
+
+def test_join_income_and_energy_list():
+    """
+    Runs a series of tests for join_income_and_energy_list
+    :return: (bool) were all tests successful
+    """
+    income_values, energy_values, unmatched_count = join_income_and_energy_list({"Ashburn": 23482},
+                                                                               [("Ashburn", 732.7142857142857)])
+    assert income_values.tolist() == [23482]
+    assert energy_values.tolist() == [732.7142857142857]
+    assert unmatched_count == 0
+
+    # check that an empty list joins to empty arrays
+    income_values, energy_values, unmatched_count = join_income_and_energy_list({"Ashburn": 23482}, [])
+    assert len(income_values) == 0 and len(energy_values) == 0 and unmatched_count == 0
+
+    return True
+
+
+def main():
+    """
+    For testing purposes
+    """
+    print("test normalize_community ... " + "PASS" if test_normalize_community() else "FAIL")
+    print("test join_income_and_energy ... " + "PASS" if test_join_income_and_energy() else "FAIL")
+    print("test join_income_and_energy_list ... " + "PASS" if test_join_income_and_energy_list() else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Shared pytest fixtures for test_finalproject.py and test_income_and_energy.py, and the hand-written csv of the module
+testers
+
+Every csv is written and parsed once per test session: a few hand-written buildings and communities whose results are
+known exactly, a synthetic energy csv and socioeconomic csv (see energy_synthetic), and the real 2010 csvs when they
+are present. Tests of the real csvs are skipped without them.
+"""
+import os
+
+import pytest
+
+from energy_synthetic import ENERGY_COLUMN_TITLES, SOCIOECONOMIC_COLUMN_TITLES, write_energy_csv, \
+    write_socioeconomic_csv
+
+# the number of buildings in the synthetic energy csv
+SYNTHETIC_ROWS = 2000
+
+# the testers of the two scripts read csvs that aren't in the repository, and are ported to test_finalproject.py and
+# test_income_and_energy.py, so pytest collects the ports instead
+collect_ignore = ["finalproject_tester.py", "income_and_energy_tester.py"]
+
+REAL_ENERGY_FNAME = "energy-usage-2010.csv"
+REAL_INCOME_FNAME = "socioeconomic.csv"
+
+
+def energy_line(community, building_type, subtype, month_kwh, total_kwh, sq_ft, population, stories):
+    """
+    :return: (str) a line of an energy csv with the layout of the 2010 file, the unused columns left empty
+    """
+    cells = [""] * len(ENERGY_COLUMN_TITLES)
+    cells[0], cells[2], cells[3] = community, building_type, subtype
+    cells[4:16] = month_kwh
+    cells[16], cells[33], cells[63], cells[65] = total_kwh, sq_ft, population, stories
+    return ",".join(cells) + "\n"
+
+
+# Ashburn is the only residential building with a community, total KWH and population: 10258 KWH / 14 people. Uptown
+# has no population but is a multi-family building with a square footage, and the others are left out of everything
+SMALL_ENERGY_LINES = [energy_line("Ashburn", "Residential", "Multi 7+", ["100"] * 12, "10258", "5000", "14", "8"),
+                      energy_line("Uptown", "Residential", "Multi < 7", ["57"] * 12, "3000", "1000", "", "2"),
+                      energy_line("Rogers Park", "Commercial", "Commercial", [""] * 12, "5000", "2000", "10", "3"),
+                      energy_line("Hyde Park", "Residential", "Single Family", [""] * 12, "0", "800", "4", "1"),
+                      energy_line("", "Residential", "Multi 7+", ["31"] * 12, "700", "300", "7", "")]
+
+SMALL_INCOME = {"Rogers Park": 23939, "West Ridge": 23040, "Uptown": 35787, "Ashburn": 23482}
+
+
+def _write(fname, text):
+    """
+    :param fname: (str) name of the file to write
+    :param text: (str) the contents of the file
+    :return: (str) the name of the file
+    """
+    with open(fname, "w") as file_out:
+        file_out.write(text)
+    return str(fname)
+
+
+@pytest.fixture(scope="session")
+def data_dir(tmp_path_factory):
+    """
+    :return: (pathlib.Path) the directory the csvs of the session are written to
+    """
+    return tmp_path_factory.mktemp("csvs")
+
+
+def write_small_energy_csv(fname):
+    """
+    Writes the hand-written energy csv, for the module testers as well as the fixtures
+    :param fname: (str) name of the csv file to write
+    :return: (str) the name of the file
+    """
+    return _write(fname, ",".join(ENERGY_COLUMN_TITLES) + "\n" + "".join(SMALL_ENERGY_LINES))
+
+
+@pytest.fixture(scope="session")
+def small_energy_fname(data_dir):
+    """
+    :return: (str) name of the hand-written energy csv
+    """
+    return write_small_energy_csv(data_dir / "energy-small.csv")
+
+
+@pytest.fixture(scope="session")
+def small_income_fname(data_dir):
+    """
+    :return: (str) name of the hand-written socioeconomic csv
+    """
+    lines = [",".join(SOCIOECONOMIC_COLUMN_TITLES)]
+    for community_number, (community_name, income) in enumerate(SMALL_INCOME.items()):
+        lines.append(",".join([str(community_number + 1), community_name, "1.0", "2.0", "3.0", "4.0", "5.0",
+                               str(income), "50"]))
+    return _write(data_dir / "socioeconomic-small.csv", "\n".join(lines) + "\n")
+
+
+@pytest.fixture(scope="session")
+def synthetic_energy_fname(data_dir):
+    """
+    :return: (str) name of the synthetic energy csv
+    """
+    fname = str(data_dir / "energy-synthetic.csv")
+    write_energy_csv(fname, SYNTHETIC_ROWS)
+    return fname
+
+
+@pytest.fixture(scope="session")
+def synthetic_income_fname(data_dir):
+    """
+    :return: (str) name of the synthetic socioeconomic csv
+    """
+    fname = str(data_dir / "socioeconomic-synthetic.csv")
+    write_socioeconomic_csv(fname)
+    return fname
+
+
+@pytest.fixture(scope="session")
+def real_energy_fname():
+    """
+    :return: (str) name of the real 2010 energy csv, skipping the test when it isn't present
+    """
+    if not os.path.isfile(REAL_ENERGY_FNAME):
+        pytest.skip(REAL_ENERGY_FNAME + " is not present")
+    return REAL_ENERGY_FNAME
+
+
+@pytest.fixture(scope="session")
+def real_income_fname():
+    """
+    :return: (str) name of the real socioeconomic csv, skipping the test when it isn't present
+    """
+    if not os.path.isfile(REAL_INCOME_FNAME):
+        pytest.skip(REAL_INCOME_FNAME + " is not present")
+    return REAL_INCOME_FNAME
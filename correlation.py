@@ -0,0 +1,403 @@
+"""
+    Vectorized correlation of two aligned arrays
+
+    Pearson, Spearman (rank-based) and Kendall tau-b correlations computed with NumPy along the last axis, so that one
+    call can correlate a single pair of arrays or a whole matrix of bootstrap resamples at once. Bootstrap confidence
+    intervals draw every resample as one row of a (replicates x n) matrix of how many times each value was drawn, so
+    that the values are sorted and ranked once instead of once per resample.
+
+    A bootstrap of n values costs O(n) per resample for Pearson, O(n) after one sort for Spearman, and O(n log n) for
+    Kendall, whose discordant pairs are counted along merge orders that every resample of a chunk shares.
+"""
+import numpy as np
+
+# bootstrap resamples are drawn in chunks of at most this many resamples
+BOOTSTRAP_CHUNK = 256
+
+# and of at most this many values, so that the count matrix of a chunk stays a bounded size however many values there
+# are
+BOOTSTRAP_BATCH_VALUES = 1 << 22
+
+
+def rank_data(values):
+    """
+    Takes an array and returns the rank of every value along the last axis, with tied values given their average rank
+    :param values: (array) values to rank, of shape (n,) or (rows, n)
+    :return: (array) float64 ranks from 1 to n, the same shape as values
+    """
+    values = np.asarray(values)
+    n = values.shape[-1]
+    order = np.argsort(values, axis=-1, kind="mergesort")
+    sorted_values = np.take_along_axis(values, order, axis=-1)
+
+    # find where each run of tied values starts and ends in sorted order
+    positions = np.broadcast_to(np.arange(n), values.shape)
+    starts_run = np.ones(values.shape, dtype=bool)
+    starts_run[..., 1:] = sorted_values[..., 1:] != sorted_values[..., :-1]
+    ends_run = np.ones(values.shape, dtype=bool)
+    ends_run[..., :-1] = starts_run[..., 1:]
+    run_start = np.maximum.accumulate(np.where(starts_run, positions, 0), axis=-1)
+    run_end = np.flip(np.minimum.accumulate(np.flip(np.where(ends_run, positions, n - 1), axis=-1), axis=-1), axis=-1)
+
+    # every value of a run gets the average of the run's ranks
+    ranks = np.empty(values.shape, dtype=np.float64)
+    np.put_along_axis(ranks, order, (run_start + run_end) / 2 + 1, axis=-1)
+    return ranks
+
+
+def pearson(x, y):
+    """
+    Takes two aligned arrays and returns their Pearson correlation along the last axis
+    :param x: (array) values of shape (n,) or (rows, n)
+    :param y: (array) values of the same shape as x
+    :return: (float or array) the correlation, one per row for 2-D input
+    """
+    x_deviations = np.asarray(x, dtype=np.float64)
+    x_deviations = x_deviations - x_deviations.mean(axis=-1, keepdims=True)
+    y_deviations = np.asarray(y, dtype=np.float64)
+    y_deviations = y_deviations - y_deviations.mean(axis=-1, keepdims=True)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        correlation = (x_deviations * y_deviations).sum(axis=-1) / np.sqrt(
+            (x_deviations ** 2).sum(axis=-1) * (y_deviations ** 2).sum(axis=-1))
+    return np.clip(correlation, -1.0, 1.0)
+
+
+def spearman(x, y):
+    """
+    Takes two aligned arrays and returns their Spearman rank correlation along the last axis
+    :param x: (array) values of shape (n,) or (rows, n)
+    :param y: (array) values of the same shape as x
+    :return: (float or array) the correlation, one per row for 2-D input
+    """
+    return pearson(rank_data(x), rank_data(y))
+
+
+def _tied_pairs(sorted_values):
+    """
+    Takes an array sorted along its last axis and returns the number of pairs of equal values in each row
+    :param sorted_values: (array) values of shape (rows, n), sorted along the last axis
+    :return: (array) the int64 number of tied pairs of each row
+    """
+    rows, n = sorted_values.shape
+    starts_run = np.ones((rows, n), dtype=bool)
+    starts_run[:, 1:] = sorted_values[:, 1:] != sorted_values[:, :-1]
+
+    # give every run of ties a number that is unique across rows, then count the values in each run
+    run_ids = np.cumsum(starts_run.ravel()) - 1
+    run_lengths = np.bincount(run_ids).astype(np.int64)
+    run_rows = np.repeat(np.arange(rows), n)[starts_run.ravel()]
+    return np.bincount(run_rows, weights=run_lengths * (run_lengths - 1) // 2, minlength=rows).astype(np.int64)
+
+
+def _count_inversions(values):
+    """
+    Takes non-negative integer values and returns the number of pairs in each row that are out of order, by merging
+    sorted blocks of doubling width with every row and block handled at once
+    :param values: (array) int64 values of shape (rows, n)
+    :return: (array) the int64 number of pairs i < j with values[i] > values[j] in each row
+    """
+    rows, n = values.shape
+    width = 1
+    while width < n:
+        width *= 2
+
+    # pad with values larger than any other, which add no inversions since they sit at the end
+    padding = int(values.max()) + 1 if values.size else 0
+    blocks = np.full((rows, width), padding, dtype=np.int64)
+    blocks[:, :n] = values
+    inversions = np.zeros(rows, dtype=np.int64)
+
+    block_width = 1
+    while block_width < width:
+        pairs = blocks.reshape(rows, -1, 2, block_width)
+        left, right = pairs[:, :, 0, :], pairs[:, :, 1, :]
+
+        # shift every left/right block pair into its own value range so that one searchsorted covers all of them
+        offsets = np.arange(rows * pairs.shape[1], dtype=np.int64).reshape(rows, -1, 1) * (padding + 1)
+        greater_in_left = block_width - (np.searchsorted((left + offsets).ravel(), (right + offsets).ravel(),
+                                                         side="right") - np.repeat(
+            np.arange(rows * pairs.shape[1]) * block_width, block_width))
+        inversions += greater_in_left.reshape(rows, -1).sum(axis=1)
+
+        block_width *= 2
+        blocks = np.sort(blocks.reshape(rows, -1, block_width), axis=-1).reshape(rows, width)
+
+    return inversions
+
+
+def _kendall_from_counts(total_pairs, x_ties, y_ties, joint_ties, discordant):
+    """
+    Takes the pair counts of aligned arrays and returns their Kendall tau-b correlation
+    :param total_pairs: (int) the number of pairs of values
+    :param x_ties: (array) the number of pairs tied in x, one per row
+    :param y_ties: (array) the number of pairs tied in y, one per row
+    :param joint_ties: (array) the number of pairs tied in both x and y, one per row
+    :param discordant: (array) the number of discordant pairs, one per row
+    :return: (array) the correlation of every row
+    """
+    concordant_minus_discordant = total_pairs - x_ties - y_ties + joint_ties - 2 * discordant
+    with np.errstate(invalid="ignore", divide="ignore"):
+        tau = concordant_minus_discordant / np.sqrt((total_pairs - x_ties).astype(np.float64)
+                                                    * (total_pairs - y_ties))
+    return np.clip(tau, -1.0, 1.0)
+
+
+def kendall_tau(x, y):
+    """
+    Takes two aligned arrays and returns their Kendall tau-b correlation along the last axis, counting discordant
+    pairs by merging instead of comparing every pair
+    :param x: (array) values of shape (n,) or (rows, n)
+    :param y: (array) values of the same shape as x
+    :return: (float or array) the correlation, one per row for 2-D input
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    one_row = x.ndim == 1
+    x = np.atleast_2d(x)
+    y = np.atleast_2d(y)
+    rows, n = x.shape
+
+    # replace y by dense integer ranks so that it can be merged with integer offsets
+    y_ranks = np.unique(y, return_inverse=True)[1].reshape(rows, n).astype(np.int64)
+
+    # sort by x, then by y within ties of x
+    order = np.lexsort((y_ranks, x), axis=-1)
+    x_sorted = np.take_along_axis(x, order, axis=-1)
+    y_sorted = np.take_along_axis(y_ranks, order, axis=-1)
+
+    # pairs tied in x, in y, and in both
+    x_ties = _tied_pairs(x_sorted)
+    y_ties = _tied_pairs(np.sort(y_ranks, axis=-1))
+    both_same = np.ones((rows, n), dtype=bool)
+    both_same[:, 1:] = (x_sorted[:, 1:] != x_sorted[:, :-1]) | (y_sorted[:, 1:] != y_sorted[:, :-1])
+    joint_ties = _tied_pairs(np.cumsum(both_same, axis=-1))
+
+    # once sorted by x, every pair that is out of order in y is discordant
+    tau = _kendall_from_counts(n * (n - 1) // 2, x_ties, y_ties, joint_ties, _count_inversions(y_sorted))
+    return tau[0] if one_row else tau
+
+
+# *** Bootstrap resamples *** #
+
+
+def _weighted_inversions(values, weights):
+    """
+    Takes integer values and a batch of weights of them and returns the weighted number of pairs that are out of
+    order, the same as counting the inversions of every row of the values each repeated by its weight. The values are
+    merge sorted once, and every level of the merge adds up, for each value of a right block, the weight of the
+    greater values of its left block, for every row at once
+    :param values: (array) int64 values of shape (n,)
+    :param weights: (array) the int weight of every value in every row, of shape (rows, n)
+    :return: (array) the int64 sum of weights[i] * weights[j] over the pairs i < j with values[i] > values[j], one per
+    row
+    """
+    rows, n = weights.shape
+    width = 1
+    while width < n:
+        width *= 2
+
+    # pad with values larger than any other and no weight, which add no inversions
+    keys = np.full(width, int(values.max()) + 1 if n else 0, dtype=np.int64)
+    keys[:n] = values
+
+    # one line per value and one column per row, so that reordering the values moves whole lines. A row's weights add
+    # up to the size of a resample, which fits in 32 bits
+    merged = np.zeros((width, rows), dtype=np.int32)
+    merged[:n] = weights.T
+    inversions = np.zeros(rows, dtype=np.int64)
+
+    block_width = 1
+    while block_width < width:
+        block_count = width // (2 * block_width)
+        order = np.argsort(keys.reshape(block_count, 2 * block_width), axis=-1, kind="stable")
+        from_left = (order < block_width).reshape(-1, 1)
+        order = (order + np.arange(0, width, 2 * block_width).reshape(-1, 1)).ravel()
+        keys = keys[order]
+        merged = merged[order]
+
+        # ties keep the left value first, so the left weight after a right value is the weight of greater values
+        left_before = np.cumsum(np.where(from_left, merged, 0).reshape(block_count, 2 * block_width, rows), axis=1,
+                                dtype=np.int32)
+        left_after = (left_before[:, -1:] - left_before).reshape(width, rows)
+        inversions += np.einsum("ij,ij->j", np.where(from_left, 0, merged), left_after, dtype=np.int64)
+
+        block_width *= 2
+
+    return inversions
+
+
+def _resample_counts(random, n, rows):
+    """
+    Draws bootstrap resamples of n values and returns how many times each value was drawn in each resample
+    :param random: (numpy.random.Generator) the random generator the resamples are drawn from
+    :param n: (int) the number of values
+    :param rows: (int) the number of resamples
+    :return: (array) the int64 count of every value in every resample, of shape (rows, n)
+    """
+    indices = random.integers(0, n, size=(rows, n))
+    offsets = np.arange(rows, dtype=np.int64).reshape(-1, 1) * n
+    return np.bincount((indices + offsets).ravel(), minlength=rows * n).reshape(rows, n)
+
+
+def _run_starts(sorted_values):
+    """
+    :param sorted_values: (array) sorted values of shape (n,)
+    :return: (array) the positions where each run of equal values starts
+    """
+    starts_run = np.ones(len(sorted_values), dtype=bool)
+    starts_run[1:] = sorted_values[1:] != sorted_values[:-1]
+    return np.flatnonzero(starts_run)
+
+
+def _weighted_pearson(x, y, counts):
+    """
+    Takes two aligned arrays and the counts of a batch of resamples and returns the Pearson correlation of every
+    resample, without building the resamples
+    :param x: (array) values of shape (n,) or (rows, n)
+    :param y: (array) values of the same shape as x
+    :param counts: (array) the count of every value in every resample, of shape (rows, n)
+    :return: (array) the correlation of every resample
+    """
+    counts = counts.astype(np.float64)
+    total = counts.sum(axis=-1)
+
+    def weighted_mean(values):
+        weighted_sum = counts @ values if values.ndim == 1 else np.einsum("ij,ij->i", counts, values)
+        return (weighted_sum / total).reshape(-1, 1)
+
+    # the deviations from the mean of every resample, so that a resample of equal values has no variance at all
+    x_deviations = x - weighted_mean(x)
+    y_deviations = y - weighted_mean(y)
+    covariance = np.einsum("ij,ij,ij->i", counts, x_deviations, y_deviations)
+    x_variance = np.einsum("ij,ij,ij->i", counts, x_deviations, x_deviations)
+    y_variance = np.einsum("ij,ij,ij->i", counts, y_deviations, y_deviations)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        correlation = covariance / np.sqrt(x_variance * y_variance)
+    return np.clip(correlation, -1.0, 1.0)
+
+
+def _resample_ranks(values, counts):
+    """
+    Takes an array and the counts of a batch of resamples and returns the rank every value would have in each
+    resample, with tied values given their average rank, from one sort of the values
+    :param values: (array) values of shape (n,)
+    :param counts: (array) the count of every value in every resample, of shape (rows, n)
+    :return: (array) float64 ranks of shape (rows, n)
+    """
+    order = np.argsort(values, kind="mergesort")
+    run_starts = _run_starts(values[order])
+    starts_run = np.zeros(len(values), dtype=np.intp)
+    starts_run[run_starts] = 1
+    run_of_value = np.empty(len(values), dtype=np.intp)
+    run_of_value[order] = np.cumsum(starts_run) - 1
+
+    # every run of tied values follows the values drawn from the runs before it
+    run_totals = np.add.reduceat(counts[:, order], run_starts, axis=1)
+    run_ranks = np.cumsum(run_totals, axis=1) - run_totals + (run_totals + 1) / 2
+    return run_ranks[:, run_of_value]
+
+
+def _tied_pairs_in_runs(sorted_counts, run_starts):
+    """
+    :param sorted_counts: (array) the counts of the values of a batch of resamples, in sorted order of the values
+    :param run_starts: (array) the positions where each run of equal values starts, see _run_starts
+    :return: (array) the int64 number of tied pairs in each resample
+    """
+    run_totals = np.add.reduceat(sorted_counts, run_starts, axis=1)
+    return (run_totals * (run_totals - 1) // 2).sum(axis=1)
+
+
+def _resampled_kendall(x, y, counts):
+    """
+    Takes two aligned arrays and the counts of a batch of resamples and returns the Kendall tau-b correlation of
+    every resample. The values are sorted by x and then y once, so that each resample in that order is every value
+    repeated by its count, and its discordant pairs are the inversions of the y ranks weighted by the counts
+    :param x: (array) values of shape (n,)
+    :param y: (array) values of shape (n,)
+    :param counts: (array) the count of every value in every resample, of shape (rows, n)
+    :return: (array) the correlation of every resample
+    """
+    n = counts.shape[1]
+    y_ranks = np.unique(y, return_inverse=True)[1].reshape(-1).astype(np.int64)
+    order = np.lexsort((y_ranks, x))
+    sorted_counts = counts[:, order]
+
+    # pairs tied in x, in y, and in both
+    x_ties = _tied_pairs_in_runs(sorted_counts, _run_starts(x[order]))
+    y_order = np.argsort(y_ranks, kind="mergesort")
+    y_ties = _tied_pairs_in_runs(counts[:, y_order], _run_starts(y_ranks[y_order]))
+    both_same = np.ones(n, dtype=bool)
+    both_same[1:] = (x[order][1:] != x[order][:-1]) | (y_ranks[order][1:] != y_ranks[order][:-1])
+    joint_ties = _tied_pairs_in_runs(sorted_counts, np.flatnonzero(both_same))
+
+    return _kendall_from_counts(n * (n - 1) // 2, x_ties, y_ties, joint_ties,
+                                _weighted_inversions(y_ranks[order], sorted_counts))
+
+
+def resampled_correlations(x, y, method, counts):
+    """
+    Takes two aligned arrays and the counts of a batch of bootstrap resamples and returns the correlation of every
+    resample, the same as correlating the resampled arrays. The values are ranked once rather than once per resample
+    :param x: (array) values of shape (n,)
+    :param y: (array) values of shape (n,)
+    :param method: (str) "pearson", "spearman" or "kendall"
+    :param counts: (array) the count of every value in every resample, of shape (rows, n)
+    :return: (array) the correlation of every resample
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if method == "pearson":
+        return _weighted_pearson(x, y, counts)
+    if method == "spearman":
+        return _weighted_pearson(_resample_ranks(x, counts), _resample_ranks(y, counts), counts)
+    if method == "kendall":
+        return _resampled_kendall(x, y, counts)
+    raise ValueError("unknown correlation: " + str(method))
+
+
+# the correlations that can be computed, by name
+CORRELATIONS = {"pearson": pearson, "spearman": spearman, "kendall": kendall_tau}
+
+
+def correlation_matrix(x, y, method="spearman"):
+    """
+    Takes two aligned arrays and returns their 2 x 2 correlation matrix, in the layout of numpy.corrcoef
+    :param x: (array) values of shape (n,)
+    :param y: (array) values of shape (n,)
+    :param method: (str) "pearson", "spearman" or "kendall"
+    :return: (array) the matrix [[1, r], [r, 1]]
+    """
+    correlation = float(CORRELATIONS[method](x, y))
+    return np.array([[1.0, correlation], [correlation, 1.0]])
+
+
+def bootstrap_ci(x, y, method="spearman", replicates=10000, confidence=0.95, seed=None):
+    """
+    Takes two aligned arrays and returns a bootstrap confidence interval of their correlation. Every resample is drawn
+    as the count of each value in it, and correlated from values that were ranked once, see resampled_correlations
+    :param x: (array) values of shape (n,)
+    :param y: (array) values of shape (n,)
+    :param method: (str) "pearson", "spearman" or "kendall"
+    :param replicates: (int) the number of bootstrap resamples
+    :param confidence: (float) the confidence level of the interval
+    :param seed: (int) seed of the random resampling, for reproducible intervals
+    :return: (tuple) the (low, high) bounds of the interval
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(x)
+    random = np.random.default_rng(seed)
+
+    # draw the resamples in chunks of rows, each row the counts of the building indices in a resample
+    rows_per_batch = max(1, min(BOOTSTRAP_CHUNK, BOOTSTRAP_BATCH_VALUES // max(1, n)))
+    estimates = []
+    for first_replicate in range(0, replicates, rows_per_batch):
+        counts = _resample_counts(random, n, min(rows_per_batch, replicates - first_replicate))
+        estimates.append(np.atleast_1d(resampled_correlations(x, y, method, counts)))
+    estimates = np.concatenate(estimates)
+
+    tail = (1 - confidence) / 2
+    low, high = np.nanquantile(estimates, [tail, 1 - tail])
+    return float(low), float(high)
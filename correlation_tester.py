@@ -0,0 +1,138 @@
+"""
+Tester code for correlation.py
+"""
+
+from correlation import *
+
+
+def test_rank_data():
+    """
+    Runs a series of tests for rank_data
+    :return: (bool) were all tests successful
+    """
+    assert rank_data([30, 10, 20]).tolist() == [3.0, 1.0, 2.0]
+
+    # check that tied values share their average rank
+    assert rank_data([5, 1, 5, 5]).tolist() == [3.0, 1.0, 3.0, 3.0]
+
+    # check that each row of a matrix is ranked on its own
+    assert rank_data([[1, 2], [2, 1]]).tolist() == [[1.0, 2.0], [2.0, 1.0]]
+
+    return True
+
+
+def test_pearson_and_spearman():
+    """
+    Runs a series of tests for pearson and spearman
+    :return: (bool) were all tests successful
+    """
+    assert round(float(pearson([1, 2, 3], [2, 4, 6])), 10) == 1.0
+    assert round(float(pearson([1, 2, 3], [3, 2, 1])), 10) == -1.0
+
+    # a monotonic but not linear relationship is a perfect rank correlation only
+    assert round(float(spearman([1, 2, 3, 4], [1, 10, 100, 1000])), 10) == 1.0
+    assert float(pearson([1, 2, 3, 4], [1, 10, 100, 1000])) < 1.0
+
+    # ties: ranks of x are [1.5, 1.5, 3], so the correlation is that of [1.5, 1.5, 3] and [1, 2, 3]
+    assert round(float(spearman([1, 1, 2], [1, 2, 3])), 10) == round(float(pearson([1.5, 1.5, 3], [1, 2, 3])), 10)
+
+    return True
+
+
+def test_kendall_tau():
+    """
+    Runs a series of tests for kendall_tau
+    :return: (bool) were all tests successful
+    """
+    assert round(float(kendall_tau([1, 2, 3], [1, 2, 3])), 10) == 1.0
+    assert round(float(kendall_tau([1, 2, 3], [3, 2, 1])), 10) == -1.0
+
+    # 5 concordant and 1 discordant pair out of 6
+    assert round(float(kendall_tau([1, 2, 3, 4], [1, 3, 2, 4])), 10) == round(4 / 6, 10)
+
+    # ties in x: 2 concordant pairs, 1 pair tied in x, tau-b = 2 / sqrt(2 * 3)
+    assert round(float(kendall_tau([1, 1, 2], [1, 2, 3])), 10) == round(2 / 6 ** 0.5, 10)
+
+    # check that each row of a matrix is correlated on its own
+    assert [round(tau, 10) for tau in kendall_tau([[1, 2, 3], [1, 2, 3]], [[1, 2, 3], [3, 2, 1]]).tolist()] == [
+        1.0, -1.0]
+
+    return True
+
+
+def test_correlation_matrix():
+    """
+    Runs a series of tests for correlation_matrix
+    :return: (bool) were all tests successful
+    """
+    assert correlation_matrix([1, 3, 5], [2, 4, 6]).tolist() == [[1.0, 1.0], [1.0, 1.0]]
+    assert correlation_matrix([1, 3, 5], [6, 4, 2], "kendall").tolist() == [[1.0, -1.0], [-1.0, 1.0]]
+
+    return True
+
+
+def test_resampled_correlations():
+    """
+    Runs a series of tests for resampled_correlations
+    :return: (bool) were all tests successful
+    """
+    random = np.random.default_rng(0)
+    x = random.integers(0, 5, 30).astype(np.float64)
+    y = random.integers(0, 8, 30) * 1.5
+    indices = random.integers(0, 30, size=(40, 30))
+    counts = np.stack([np.bincount(row, minlength=30) for row in indices])
+
+    # check that the counts give the same correlations as the resamples they count, ties included
+    for method in ["pearson", "spearman", "kendall"]:
+        assert np.allclose(resampled_correlations(x, y, method, counts), CORRELATIONS[method](x[indices], y[indices]),
+                           equal_nan=True)
+
+    # a resample of one value repeated has no correlation
+    assert np.isnan(resampled_correlations(x, y, "spearman", np.eye(30, dtype=np.int64)[:1] * 30)).all()
+
+    return True
+
+
+def test_bootstrap_ci():
+    """
+    Runs a series of tests for bootstrap_ci
+    :return: (bool) were all tests successful
+    """
+    x = np.arange(50, dtype=np.float64)
+    y = x + np.random.default_rng(0).normal(0, 10, 50)
+
+    # check that the interval surrounds the correlation of the full data
+    for method in ["pearson", "spearman", "kendall"]:
+        low, high = bootstrap_ci(x, y, method, replicates=500, seed=1)
+        assert low <= float(CORRELATIONS[method](x, y)) <= high
+
+    # check that a seed makes the interval reproducible, however many chunks the resamples are drawn in
+    assert bootstrap_ci(x, y, replicates=200, seed=3) == bootstrap_ci(x, y, replicates=200, seed=3)
+    chunked = [bootstrap_ci(x, y, method, replicates=2 * BOOTSTRAP_CHUNK + 1, seed=3) for method in CORRELATIONS]
+    whole = []
+    for method in CORRELATIONS:
+        counts = np.random.default_rng(3).integers(0, 50, size=(2 * BOOTSTRAP_CHUNK + 1, 50))
+        estimates = resampled_correlations(x, y, method, np.stack([np.bincount(row, minlength=50) for row in counts]))
+        whole.append(tuple(np.nanquantile(estimates, [0.025, 0.975]).tolist()))
+    assert np.allclose(chunked, whole)
+
+    # a perfect correlation stays perfect in every resample
+    assert bootstrap_ci(x, 2 * x, "spearman", replicates=100, seed=0) == (1.0, 1.0)
+
+    return True
+
+
+def main():
+    """
+    For testing purposes
+    """
+    print("test rank_data ... " + "PASS" if test_rank_data() else "FAIL")
+    print("test pearson and spearman ... " + "PASS" if test_pearson_and_spearman() else "FAIL")
+    print("test kendall_tau ... " + "PASS" if test_kendall_tau() else "FAIL")
+    print("test correlation_matrix ... " + "PASS" if test_correlation_matrix() else "FAIL")
+    print("test resampled_correlations ... " + "PASS" if test_resampled_correlations() else "FAIL")
+    print("test bootstrap_ci ... " + "PASS" if test_bootstrap_ci() else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+    Tokenizing csv text and finding columns by their titles
+
+    Data values in the Chicago csvs can be quoted and contain commas, like the LOCATION column of the grocery store csv
+    or a community name such as "Lake View, East". Splitting such a line on every comma shifts every later data value
+    into the wrong column. The functions here split text with the csv module whenever it contains a quote, keep the
+    plain str.split path for text that doesn't, and find the columns an analysis uses by their titles instead of by
+    fixed positions.
+"""
+import csv
+from operator import itemgetter
+
+
+def split_csv_text(text):
+    """
+    Takes the text of some lines of a csv file and returns the data values of each line
+    :param text: (str) lines of a csv file, separated by "\n"
+    :return: (list) a list of lists of the data values of each line that is not blank
+    """
+    lines = [line for line in text.split("\n") if line != ""]
+
+    # without a quote anywhere every comma separates data values, so the plain split is correct and fastest
+    if '"' not in text:
+        return [line.split(",") for line in lines]
+
+    # otherwise let the csv module handle the quoted data values
+    return list(csv.reader(lines))
+
+
+def normalize_title(title):
+    """
+    Takes a column title and returns it in a form that ignores case, underscores and extra spaces
+    :param title: (str) a column title
+    :return: (str) the normalized column title
+    """
+    return " ".join(title.replace("_", " ").split()).upper()
+
+
+def find_column(column_titles, titles=(), prefixes=(), default=None):
+    """
+    Takes the column titles of a csv file and returns the position of the first column with one of the titles, or
+    whose title starts with one of the prefixes
+    :param column_titles: (list) the column titles of the file
+    :param titles: (list) titles the column may have
+    :param prefixes: (list) prefixes the title of the column may start with
+    :param default: (int) the position to use when no column matches
+    :return: (int) the position of the column
+    """
+    normalized_titles = [normalize_title(column_title) for column_title in column_titles]
+
+    for title in titles:
+        if normalize_title(title) in normalized_titles:
+            return normalized_titles.index(normalize_title(title))
+
+    for prefix in prefixes:
+        for position, normalized_title in enumerate(normalized_titles):
+            if normalized_title.startswith(normalize_title(prefix)):
+                return position
+
+    if default is None:
+        raise ValueError("no column titled " + ", ".join(list(titles) + list(prefixes)))
+    return default
+
+
+def column_picker(column_titles, wanted_columns):
+    """
+    Takes the column titles of a csv file and the columns an analysis uses and returns a function that pulls those
+    columns out of the data values of a line
+    :param column_titles: (list) the column titles of the file
+    :param wanted_columns: (list) a list of (titles, prefixes, default position) for each used column, see find_column
+    :return: (function) a function that takes the data values of a line and returns a tuple of the used data values
+    """
+    positions = []
+    for titles, prefixes, default in wanted_columns:
+        positions.append(find_column(column_titles, titles, prefixes, default))
+
+    # itemgetter of a single position returns the data value itself rather than a tuple
+    if len(positions) == 1:
+        return lambda data_lst: (data_lst[positions[0]],)
+    return itemgetter(*positions)
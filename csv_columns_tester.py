@@ -0,0 +1,73 @@
+"""
+Tester code for csv_columns.py
+"""
+
+from csv_columns import *
+
+
+def test_split_csv_text():
+    """
+    Runs a series of tests for split_csv_text
+    :return: (bool) were all tests successful
+    """
+    # check that lines without quotes are split on every comma and blank lines are skipped
+    assert split_csv_text("a,b,c\n1,,3\n") == [["a", "b", "c"], ["1", "", "3"]]
+
+    # check that quoted data values keep their commas
+    assert split_csv_text('"Lake View, East",1,2\nUptown,3,4') == [["Lake View, East", "1", "2"], ["Uptown", "3", "4"]]
+
+    # check that the grocery store csv keeps its LOCATION column together
+    file_in = open("grocery_stores_2013.csv", "r")
+    lines = split_csv_text(file_in.read())
+    file_in.close()
+    for data_lst in lines:
+        assert len(data_lst) == len(lines[0])
+
+    return True
+
+
+def test_find_column():
+    """
+    Runs a series of tests for find_column
+    :return: (bool) were all tests successful
+    """
+    column_titles = ["COMMUNITY AREA NAME", "BUILDING_SUBTYPE", "KWH JANUARY 2011", "PER CAPITA INCOME "]
+
+    # check that titles are matched regardless of case, underscores and extra spaces
+    assert find_column(column_titles, ["Building Subtype"]) == 1
+    assert find_column(column_titles, ["PER CAPITA INCOME"]) == 3
+
+    # check that prefixes match the column of any year
+    assert find_column(column_titles, prefixes=["KWH JANUARY"]) == 2
+
+    # check that the default is used when no column matches
+    assert find_column(column_titles, ["TOTAL KWH"], default=16) == 16
+
+    return True
+
+
+def test_column_picker():
+    """
+    Runs a series of tests for column_picker
+    :return: (bool) were all tests successful
+    """
+    pick_columns = column_picker(["A", "B", "C"], [(["C"], [], 0), (["A"], [], 1)])
+    assert pick_columns(["1", "2", "3"]) == ("3", "1")
+
+    # check that a single column is still returned as a tuple
+    assert column_picker(["A", "B"], [(["B"], [], 0)])(["1", "2"]) == ("2",)
+
+    return True
+
+
+def main():
+    """
+    For testing purposes
+    """
+    print("test split_csv_text ... " + "PASS" if test_split_csv_text() else "FAIL")
+    print("test find_column ... " + "PASS" if test_find_column() else "FAIL")
+    print("test column_picker ... " + "PASS" if test_column_picker() else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
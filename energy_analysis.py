@@ -0,0 +1,746 @@
+"""
+    The analysis of the Chicago energy usage and socioeconomic csvs shared by finalproject.py and
+    income_and_energy_usage.py, which are command line entry points over it.
+
+    Question 1 asks whether more energy is used in the winter or summer, question 2 whether people in higher earning
+    communities use more energy at home, and question 3 whether low-rise apartment buildings are more energy
+    efficient than high-rise apartment buildings. Each question is answered from one EnergyDataset, so that the energy
+    csv is only parsed once however many questions are asked. The questions don't depend on each other, so they can
+    also be answered at the same time.
+"""
+import glob
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from community_join import join_income_and_energy_list
+from correlation import CORRELATIONS, bootstrap_ci, correlation_matrix
+from csv_columns import column_picker, split_csv_text
+from energy_columns import MONTH_INDICES, MONTH_NAMES, MULTI_FAMILY_SUBTYPES
+from energy_cache import load_community_month_profiles_cached
+from energy_dataset import EnergyDataset
+from energy_db import open_current, query_energy_data, query_energy_for_apartments, query_income_data
+from energy_groups import group_codes, split_by_group
+from energy_incremental import incremental_month_kwh_averages
+from energy_memo import query_memo
+from energy_periods import COOLING_MONTHS, HEATING_MONTHS
+from energy_years import analyze_years, write_year_tables, year_of
+from quantile_sketch import as_sketch
+from stage_timing import StageRecorder
+from visualizations import (draw_average_energy, draw_average_energy_by_year, draw_high_and_low_rise,
+                            draw_income_and_energy, render_figures)
+
+# the energy usage and socioeconomic csvs analyzed when no others are given
+ENERGY_FNAME = "energy-usage-2010.csv"
+INCOME_FNAME = "socioeconomic.csv"
+
+# *** QUESTION 1: Is more energy used in the winter or summer? *** #
+
+
+def parse_month_kwh_data(fname, incremental=False):
+    """
+    Takes a csv file of Chicago KWH energy data and, in a single pass over the file, averages the KWH data of every
+    month column at the same time. The results are remembered in energy_memo.query_memo so that asking for another
+    month of the same unchanged file does not read it again
+    :param fname: (str) name of a csv file containing KWH energy usage
+    :param incremental: (bool) True for a file that is only ever appended to, so that only the lines appended since
+    the last call are read, see energy_incremental
+    :return: (dict) a dictionary of {int(month column index): int(average KWH used in Chicago during that month)}
+    """
+    # the month counts of an append-only file are kept as running state next to it
+    if incremental:
+        return incremental_month_kwh_averages(fname)
+
+    # average every month column of the file with vector operations, unless the unchanged file already was
+    month_averages = query_memo.get(fname, tuple(MONTH_INDICES), "month_averages",
+                                    lambda: EnergyDataset(fname).month_averages())
+
+    # Return the average kwh usage of every month
+    return dict(month_averages)
+
+
+def average_month_kwh_data(fname, list_index_of_month, incremental=False):
+    """
+    Takes a csv file of Chicago KWH energy data for the index of the month specified a returns the average KWH usage
+    for that month
+    :param fname: (str) name of a csv file containing KWH energy usage
+    :param list_index_of_month: (int) index of the month column that data is wanted for
+    :param incremental: (bool) True for a file that is only ever appended to, see parse_month_kwh_data
+    :return: (int) the average KWH used in Chicago during the month specified
+    """
+    if incremental:
+        return parse_month_kwh_data(fname, incremental)[list_index_of_month]
+
+    # Return the average kwh useage
+    return query_memo.get(fname, list_index_of_month, "month_average",
+                          lambda: parse_month_kwh_data(fname)[list_index_of_month])
+
+
+def average_energy_list(fname=ENERGY_FNAME):
+    """
+    This function creates a list of the average energy for each month of the year from the Chicago data set.
+    :param fname: (str) name of a csv file containing KWH energy usage
+    :return: (lst) a list of average energies
+    """
+    def month_list():
+        # every month is averaged in the same pass over the file
+        month_averages = parse_month_kwh_data(fname)
+
+        # create energy list
+        energy_list = []
+        for i in MONTH_INDICES:
+            energy_list.append(month_averages[i])
+        return energy_list
+
+    # a copy, so that the remembered list can't be changed by the caller
+    return list(query_memo.get(fname, tuple(MONTH_INDICES), "month_list", month_list))
+
+
+def community_month_profiles(fname=ENERGY_FNAME):
+    """
+    This function creates the monthly load profile of every community area of the Chicago data set: the total and mean
+    KWH energy usage of its buildings in each month. The profiles are saved in the binary cache of the file
+    :param fname: (str) name of a csv file containing KWH energy usage
+    :return: (dict) arrays with one row per community, in order of name:
+        "names": (list) the name of the community of every row
+        "total": (array) the total KWH used in each month, as an array of shape (communities, 12)
+        "count": (array) the number of buildings with a value in each month, as an array of shape (communities, 12)
+        "mean": (array) the mean KWH of a building in each month, as an array of shape (communities, 12)
+    """
+    return load_community_month_profiles_cached(fname)
+
+
+def scatter_plot(format, energy_list=None, show=False):
+    """
+    This function plots the data from average_energy_list relative to the corresponding month of the year and writes
+    the plot to visualization1.png
+    :param format: (str) specifies the color and format of the data
+    :param energy_list: (list) the average energy for each month, or None to get it from average_energy_list
+    :param show: (bool) True to also display the plot in a window
+    :return: (none)
+    """
+    # get energy list
+    if energy_list is None:
+        energy_list = average_energy_list()
+
+    # plot the data on a figure of its own
+    render_figures([(draw_average_energy, (energy_list, format), "visualization1.png")], show)
+
+
+def scatter_plot_years(fnames, year_tables=None, show=False):
+    """
+    This function plots the mean energy of a building in each month of several yearly csvs on one plot, with a line
+    for every year, and writes the plot to visualization4.png
+    :param fnames: (list) names of csv files containing KWH energy usage, with a different year in each name
+    :param year_tables: (dict) the tables of the years, see energy_years.merge_year_summaries, or None to get them
+    from energy_years.analyze_years
+    :param show: (bool) True to also display the plot in a window
+    :return: (none)
+    """
+    # get the year by month matrix, parsing the years in worker processes
+    if year_tables is None:
+        year_tables = analyze_years(fnames)
+
+    # plot every year on the same figure
+    render_figures([(draw_average_energy_by_year, (year_tables["years"], year_tables["month_matrix"]),
+                     "visualization4.png")], show)
+
+
+def average_season_kwh_data(month_1_index, month_2_index, month_3_index, fname=ENERGY_FNAME):
+    """
+    This function takes three parameters, each an index of the month that data is wanted for, and returns the average
+    KWH energy usage over those three months
+    :param month_1_index: (int) index of the first month that data is wanted for
+    :param month_2_index: (int) index of the second month that data is wanted for
+    :param month_3_index: (int) index of the third month that data is wanted for
+    :param fname: (str) name of a csv file containing KWH energy usage
+    :return: (int) the average KWH usage over the three months inputted
+    """
+    def season_average():
+        # Gather data for every month in one pass over the file
+        month_averages = parse_month_kwh_data(fname)
+        average_data_month_1 = month_averages[month_1_index]
+        average_data_month_2 = month_averages[month_2_index]
+        average_data_month_3 = month_averages[month_3_index]
+
+        # Average data
+        return int((average_data_month_1 + average_data_month_2 + average_data_month_3)/3)
+
+    # Return total_average, remembered for the same three months of the same unchanged file
+    total_average = query_memo.get(fname, (month_1_index, month_2_index, month_3_index), "season_average",
+                                   season_average)
+    return total_average
+
+
+def period_index(fname=ENERGY_FNAME, group_column=None):
+    """
+    Returns the prefix sums of the month totals of a csv file of Chicago KWH energy data, remembered in
+    energy_memo.query_memo so that every period query of the same unchanged file is answered without reading it
+    :param fname: (str) name of a csv file containing KWH energy usage
+    :param group_column: (str) "community", "building_type" or "building_subtype", or None for citywide
+    :return: (PeriodIndex) the period index of every group of the column, see energy_periods
+    """
+    return query_memo.get(fname, tuple(MONTH_INDICES), ("period_index", group_column),
+                          lambda: EnergyDataset(fname).period_index(group_column))
+
+
+def average_period_kwh_data(month_indices, fname=ENERGY_FNAME):
+    """
+    This function takes any set of months, such as a season that wraps from December into February, and returns the
+    mean KWH energy usage of a building over one of those months
+    :param month_indices: (list) indices of the months that data is wanted for
+    :param fname: (str) name of a csv file containing KWH energy usage
+    :return: (float) the mean monthly KWH usage of a building over the months inputted
+    """
+    return float(period_index(fname).month_set_totals(month_indices)["mean"][0])
+
+
+def heating_and_cooling_by_community(fname=ENERGY_FNAME, heating_months=HEATING_MONTHS,
+                                     cooling_months=COOLING_MONTHS):
+    """
+    This function compares the mean monthly KWH energy usage of a building in the heating and cooling seasons in every
+    community
+    :param fname: (str) name of a csv file containing KWH energy usage
+    :param heating_months: (list) indices of the months of the heating season
+    :param cooling_months: (list) indices of the months of the cooling season
+    :return: (dict) a dictionary of {str(community name): (float(heating season mean), float(cooling season mean))}
+    """
+    return period_index(fname, "community").compare_periods(heating_months, cooling_months)
+
+
+# *** QUESTION 2: Do people in higher earning communities use more energy at home? *** #
+
+
+# the columns of the socioeconomic csv used, as (titles, title prefixes, default position)
+INCOME_COLUMNS = [(["COMMUNITY AREA NAME"], [], 1), (["PER CAPITA INCOME"], [], 7)]
+
+
+def parse_income_data(fname, db_fname=None):
+    """
+    Takes a csv file of Chicago census data and returns a dictionary of {str(community name): int(average income)}
+    :param fname: (str) name of a csv file containing Chicago socioeconomic census data
+    :param db_fname: (str) name of a SQLite database made by energy_db.py, or None to always read the csv
+    :return: (dict) a dictionary of ints that represent the average income of a community
+    """
+    # pull the rows from the database instead when it holds a current copy of the file
+    connection = open_current(db_fname, fname)
+    if connection is not None:
+        income_dict = query_income_data(connection, fname, INCOME_COLUMNS)
+        connection.close()
+        return income_dict
+
+    # open the file
+    file_in = open(fname, "r")
+
+    # create an empty dictionary to put the community names and income data into
+    income_dict = {}
+
+    # turn the file into a list of data values for each line, keeping quoted data values together
+    lines = split_csv_text(file_in.read().replace("\r\n", "\n"))
+
+    # close the file
+    file_in.close()
+
+    # find the community name and income columns from the first line of the file, which only includes the column titles
+    pick_columns = column_picker(lines[0], INCOME_COLUMNS)
+
+    # for the rest of the lines in the file:
+    for data_lst in lines[1:]:
+
+        # create a dictionary entry for the community name and its income
+        community_name, income = pick_columns(data_lst)
+        income_dict[community_name] = int(income)
+
+    # return the dictionary of community names and incomes
+    return income_dict
+
+
+def parse_energy_data(fname, db_fname=None):
+    """
+    Takes a csv file of Chicago building energy data and returns a dictionary of {community name: annual individual
+    energy usage (kw/person)}
+    :param fname: (str) name of a csv file containing Chicago building energy data
+    :param db_fname: (str) name of a SQLite database made by energy_db.py, or None to always read the csv
+    :return: (list) a list of tuples with the data (community name, average individual energy use (kw/person) in the
+    residential building)
+    """
+    # pull the rows from the database instead when it holds a current copy of the file
+    connection = open_current(db_fname, fname)
+    if connection is not None:
+        energy_list = query_energy_data(connection, fname)
+        connection.close()
+        return energy_list
+
+    # return the list of tuples
+    return EnergyDataset(fname).residential_energy_list()
+
+
+def income_and_energy_correlate_data(income_dict, energy_list):
+    """
+    Takes an income_dict and an energy_dict and returns a list of data containing average income and average annual
+    kw/person energy use
+    :param income_dict: (dict) a dictionary mapping community name strings to ints representing the average income of
+    the community
+    :param energy_list: (list) a list of lists with the data [community name: annual energy usage (kw/person) of a
+    residential building]
+    :return: (list) a list where each item represents a [average income, annual energy usage (kw/person) of a
+    residential building] pair
+    """
+    # join each building to its community's income, matching community names regardless of case and whitespace. The
+    # buildings left out are counted and reported by answer_income_question
+    income_values, energy_values = join_income_and_energy_list(income_dict, energy_list)[:2]
+
+    # create a list of [average income, building energy] pairs
+    correlate_data_lst = []
+    for avg_income, building_energy in zip(income_values.tolist(), energy_values.tolist()):
+        correlate_data_lst.append([avg_income, building_energy])
+
+    # return the list of lists
+    return correlate_data_lst
+
+
+def spearman_income_and_energy(correlated_data):
+    """
+    Takes two list of related data and returns a Spearman correlation
+    :param correlated_data: (list) list of lists of [average income, annual energy usage (kw/person) of a residential
+    building], or an array of shape (buildings, 2) of the same pairs
+    :return: (array) the 2 x 2 Spearman correlation matrix of average income and annual energy usage
+    """
+    # split the pairs into an array of incomes and an array of energy usages
+    data_array = np.asarray(correlated_data, dtype=np.float64).reshape(-1, 2)
+    income_values = data_array[:, 0]
+    energy_values = data_array[:, 1]
+
+    # calculate the Spearman correlation for average community income and personal energy use, correlating the ranks
+    # of the values rather than the values themselves
+    spearman_corr = correlation_matrix(income_values, energy_values, "spearman")
+
+    # return the Spearman correlation
+    return (spearman_corr)
+
+
+def income_and_energy_correlation_lines(income_values, energy_values, replicates=1000):
+    """
+    Describes the Pearson, Spearman and Kendall correlations of average community income and personal energy use,
+    each with a bootstrap confidence interval
+    :param income_values: (array) the average community income of each residential building
+    :param energy_values: (array) the annual energy usage (kw/person) of each residential building
+    :param replicates: (int) the number of bootstrap resamples behind each confidence interval, or 0 for the
+    correlations without intervals
+    :return: (list) a line describing each correlation
+    """
+    lines = []
+    for method in ["pearson", "spearman", "kendall"]:
+        correlation = CORRELATIONS[method](income_values, energy_values)
+        line = method.capitalize() + " correlation: " + str(round(float(correlation), 4))
+
+        # the Kendall interval takes seconds at tens of thousands of buildings, so the intervals can be left out
+        if replicates > 0:
+            low, high = bootstrap_ci(income_values, energy_values, method, replicates, seed=0)
+            line += " (95% confidence interval " + str(round(low, 4)) + " to " + str(round(high, 4)) + ")"
+        lines.append(line)
+    return lines
+
+
+def print_income_and_energy_correlations(income_values, energy_values, replicates=1000):
+    """
+    Prints the Pearson, Spearman and Kendall correlations of average community income and personal energy use, each
+    with a bootstrap confidence interval
+    :param income_values: (array) the average community income of each residential building
+    :param energy_values: (array) the annual energy usage (kw/person) of each residential building
+    :param replicates: (int) the number of bootstrap resamples behind each confidence interval, or 0 for the
+    correlations without intervals
+    """
+    print("\n".join(income_and_energy_correlation_lines(income_values, energy_values, replicates)))
+
+
+def plot_income_and_energy(data, format, show=False):
+    """
+    Plots the data in <data>, showing average income on the x-axis and a building's annual energy consumption in
+    kw/person on the y-axis, and writes the plot to visualization2.png
+    :param data: (list) a list where each entry is a list of [avg annual income of a community, annual energy usage
+    (kw/person) of a residential building in that community]
+    :param format: (str) a matplotlib format string
+    :param show: (bool) True to also display the plot in a window
+    """
+    render_figures([(draw_income_and_energy, (data, format), "visualization2.png")], show)
+
+
+# *** QUESTION 3: Are low-rise apartment buildings more energy efficient than high-rise apartment buildings? *** #
+
+
+def parse_energy_for_apartments(fname, db_fname=None):
+    """
+    Takes a csv energy file and returns a list of tuples containing building sub-type and energy efficiency
+    :param fname: (str) name of a csv file containing Chicago building energy data
+    :param db_fname: (str) name of a SQLite database made by energy_db.py, or None to always read the csv
+    :return: (list) a list of lists of [building sub-type, energy efficiency (kw/sq feet)]
+    """
+    # pull the rows from the database instead when it holds a current copy of the file
+    connection = open_current(db_fname, fname)
+    if connection is not None:
+        efficiency_values_list = query_energy_for_apartments(connection, fname)
+        connection.close()
+        return efficiency_values_list
+
+    # return the list of lists of efficiency values
+    return EnergyDataset(fname).multi_family_efficiency()
+
+
+def parse_energy_for_apartments_helper(building_efficiency_list):
+    """
+    Takes a list of lists of [building sub-type, energy efficiency (kw/sq ft)] and returns a list that contains 2 lists:
+    One list of energy efficiency values for Multi 7+ building sub-types
+    One list of energy efficiency values for Multi < 7 building sub-types
+    :param building_efficiency_list: (list) a list of lists of [building sub-type, energy efficiency]
+    :return: (list) a list of lists containing energy efficiency values for building sub-types of Multi 7+ and Multi < 7
+    """
+    # give each building sub-type a code and split the efficiency values by code in one pass
+    subtype_codes, subtype_names = group_codes([item[0] for item in building_efficiency_list])
+    subtype_values = split_by_group(subtype_codes, [item[1] for item in building_efficiency_list], len(subtype_names))
+
+    # keep the lists of the Multi 7+ and Multi < 7 building sub-types, in that order
+    efficiency_values_list = []
+    for subtype in MULTI_FAMILY_SUBTYPES:
+        if subtype in subtype_names:
+            efficiency_values_list.append(subtype_values[subtype_names.index(subtype)].tolist())
+        else:
+            efficiency_values_list.append([])
+
+    # return the list of lists of energy efficiency values
+    return efficiency_values_list
+
+
+def energy_efficiency_medians(efficiency_values_list):
+    """
+    Takes a list of lists of energy efficiency values, or of their quantile sketches, and returns a list of their
+    median values
+    :param efficiency_values_list: (list) list of lists of energy efficiency values, or of their quantile sketches, for
+    each building sub-type
+    :return: (list) a list that has 2 elements, the median energy efficiency of Multi 7+ and the median energy
+    efficiency of Multi < 7 building types
+    """
+    # create a list to store the calculated avg values
+    median_list = []
+
+    # for each list of values in energy_efficiency list
+    for lst in efficiency_values_list:
+
+        # get the median of the list from its sketch, which is exact for small lists
+        median_efficiency = as_sketch(lst).median()
+
+        # append the median to median_list
+        median_list.append(median_efficiency)
+
+    # return the list of the two medians as [high-rise median, low-rise median]
+    return median_list
+
+
+def plot_high_and_low_rise(efficiency_values_list, show=False):
+    """
+    Takes a list of lists of efficiency values for high and low-rise multifamily buildings and makes box plots for each
+    list, written to visualization3.png
+    :param efficiency_values_list: (list) a list of lists of efficiency values for high and low-rise multifamily
+    buildings
+    :param show: (bool) True to also display the plot in a window
+    """
+    render_figures([(draw_high_and_low_rise, (efficiency_values_list,), "visualization3.png")], show)
+
+
+# *** Answering the questions *** #
+
+
+# the questions that can be asked, by number
+QUESTIONS = [1, 2, 3]
+
+
+def answer_season_question(energy_dataset, recorder):
+    """
+    Answers question 1 by comparing the average KWH energy usage of winter and summer
+    :param energy_dataset: (EnergyDataset) the parsed energy csv
+    :param recorder: (StageRecorder) the recorder that times each stage, see stage_timing
+    :return: (tuple) the lines of the answer, and a list of (draw function, arguments, png file name) of its plots
+    """
+    # Find the average data for winter and summer
+    with recorder.stage("season averages", len(energy_dataset)):
+        average_data_winter = energy_dataset.average_season_kwh(4, 5, 15)
+        average_data_summer = energy_dataset.average_season_kwh(9, 10, 11)
+
+    lines = ["The average KWH used in Chicago during the winter months of December through February is: " + str(
+                 average_data_winter) + " KWH",
+             "The average KWH used in Chicago during the summer months of June through August is: " + str(
+                 average_data_summer) + " KWH"]
+
+    # Determine whether the energy usage is greater in the winter or summer
+    if average_data_winter > average_data_summer:
+        lines.append("In the winter months, Chicago uses " + str(
+            average_data_winter - average_data_summer) + " more KWH of energy than in the summer months")
+    elif average_data_winter < average_data_summer:
+        lines.append("In the summer months, Chicago uses " + str(
+            average_data_summer - average_data_winter) + " more KWH of energy than in the winter months")
+    else:
+        lines.append("Chicago uses the same amount of energy during the winter and summer months")
+
+    return lines, [(draw_average_energy, (energy_dataset.average_energy_list(), "b."), "visualization1.png")]
+
+
+def answer_income_question(energy_dataset, income_fname, recorder, replicates=0, db_fname=None):
+    """
+    Answers question 2 by correlating the energy usage of each residential building with its community's income
+    :param energy_dataset: (EnergyDataset) the parsed energy csv
+    :param income_fname: (str) name of a csv file containing Chicago socioeconomic census data
+    :param recorder: (StageRecorder) the recorder that times each stage, see stage_timing
+    :param replicates: (int) the number of bootstrap resamples behind the confidence interval of each correlation, or
+    0 for no intervals
+    :param db_fname: (str) name of a SQLite database made by energy_db.py, or None to always read the csv
+    :return: (tuple) the lines of the answer, and a list of (draw function, arguments, png file name) of its plots
+    """
+    with recorder.stage("parse income") as record:
+        income_data = parse_income_data(income_fname, db_fname)
+        record["rows"] = len(income_data)
+
+    # join the income of each building's community to the building's energy use
+    with recorder.stage("correlate") as record:
+        income_values, energy_values, unmatched_count = energy_dataset.income_and_energy_arrays(income_data)
+        record["rows"] = len(income_values)
+    lines = [str(unmatched_count) + " residential buildings have no matching community in the socioeconomic data"]
+
+    # calculate the correlations between income and energy
+    with recorder.stage("spearman", len(income_values)):
+        spearman = spearman_income_and_energy(np.column_stack((income_values, energy_values)))
+    lines.append("Spearman correlation for average community income and personal energy use:\n" + str(spearman))
+    with recorder.stage("correlations", len(income_values)):
+        lines.extend(income_and_energy_correlation_lines(income_values, energy_values, replicates))
+
+    return lines, [(draw_income_and_energy, (np.column_stack((income_values, energy_values)), "b."),
+                    "visualization2.png")]
+
+
+def answer_apartment_question(energy_dataset, recorder):
+    """
+    Answers question 3 by comparing the median energy efficiency of high-rise and low-rise apartment buildings
+    :param energy_dataset: (EnergyDataset) the parsed energy csv
+    :param recorder: (StageRecorder) the recorder that times each stage, see stage_timing
+    :return: (tuple) the lines of the answer, and a list of (draw function, arguments, png file name) of its plots
+    """
+    with recorder.stage("apartments") as record:
+        building_data = energy_dataset.multi_family_sketches()
+        record["rows"] = sum(sketch.count for sketch in building_data)
+
+    with recorder.stage("medians", sum(sketch.count for sketch in building_data)):
+        efficiency_stats = energy_efficiency_medians(building_data)
+
+    lines = ["Median energy efficiencies (KWH/sq ft):\nHigh-Rise: " + str(efficiency_stats[0]) + "\nLow-Rise: " + str(
+                 efficiency_stats[1]),
+             "High-rise apartments generally use " + str(
+                 efficiency_stats[1] - efficiency_stats[0]) + " less KWH/sq ft than low-rise apartments."]
+
+    return lines, [(draw_high_and_low_rise, (building_data,), "visualization3.png")]
+
+
+def run_analysis(energy_fname=ENERGY_FNAME, income_fname=INCOME_FNAME, questions=QUESTIONS, show=False,
+                 recorder=None, output_dir=".", jobs=1, replicates=0, parse_workers=1, db_fname=None):
+    """
+    Parses the energy csv once, answers each of the questions asked from it and prints the answers, then writes the
+    plots of every question to their png files together. The questions are independent of each other, so with more
+    than one job they are answered at the same time in threads sharing the parsed energy csv, and their answers are
+    still printed in the order asked
+    :param energy_fname: (str) name of a csv file containing Chicago building energy data
+    :param income_fname: (str) name of a csv file containing Chicago socioeconomic census data
+    :param questions: (list) the numbers of the questions to answer, see QUESTIONS
+    :param show: (bool) True to also display the plots in windows
+    :param recorder: (StageRecorder) the recorder that times each stage, see stage_timing, or None for a new one
+    :param output_dir: (str) the directory the plots are written to, made if it doesn't exist
+    :param jobs: (int) the number of questions answered at the same time
+    :param replicates: (int) the number of bootstrap resamples behind the confidence interval of each income
+    correlation, or 0 for no intervals
+    :param parse_workers: (int) the number of worker processes parsing byte ranges of the energy csv when it isn't
+    cached, or 1 to parse it in this process
+    :param db_fname: (str) name of a SQLite database made by energy_db.py that the socioeconomic csv is read from when
+    it holds a current copy, or None to always read the csv
+    :return: (StageRecorder) the recorder holding the timings of the run
+    """
+    if recorder is None:
+        recorder = StageRecorder()
+
+    # read the energy csv once for every question
+    with recorder.stage("parse energy") as record:
+        energy_dataset = EnergyDataset(energy_fname, workers=parse_workers)
+        record["rows"] = len(energy_dataset)
+
+    answers = {1: lambda: answer_season_question(energy_dataset, recorder),
+               2: lambda: answer_income_question(energy_dataset, income_fname, recorder, replicates, db_fname),
+               3: lambda: answer_apartment_question(energy_dataset, recorder)}
+
+    # the plots are all rendered together at the end
+    figure_jobs = []
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        futures = [executor.submit(answers[question]) for question in questions]
+        for future in futures:
+            lines, question_figure_jobs = future.result()
+            print("\n".join(lines))
+            figure_jobs.extend(question_figure_jobs)
+
+    # write the plots concurrently, and display them only if asked to
+    os.makedirs(output_dir, exist_ok=True)
+    render_figures([(draw, arguments, os.path.normpath(os.path.join(output_dir, fname)))
+                    for draw, arguments, fname in figure_jobs], show, recorder=recorder)
+    return recorder
+
+
+def year_tables_lines(year_tables):
+    """
+    Describes the tables of a batch of years
+    :param year_tables: (dict) the tables of every year, see energy_years.merge_year_summaries
+    :return: (list) the lines of the year by month table, followed by the change in KWH per person of the communities
+    from the first year to the last
+    """
+    lines = ["Mean KWH used by a building in Chicago in each month of each year:",
+             "Year " + " ".join(month.capitalize()[:3].rjust(7) for month in MONTH_NAMES)]
+    for year, month_means in zip(year_tables["years"], year_tables["month_matrix"].tolist()):
+        lines.append(str(year).ljust(4) + " " + " ".join(str(round(value, 1)).rjust(7) for value in month_means))
+
+    # the communities with residential buildings in both the first and the last year
+    kwh_per_person = year_tables["kwh_per_person"]
+    if len(year_tables["years"]) > 1:
+        change = kwh_per_person[-1] - kwh_per_person[0]
+        compared = np.flatnonzero(~np.isnan(change))
+        if len(compared):
+            most, least = compared[np.argmax(change[compared])], compared[np.argmin(change[compared])]
+            lines.append("From " + str(year_tables["years"][0]) + " to " + str(year_tables["years"][-1])
+                         + ", residential KWH per person changed most in " + year_tables["communities"][most] + " ("
+                         + str(round(float(change[most]), 2)) + ") and least in " + year_tables["communities"][least]
+                         + " (" + str(round(float(change[least]), 2)) + ")")
+    return lines
+
+
+def run_year_batch(energy_fnames, output_dir=".", jobs=1, show=False, recorder=None):
+    """
+    Parses a batch of yearly energy csvs, each in a worker process of its own, and merges them into a year by month
+    table of the mean KWH usage of a building and a year by community table of residential KWH per person. The tables
+    are printed and written to csv files, and the months of every year are plotted together to visualization4.png
+    :param energy_fnames: (list) names of csv files containing Chicago building energy data, with a different year
+    in each name
+    :param output_dir: (str) the directory the tables and the plot are written to, made if it doesn't exist
+    :param jobs: (int) the number of worker processes parsing the years
+    :param show: (bool) True to also display the plot in a window
+    :param recorder: (StageRecorder) the recorder that times each stage, see stage_timing, or None for a new one
+    :return: (dict) the tables of every year, see energy_years.merge_year_summaries
+    """
+    if recorder is None:
+        recorder = StageRecorder()
+
+    with recorder.stage("parse years") as record:
+        year_tables = analyze_years(energy_fnames, jobs)
+        record["rows"] = len(year_tables["years"])
+    print("\n".join(year_tables_lines(year_tables)))
+
+    os.makedirs(output_dir, exist_ok=True)
+    with recorder.stage("write tables", len(year_tables["years"])):
+        write_year_tables(year_tables, output_dir)
+    render_figures([(draw_average_energy_by_year, (year_tables["years"], year_tables["month_matrix"]),
+                     os.path.normpath(os.path.join(output_dir, "visualization4.png")))], show, recorder=recorder)
+    return year_tables
+
+
+# *** Command line *** #
+
+
+def expand_energy_fnames(patterns):
+    """
+    Expands the names and glob patterns of energy csvs given on the command line, such as "energy-usage-*.csv"
+    :param patterns: (list) names of csv files, or glob patterns matching them
+    :return: (list) the names of the matching files, sorted and without repeats, with a name that matches no file
+    kept as it is
+    """
+    energy_fnames = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            energy_fnames.extend(sorted(glob.glob(pattern)))
+        else:
+            energy_fnames.append(pattern)
+    return list(dict.fromkeys(energy_fnames))
+
+
+def add_analysis_arguments(parser, questions=QUESTIONS):
+    """
+    Adds the command line options that choose the csvs analyzed, the questions answered and where the plots are
+    written to an argument parser
+    :param parser: (argparse.ArgumentParser) the parser of a command line
+    :param questions: (list) the numbers of the questions answered when --questions isn't given
+    """
+    parser.add_argument("--energy", metavar="CSV", nargs="+", default=[ENERGY_FNAME],
+                        help="energy usage csvs or glob patterns such as 'energy-usage-*.csv', each analyzed in turn")
+    parser.add_argument("--income", metavar="CSV", default=INCOME_FNAME, help="the socioeconomic csv")
+    parser.add_argument("--db", metavar="DATABASE",
+                        help="a SQLite database made by energy_db.py, which the socioeconomic csv is read from when "
+                             "it holds a current copy of it")
+    parser.add_argument("--output-dir", metavar="DIR", default=".",
+                        help="the directory the plots are written to, with a directory per energy csv when there are "
+                             "several")
+    parser.add_argument("--questions", metavar="N", nargs="+", type=int, choices=QUESTIONS, default=list(questions),
+                        help="the questions to answer: 1 seasonal usage, 2 income correlation, 3 high and low-rise "
+                             "efficiency")
+    parser.add_argument("--jobs", metavar="N", type=int, default=1,
+                        help="the number of questions answered at once, or of worker processes parsing the years "
+                             "with --years")
+    parser.add_argument("--parse-workers", metavar="N", type=int, default=1,
+                        help="the number of worker processes parsing byte ranges of an energy csv that isn't cached "
+                             "yet, or 1 to parse it in one process")
+    parser.add_argument("--bootstrap", metavar="REPLICATES", type=int, default=0,
+                        help="give each income correlation a 95%% confidence interval from this many bootstrap "
+                             "resamples, such as 1000. The resamples are drawn in chunks of at most 256, and every "
+                             "1000 resamples of 40,000 buildings take about 0.5 seconds for Pearson, 3 for Spearman "
+                             "and 10 for Kendall, growing as n for Pearson and Spearman and n log n for Kendall")
+    parser.add_argument("--years", action="store_true",
+                        help="instead of answering the questions, merge the energy csvs of several years into year "
+                             "by month and year by community tables, parsing them in --jobs worker processes")
+    parser.add_argument("--show", action="store_true", help="display the plots in windows after writing them")
+
+
+def run_analysis_arguments(parser, args, recorder=None):
+    """
+    Runs the analysis asked for on the command line over every energy csv given
+    :param parser: (argparse.ArgumentParser) the parser of the command line, used to report bad arguments
+    :param args: (argparse.Namespace) the parsed command line, see add_analysis_arguments
+    :param recorder: (StageRecorder) the recorder that times each stage, see stage_timing, or None for a new one
+    :return: (StageRecorder) the recorder holding the timings of the run
+    """
+    if recorder is None:
+        recorder = StageRecorder()
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.parse_workers < 1:
+        parser.error("--parse-workers must be at least 1")
+    if args.bootstrap < 0:
+        parser.error("--bootstrap can't be negative")
+    if args.db is not None and not os.path.isfile(args.db):
+        parser.error("no such database: " + args.db)
+    energy_fnames = expand_energy_fnames(args.energy)
+    if not energy_fnames:
+        parser.error("no energy csv matches " + " ".join(args.energy))
+    for fname in energy_fnames + ([args.income] if 2 in args.questions and not args.years else []):
+        if not os.path.isfile(fname):
+            parser.error("no such csv: " + fname)
+
+    if args.years:
+        try:
+            years = [year_of(fname) for fname in energy_fnames]
+        except ValueError as error:
+            parser.error(str(error))
+        if len(set(years)) < len(years):
+            parser.error("--years needs a different year in the name of every energy csv")
+        run_year_batch(energy_fnames, args.output_dir, args.jobs, args.show, recorder)
+        return recorder
+
+    for energy_fname in energy_fnames:
+        output_dir = args.output_dir
+
+        # a batch of csvs, such as one a year, writes the plots of each to a directory named after it
+        if len(energy_fnames) > 1:
+            print("*** " + energy_fname + " ***")
+            output_dir = os.path.join(output_dir, os.path.splitext(os.path.basename(energy_fname))[0])
+        run_analysis(energy_fname, args.income, args.questions, args.show, recorder, output_dir, args.jobs,
+                     args.bootstrap, args.parse_workers, args.db)
+    return recorder
@@ -0,0 +1,230 @@
+"""
+Tester code for energy_analysis.py
+"""
+import argparse
+import io
+import os
+import tempfile
+from contextlib import contextmanager, redirect_stderr, redirect_stdout
+
+from energy_analysis import *
+from energy_db import connect, ingest_text_csv
+from energy_synthetic import write_energy_csv, write_socioeconomic_csv
+
+
+@contextmanager
+def synthetic_csvs():
+    """
+    :return: (context manager) the names of a synthetic energy csv and socioeconomic csv in a new temporary directory,
+    which is removed on leaving the context
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        energy_fname = os.path.join(temp_dir, "energy-usage-2010.csv")
+        income_fname = os.path.join(temp_dir, "socioeconomic.csv")
+        write_energy_csv(energy_fname, 2000)
+        write_socioeconomic_csv(income_fname)
+        yield energy_fname, income_fname
+
+
+def test_answers():
+    """
+    Runs a series of tests for answer_season_question, answer_income_question and answer_apartment_question
+    :return: (bool) were all tests successful
+    """
+    with synthetic_csvs() as (energy_fname, income_fname):
+        energy_dataset = EnergyDataset(energy_fname)
+        recorder = StageRecorder()
+
+        # check that each answer is some lines of text and the plots of its question
+        season_lines, season_jobs = answer_season_question(energy_dataset, recorder)
+        assert len(season_lines) == 3 and str(average_season_kwh_data(4, 5, 15, energy_fname)) in season_lines[0]
+        assert [fname for draw, arguments, fname in season_jobs] == ["visualization1.png"]
+
+        income_lines, income_jobs = answer_income_question(energy_dataset, income_fname, recorder)
+        assert income_lines[0].endswith("have no matching community in the socioeconomic data")
+        assert [line.split()[0] for line in income_lines[2:]] == ["Pearson", "Spearman", "Kendall"]
+        assert not any("confidence interval" in line for line in income_lines)
+
+        # check that the confidence intervals are given only when bootstrap resamples are asked for
+        bootstrap_lines = answer_income_question(energy_dataset, income_fname, StageRecorder(), replicates=50)[0]
+        assert [line.split(" (95% confidence interval ")[0] for line in bootstrap_lines[2:]] == income_lines[2:]
+        assert [fname for draw, arguments, fname in income_jobs] == ["visualization2.png"]
+
+        apartment_lines, apartment_jobs = answer_apartment_question(energy_dataset, recorder)
+        medians = energy_efficiency_medians(parse_energy_for_apartments(energy_fname))
+        assert apartment_lines[0].endswith("Low-Rise: " + str(medians[1]))
+        assert [fname for draw, arguments, fname in apartment_jobs] == ["visualization3.png"]
+
+        # check that every stage was timed
+        assert [record["stage"] for record in recorder.records] == ["season averages", "parse income", "correlate",
+                                                                   "spearman", "correlations", "apartments", "medians"]
+
+    return True
+
+
+def test_run_analysis():
+    """
+    Runs a series of tests for run_analysis
+    :return: (bool) were all tests successful
+    """
+    with synthetic_csvs() as (energy_fname, income_fname):
+
+        # answer only the apartment question, writing its plot to the temporary directory
+        working_dir = os.getcwd()
+        os.chdir(os.path.dirname(energy_fname))
+        try:
+            with redirect_stdout(io.StringIO()) as output:
+                recorder = run_analysis(energy_fname, income_fname, [3])
+        finally:
+            os.chdir(working_dir)
+
+        # check that only the apartment question was answered and plotted
+        assert output.getvalue().startswith("Median energy efficiencies")
+        assert os.path.isfile(os.path.join(os.path.dirname(energy_fname), "visualization3.png"))
+        assert not os.path.isfile(os.path.join(os.path.dirname(energy_fname), "visualization1.png"))
+        assert [record["stage"] for record in recorder.records][:3] == ["parse energy", "apartments", "medians"]
+
+    return True
+
+
+def test_concurrent_questions():
+    """
+    Runs a series of tests for answering the questions at the same time with run_analysis
+    :return: (bool) were all tests successful
+    """
+    with synthetic_csvs() as (energy_fname, income_fname):
+        output_dir = os.path.join(os.path.dirname(energy_fname), "plots")
+
+        # check that the answers are printed in the order asked, the same as when they are answered one at a time
+        with redirect_stdout(io.StringIO()) as sequential_output:
+            run_analysis(energy_fname, income_fname, [3, 1, 2], output_dir=output_dir)
+        with redirect_stdout(io.StringIO()) as concurrent_output:
+            run_analysis(energy_fname, income_fname, [3, 1, 2], output_dir=output_dir, jobs=3)
+        assert concurrent_output.getvalue() == sequential_output.getvalue()
+        assert concurrent_output.getvalue().startswith("Median energy efficiencies")
+
+        # check that the plots are written to the output directory
+        assert sorted(os.listdir(output_dir)) == ["visualization1.png", "visualization2.png", "visualization3.png"]
+
+    return True
+
+
+def test_command_line():
+    """
+    Runs a series of tests for expand_energy_fnames, add_analysis_arguments and run_analysis_arguments
+    :return: (bool) were all tests successful
+    """
+    with synthetic_csvs() as (energy_fname, income_fname):
+        temp_dir = os.path.dirname(energy_fname)
+        write_energy_csv(os.path.join(temp_dir, "energy-usage-2011.csv"), 1000, seed=1)
+
+        # check that a glob pattern matches every year in order, and that a plain name is kept even if it doesn't exist
+        pattern = os.path.join(temp_dir, "energy-usage-*.csv")
+        energy_fnames = expand_energy_fnames([pattern, energy_fname, "missing.csv"])
+        assert [os.path.basename(fname) for fname in energy_fnames] == ["energy-usage-2010.csv",
+                                                                        "energy-usage-2011.csv", "missing.csv"]
+
+        # check the defaults, and that only the chosen questions are asked
+        parser = argparse.ArgumentParser()
+        add_analysis_arguments(parser, [2, 3])
+        args = parser.parse_args([])
+        assert args.energy == [ENERGY_FNAME] and args.income == INCOME_FNAME and args.questions == [2, 3]
+        assert args.jobs == 1 and args.output_dir == "." and args.bootstrap == 0 and args.parse_workers == 1
+        assert args.db is None
+
+        # check that a batch writes the plots of each year to a directory of its own
+        output_dir = os.path.join(temp_dir, "plots")
+        args = parser.parse_args(["--energy", pattern, "--income", income_fname, "--output-dir", output_dir,
+                                  "--questions", "1", "--jobs", "2", "--parse-workers", "2"])
+        with redirect_stdout(io.StringIO()) as output:
+            run_analysis_arguments(parser, args)
+        assert output.getvalue().count("*** ") == 2
+        assert sorted(os.listdir(output_dir)) == ["energy-usage-2010", "energy-usage-2011"]
+        assert os.listdir(os.path.join(output_dir, "energy-usage-2011")) == ["visualization1.png"]
+
+        # check that the socioeconomic csv can be read from a database, with the same answer as from the csv
+        db_fname = os.path.join(temp_dir, "energy.sqlite")
+        connection = connect(db_fname)
+        ingest_text_csv(connection, income_fname)
+        connection.close()
+        outputs = []
+        for db_arguments in [[], ["--db", db_fname]]:
+            args = parser.parse_args(["--energy", energy_fname, "--income", income_fname, "--output-dir", output_dir,
+                                      "--questions", "2"] + db_arguments)
+            with redirect_stdout(io.StringIO()) as output:
+                run_analysis_arguments(parser, args)
+            outputs.append(output.getvalue())
+        assert outputs[0] == outputs[1] and "Spearman" in outputs[1]
+
+        # check that a database that doesn't exist is an error
+        try:
+            with redirect_stderr(io.StringIO()):
+                run_analysis_arguments(parser, parser.parse_args(["--energy", energy_fname, "--db",
+                                                                  os.path.join(temp_dir, "missing.sqlite")]))
+            return False
+        except SystemExit:
+            pass
+
+    return True
+
+
+def test_year_batch():
+    """
+    Runs a series of tests for run_year_batch, scatter_plot_years and the --years option
+    :return: (bool) were all tests successful
+    """
+    with synthetic_csvs() as (energy_fname, income_fname):
+        temp_dir = os.path.dirname(energy_fname)
+        write_energy_csv(os.path.join(temp_dir, "energy-usage-2011.csv"), 1000, seed=1)
+        pattern = os.path.join(temp_dir, "energy-usage-*.csv")
+
+        # check that the tables are printed and written with the plot of every year
+        output_dir = os.path.join(temp_dir, "years")
+        with redirect_stdout(io.StringIO()) as output:
+            year_tables = run_year_batch(expand_energy_fnames([pattern]), output_dir, jobs=2)
+        assert year_tables["years"] == [2010, 2011]
+        assert output.getvalue().splitlines()[2].startswith("2010") and "From 2010 to 2011" in output.getvalue()
+        assert sorted(os.listdir(output_dir)) == ["visualization4.png", "year_community_kwh_per_person.csv",
+                                                  "year_month_kwh.csv"]
+
+        # check that the plot of the years can be drawn on its own
+        working_dir = os.getcwd()
+        os.chdir(temp_dir)
+        try:
+            scatter_plot_years(expand_energy_fnames([pattern]), year_tables)
+        finally:
+            os.chdir(working_dir)
+        assert os.path.isfile(os.path.join(temp_dir, "visualization4.png"))
+
+        # check that --years runs the batch instead of the questions, and needs a year in the name of every csv
+        parser = argparse.ArgumentParser()
+        add_analysis_arguments(parser)
+        output_dir = os.path.join(temp_dir, "batch")
+        with redirect_stdout(io.StringIO()) as output:
+            run_analysis_arguments(parser, parser.parse_args(["--years", "--energy", pattern, "--output-dir",
+                                                              output_dir]))
+        assert output.getvalue().startswith("Mean KWH used by a building")
+        assert "visualization1.png" not in os.listdir(output_dir)
+        try:
+            with redirect_stderr(io.StringIO()):
+                run_analysis_arguments(parser, parser.parse_args(["--years", "--energy", income_fname]))
+            return False
+        except SystemExit:
+            pass
+
+    return True
+
+
+def main():
+    """
+    For testing purposes
+    """
+    print("test answers ... " + "PASS" if test_answers() else "FAIL")
+    print("test run_analysis ... " + "PASS" if test_run_analysis() else "FAIL")
+    print("test concurrent questions ... " + "PASS" if test_concurrent_questions() else "FAIL")
+    print("test command line ... " + "PASS" if test_command_line() else "FAIL")
+    print("test year batch ... " + "PASS" if test_year_batch() else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
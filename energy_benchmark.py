@@ -0,0 +1,234 @@
+"""
+    Benchmarks of the parsers and analysis functions on synthetic data
+
+    For every size asked for, a synthetic energy csv and socioeconomic csv are written (see energy_synthetic) and each
+    benchmarked function is timed on them. Every run starts cold, with the binary cache of the energy csv and the
+    query memo cleared, so the timings include parsing the csv. The best time of the repeats, the throughput in rows
+    per second and the peak memory allocated during one more, traced, call are written as json, together with the
+    commit they were measured at, so that the results of different commits can be compared.
+
+    With --imports, the time a fresh interpreter takes to import each script is also measured, next to the time it
+    takes when the plotting and statistics libraries are imported up front as they once were.
+
+    Usage: python energy_benchmark.py [--rows 1000 100000 ...] [--repeat N] [--output FILE] [--dir DIR] [--imports]
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from energy_analysis import (average_month_kwh_data, energy_efficiency_medians, income_and_energy_correlate_data,
+                             parse_energy_data, parse_energy_for_apartments, parse_income_data)
+from energy_cache import cache_path
+from energy_memo import query_memo
+from energy_synthetic import write_energy_csv, write_socioeconomic_csv
+
+# the sizes of energy csv benchmarked when none are given
+DEFAULT_ROWS = [1000, 10000, 100000]
+
+# the number of times each function is timed at each size
+DEFAULT_REPEAT = 3
+
+# the modules whose import is timed, and the libraries they once imported up front
+IMPORTED_MODULES = ["energy_analysis", "finalproject", "income_and_energy_usage"]
+EAGER_LIBRARIES = ["numpy", "scipy.stats", "matplotlib.pyplot"]
+
+
+def _clear_caches(energy_fname):
+    """
+    Drops everything remembered about an energy csv, so that the next call reads it again
+    :param energy_fname: (str) name of the energy csv
+    """
+    query_memo.invalidate()
+    shutil.rmtree(cache_path(energy_fname), ignore_errors=True)
+
+
+def benchmark_functions(energy_fname, income_fname):
+    """
+    Takes a synthetic energy csv and socioeconomic csv and returns the benchmarked functions. Each is a function of no
+    arguments; the inputs of the functions that take parsed data are parsed once here, outside the timings
+    :param energy_fname: (str) name of a csv file containing Chicago building energy data
+    :param income_fname: (str) name of a csv file containing Chicago socioeconomic census data
+    :return: (list) a list of tuples (str(function name), function(call), bool(whether the energy csv is read))
+    """
+    income_dict = parse_income_data(income_fname)
+    energy_list = parse_energy_data(energy_fname)
+    efficiency_values_list = parse_energy_for_apartments(energy_fname)
+
+    return [("average_month_kwh_data", lambda: average_month_kwh_data(energy_fname, 4), True),
+            ("parse_energy_data", lambda: parse_energy_data(energy_fname), True),
+            ("income_and_energy_correlate_data", lambda: income_and_energy_correlate_data(income_dict, energy_list),
+             False),
+            ("parse_energy_for_apartments", lambda: parse_energy_for_apartments(energy_fname), True),
+            ("energy_efficiency_medians", lambda: energy_efficiency_medians(efficiency_values_list), False)]
+
+
+def time_call(call, before=None):
+    """
+    Times one call of a function
+    :param call: (function) a function of no arguments
+    :param before: (function) a function of no arguments run just before the call, outside the timing
+    :return: (float) the wall time of the call in seconds
+    """
+    if before is not None:
+        before()
+    start = time.perf_counter()
+    call()
+    return time.perf_counter() - start
+
+
+def peak_memory(call, before=None):
+    """
+    Measures the memory allocated by one call of a function. Tracing allocations slows the call down several times,
+    so this is a separate call from the timed ones
+    :param call: (function) a function of no arguments
+    :param before: (function) a function of no arguments run just before the call, outside the measurement
+    :return: (int) the peak number of bytes allocated during the call
+    """
+    if before is not None:
+        before()
+    tracemalloc.start()
+    try:
+        call()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmarks(row_counts=DEFAULT_ROWS, repeat=DEFAULT_REPEAT, data_dir=None, seed=0):
+    """
+    Writes synthetic data of every size and times every benchmarked function on it
+    :param row_counts: (list) the numbers of buildings in the synthetic energy csvs
+    :param repeat: (int) the number of times each function is timed at each size
+    :param data_dir: (str) the directory the synthetic csvs are written to, or None for a temporary directory
+    :param seed: (int) the seed of the synthetic data
+    :return: (list) a list of dicts, one per function and size, with the keys "function", "rows", "seconds",
+    "rows_per_second" and "peak_memory_bytes"
+    """
+    temp_dir = None
+    if data_dir is None:
+        temp_dir = data_dir = tempfile.mkdtemp(prefix="energy-benchmark-")
+
+    results = []
+    try:
+        for rows in row_counts:
+            energy_fname = os.path.join(data_dir, "energy-usage-" + str(rows) + ".csv")
+            income_fname = os.path.join(data_dir, "socioeconomic.csv")
+            write_energy_csv(energy_fname, rows, seed)
+            write_socioeconomic_csv(income_fname, seed)
+
+            for name, call, reads_energy in benchmark_functions(energy_fname, income_fname):
+                before = (lambda: _clear_caches(energy_fname)) if reads_energy else None
+                seconds = min(time_call(call, before) for _ in range(repeat))
+                results.append({"function": name, "rows": rows, "seconds": seconds,
+                                "rows_per_second": rows / seconds if seconds > 0 else None,
+                                "peak_memory_bytes": peak_memory(call, before)})
+            _clear_caches(energy_fname)
+    finally:
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    return results
+
+
+def import_seconds(module_names, repeat=DEFAULT_REPEAT):
+    """
+    Times how long a fresh Python interpreter takes to import some modules
+    :param module_names: (list) the names of the modules, imported in order
+    :param repeat: (int) the number of interpreters timed
+    :return: (float) the best import time in seconds
+    """
+    statement = ("import time\nstart = time.perf_counter()\nimport " + ", ".join(module_names)
+                 + "\nprint(time.perf_counter() - start)")
+    code_dir = os.path.dirname(os.path.abspath(__file__))
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", statement], capture_output=True, text=True, check=True,
+                                cwd=code_dir).stdout
+        timings.append(float(output.split()[-1]))
+    return min(timings)
+
+
+def run_import_benchmarks(repeat=DEFAULT_REPEAT):
+    """
+    Times the import of every script on its own, and after the libraries it once imported up front
+    :param repeat: (int) the number of interpreters timed for each import
+    :return: (list) a list of dicts, one per script, with the keys "module", "seconds", "eager_seconds" and "speedup"
+    """
+    results = []
+    for module_name in IMPORTED_MODULES:
+        try:
+            seconds = import_seconds([module_name], repeat)
+            eager_seconds = import_seconds(EAGER_LIBRARIES + [module_name], repeat)
+        except subprocess.CalledProcessError:
+            # a script whose own dependencies aren't installed can't be imported
+            continue
+        results.append({"module": module_name, "seconds": seconds, "eager_seconds": eager_seconds,
+                        "speedup": eager_seconds / seconds})
+    return results
+
+
+def benchmark_line(result):
+    """
+    Describes the result of one benchmarked function at one size
+    :param result: (dict) a result of run_benchmarks
+    :return: (str) a line of the function, rows, seconds, rows per second and peak memory. A call too fast for the
+    clock to time has no rows per second, which is shown as "-"
+    """
+    rows_per_second = "-" if result["rows_per_second"] is None else "%.0f" % result["rows_per_second"]
+    return (result["function"].ljust(34) + str(result["rows"]).rjust(10) + " rows "
+            + ("%.4f" % result["seconds"]).rjust(10) + " s " + rows_per_second.rjust(12) + " rows/s "
+            + str(result["peak_memory_bytes"] // 1024).rjust(10) + " KiB")
+
+
+def current_commit():
+    """
+    :return: (str) the hash of the git commit of this code, or None outside a git repository
+    """
+    try:
+        return subprocess.run(["git", "-C", os.path.dirname(os.path.abspath(__file__)), "rev-parse", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    """
+    Runs the benchmarks and writes the results as json
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the energy analysis on synthetic data")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS,
+                        help="the numbers of buildings in the synthetic energy csvs, from 1000 to 10000000")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="the number of timings of each function")
+    parser.add_argument("--output", default="benchmark.json", help="the json file the results are written to")
+    parser.add_argument("--dir", default=None, help="the directory the synthetic csvs are written to")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the synthetic data")
+    parser.add_argument("--imports", action="store_true", help="also time the import of the scripts")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.rows, args.repeat, args.dir, args.seed)
+    report = {"commit": current_commit(), "python": platform.python_version(), "numpy": np.__version__,
+              "repeat": args.repeat, "results": results}
+    if args.imports:
+        report["imports"] = run_import_benchmarks(args.repeat)
+    with open(args.output, "w") as file_out:
+        json.dump(report, file_out, indent=2)
+
+    for result in results:
+        print(benchmark_line(result))
+
+    for result in report.get("imports", []):
+        print(("import " + result["module"]).ljust(34) + ("%.4f" % result["seconds"]).rjust(10) + " s, "
+              + ("%.4f" % result["eager_seconds"]).rjust(8) + " s with eager imports, "
+              + ("%.1f" % result["speedup"]) + "x faster")
+
+
+if __name__ == "__main__":
+    main()
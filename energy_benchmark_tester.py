@@ -0,0 +1,65 @@
+"""
+Tester code for energy_benchmark.py
+"""
+import os
+import tempfile
+
+from energy_benchmark import *
+
+
+def test_run_benchmarks():
+    """
+    Runs a series of tests for run_benchmarks
+    :return: (bool) were all tests successful
+    """
+    results = run_benchmarks([1000], repeat=1)
+
+    # check that every function is timed once at the one size
+    assert [result["function"] for result in results] == ["average_month_kwh_data", "parse_energy_data",
+                                                          "income_and_energy_correlate_data",
+                                                          "parse_energy_for_apartments", "energy_efficiency_medians"]
+    for result in results:
+        assert sorted(result) == ["function", "peak_memory_bytes", "rows", "rows_per_second", "seconds"]
+        assert result["rows"] == 1000
+        assert result["seconds"] >= 0
+        assert result["rows_per_second"] is None or result["rows_per_second"] > 0
+        assert result["peak_memory_bytes"] > 0
+
+    # check that the synthetic csvs are kept in a directory that was given, and only there
+    with tempfile.TemporaryDirectory() as temp_dir:
+        results = run_benchmarks([200], repeat=1, data_dir=temp_dir)
+        assert len(results) == 5
+        assert sorted(os.listdir(temp_dir)) == ["energy-usage-200.csv", "socioeconomic.csv"]
+
+    return True
+
+
+def test_benchmark_line():
+    """
+    Runs a series of tests for benchmark_line
+    :return: (bool) were all tests successful
+    """
+    result = {"function": "parse_energy_data", "rows": 1000, "seconds": 0.5, "rows_per_second": 2000.0,
+              "peak_memory_bytes": 4096}
+    line = benchmark_line(result)
+    assert line.split() == ["parse_energy_data", "1000", "rows", "0.5000", "s", "2000", "rows/s", "4", "KiB"]
+
+    # check that a call too fast to time is shown without rows per second
+    result["seconds"], result["rows_per_second"] = 0.0, None
+    line = benchmark_line(result)
+    assert line.split() == ["parse_energy_data", "1000", "rows", "0.0000", "s", "-", "rows/s", "4", "KiB"]
+    assert len(line) == len(benchmark_line(dict(result, rows_per_second=2000.0)))
+
+    return True
+
+
+def main():
+    """
+    For testing purposes
+    """
+    print("test run_benchmarks ... " + "PASS" if test_run_benchmarks() else "FAIL")
+    print("test benchmark_line ... " + "PASS" if test_benchmark_line() else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
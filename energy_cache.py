@@ -0,0 +1,210 @@
+"""
+    Binary cache of the parsed columns of the Chicago energy usage csvs
+
+    The first time an energy csv is loaded, its columns are saved next to it in a directory of .npy files. Later loads
+    of the same file memory-map those arrays instead of parsing the csv text again. The cache is keyed on the size,
+    modification time and content hash of the csv and is rebuilt automatically when the csv changes. Results that are
+    slow to compute from the columns, such as the monthly load profiles of the community areas, are saved in the same
+    directory so that they are dropped along with the columns when the csv changes.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from energy_columns import load_energy_columns
+from energy_parallel import load_energy_columns_parallel
+from energy_periods import community_month_profiles
+
+# bump this whenever the layout of the cached columns changes so that old caches are rebuilt
+CACHE_VERSION = 3
+
+# the cache of "energy-usage-2010.csv" is the directory "energy-usage-2010.csv.cache"
+CACHE_SUFFIX = ".cache"
+
+# the columns saved as .npy arrays and the columns saved in the metadata file
+_ARRAY_COLUMNS = ["community", "building_type", "building_subtype", "month_kwh", "total_kwh", "sq_ft", "population",
+                  "stories"]
+_METADATA_COLUMNS = ["community_names", "building_types", "building_subtypes"]
+
+_METADATA_FNAME = "metadata.json"
+
+# the community load profiles saved in the cache directory, and their arrays
+_PROFILES_FNAME = "community_month_profiles.npz"
+_PROFILE_ARRAYS = ["names", "total", "count", "mean"]
+
+
+def cache_path(fname):
+    """
+    Takes the name of an energy csv and returns the name of the directory its cache is kept in
+    :param fname: (str) name of a csv file containing Chicago building energy data
+    :return: (str) name of the cache directory
+    """
+    return fname + CACHE_SUFFIX
+
+
+def file_hash(fname):
+    """
+    Takes the name of a file and returns a hash of its contents
+    :param fname: (str) name of a file
+    :return: (str) the hex sha256 digest of the file
+    """
+    digest = hashlib.sha256()
+    with open(fname, "rb") as file_in:
+        for block in iter(lambda: file_in.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_metadata(cache_dir):
+    """
+    Takes the name of a cache directory and returns its metadata, or None if there is no usable cache there
+    :param cache_dir: (str) name of the cache directory
+    :return: (dict) the metadata of the cache, or None
+    """
+    try:
+        with open(os.path.join(cache_dir, _METADATA_FNAME), "r") as file_in:
+            metadata = json.load(file_in)
+    except (OSError, ValueError):
+        return None
+
+    if metadata.get("version") != CACHE_VERSION:
+        return None
+    return metadata
+
+
+def _write_metadata(cache_dir, metadata):
+    """
+    Writes the metadata of a cache into its directory
+    :param cache_dir: (str) name of the cache directory
+    :param metadata: (dict) the metadata of the cache
+    """
+    with open(os.path.join(cache_dir, _METADATA_FNAME), "w") as file_out:
+        json.dump(metadata, file_out)
+
+
+def _read_columns(cache_dir, metadata):
+    """
+    Takes a cache directory and its metadata and returns the cached columns, with the arrays memory-mapped
+    :param cache_dir: (str) name of the cache directory
+    :param metadata: (dict) the metadata of the cache
+    :return: (dict) the columns of the csv, see energy_columns.load_energy_columns
+    """
+    columns = {}
+    for name in _ARRAY_COLUMNS:
+        columns[name] = np.load(os.path.join(cache_dir, name + ".npy"), mmap_mode="r")
+    for name in _METADATA_COLUMNS:
+        columns[name] = metadata[name]
+    return columns
+
+
+def _write_columns(cache_dir, columns, metadata):
+    """
+    Saves the columns of a csv into a new cache directory, replacing any old cache there
+    :param cache_dir: (str) name of the cache directory
+    :param columns: (dict) the columns of the csv, see energy_columns.load_energy_columns
+    :param metadata: (dict) the size, modification time and hash of the csv
+    """
+    # write everything into a temporary directory first so that a half-written cache is never read
+    parent_dir = os.path.dirname(os.path.abspath(cache_dir))
+    temp_dir = tempfile.mkdtemp(prefix=".energy-cache-", dir=parent_dir)
+    try:
+        for name in _ARRAY_COLUMNS:
+            np.save(os.path.join(temp_dir, name + ".npy"), np.ascontiguousarray(columns[name]))
+        for name in _METADATA_COLUMNS:
+            metadata[name] = columns[name]
+        _write_metadata(temp_dir, metadata)
+
+        # swap the new cache in for the old one
+        if os.path.isdir(cache_dir):
+            shutil.rmtree(cache_dir)
+        os.replace(temp_dir, cache_dir)
+    except OSError:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+
+
+def load_energy_columns_cached(fname, workers=1):
+    """
+    Takes a csv file of Chicago building energy data and returns the columns that the analysis uses, reading them from
+    the binary cache next to the file when the file has not changed, and parsing the file and saving the cache
+    otherwise
+    :param fname: (str) name of a csv file containing Chicago building energy data
+    :param workers: (int) the number of worker processes parsing byte ranges of the file when it has to be parsed, see
+    energy_parallel, or 1 to parse it in this process
+    :return: (dict) the columns of the file, see energy_columns.load_energy_columns
+    """
+    cache_dir = cache_path(fname)
+    file_stat = os.stat(fname)
+    metadata = _read_metadata(cache_dir)
+
+    if metadata is not None and metadata["size"] == file_stat.st_size:
+
+        # the same size and modification time: the file has not changed
+        if metadata["mtime_ns"] == file_stat.st_mtime_ns:
+            return _read_columns(cache_dir, metadata)
+
+        # the file was touched but its contents are the same: remember the new modification time
+        if metadata["sha256"] == file_hash(fname):
+            metadata["mtime_ns"] = file_stat.st_mtime_ns
+            try:
+                _write_metadata(cache_dir, metadata)
+            except OSError:
+                pass
+            return _read_columns(cache_dir, metadata)
+
+    # the file is new or has changed: parse it, hashing it in the same read when it is parsed in this process, and
+    # rebuild the cache
+    if workers > 1:
+        columns = load_energy_columns_parallel(fname, workers)
+        sha256 = file_hash(fname)
+    else:
+        digest = hashlib.sha256()
+        columns = load_energy_columns(fname, digest=digest)
+        sha256 = digest.hexdigest()
+    metadata = {"version": CACHE_VERSION, "size": file_stat.st_size, "mtime_ns": file_stat.st_mtime_ns,
+                "sha256": sha256}
+    try:
+        _write_columns(cache_dir, columns, metadata)
+    except OSError:
+        # the cache is only a speed-up, so a directory that can't be written to just means parsing every time
+        pass
+
+    return columns
+
+
+def load_community_month_profiles_cached(fname):
+    """
+    Takes a csv file of Chicago building energy data and returns the total and mean KWH of every month in every
+    community area, reading them from the cache directory of the file when the file has not changed, and computing
+    and saving them otherwise
+    :param fname: (str) name of a csv file containing Chicago building energy data
+    :return: (dict) the monthly load profiles of the communities, see energy_periods.community_month_profiles
+    """
+    # loading the columns first rebuilds the cache directory, and drops old profiles, if the file has changed
+    columns = load_energy_columns_cached(fname)
+    profiles_fname = os.path.join(cache_path(fname), _PROFILES_FNAME)
+    try:
+        with np.load(profiles_fname) as saved:
+            profiles = {name: saved[name] for name in _PROFILE_ARRAYS}
+        profiles["names"] = profiles["names"].tolist()
+        return profiles
+    except (OSError, KeyError, ValueError):
+        pass
+
+    profiles = community_month_profiles(columns)
+    try:
+        # write to a temporary file first so that a half-written file is never read
+        temp_fd, temp_fname = tempfile.mkstemp(dir=cache_path(fname), suffix=".npz")
+        with os.fdopen(temp_fd, "wb") as file_out:
+            np.savez(file_out, names=np.array(profiles["names"], dtype=str), total=profiles["total"],
+                     count=profiles["count"], mean=profiles["mean"])
+        os.replace(temp_fname, profiles_fname)
+    except OSError:
+        # the cache is only a speed-up
+        pass
+
+    return profiles
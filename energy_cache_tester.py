@@ -0,0 +1,96 @@
+"""
+Tester code for energy_cache.py
+"""
+import os
+import shutil
+import tempfile
+
+from energy_cache import *
+from energy_cache import _read_metadata
+from energy_synthetic import write_energy_csv
+
+
+def test_load_energy_columns_cached():
+    """
+    Runs a series of tests for load_energy_columns_cached
+    :return: (bool) were all tests successful
+    """
+    # work on a synthetic csv in a temporary directory so that its cache can be changed freely
+    temp_dir = tempfile.mkdtemp()
+    fname = os.path.join(temp_dir, "energy-usage-2010.csv")
+    write_energy_csv(fname, 500)
+
+    try:
+        parsed = load_energy_columns(fname)
+
+        # check that the first load writes the cache and returns the parsed columns
+        cold = load_energy_columns_cached(fname)
+        assert os.path.isdir(cache_path(fname))
+        assert np.array_equal(cold["total_kwh"], parsed["total_kwh"], equal_nan=True)
+
+        # check that the second load memory-maps the cached arrays
+        warm = load_energy_columns_cached(fname)
+        assert type(warm["month_kwh"]) == np.memmap
+        assert np.array_equal(warm["month_kwh"], parsed["month_kwh"], equal_nan=True)
+        assert warm["community_names"] == parsed["community_names"]
+
+        # check that changing the file rebuilds the cache
+        first_line = open(fname, "r").readlines()[1]
+        file_out = open(fname, "a")
+        file_out.write(first_line)
+        file_out.close()
+        changed = load_energy_columns_cached(fname)
+        assert len(changed["total_kwh"]) == len(parsed["total_kwh"]) + 1
+
+        # check that a file parsed by worker processes is cached the same as one parsed in this process
+        write_energy_csv(fname, 12000)
+        parallel = load_energy_columns_cached(fname, workers=4)
+        parsed = load_energy_columns(fname)
+        assert np.array_equal(parallel["month_kwh"], parsed["month_kwh"], equal_nan=True)
+        assert [parallel["community_names"][code] for code in parallel["community"]] == \
+            [parsed["community_names"][code] for code in parsed["community"]]
+        warm = load_energy_columns_cached(fname)
+        assert type(warm["month_kwh"]) == np.memmap
+        assert _read_metadata(cache_path(fname))["sha256"] == file_hash(fname)
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return True
+
+
+def test_load_community_month_profiles_cached():
+    """
+    Runs a series of tests for load_community_month_profiles_cached
+    :return: (bool) were all tests successful
+    """
+    temp_dir = tempfile.mkdtemp()
+    fname = os.path.join(temp_dir, "energy-usage-2010.csv")
+    write_energy_csv(fname, 500)
+
+    try:
+        # check that the first load saves the profiles and the second reads the same profiles back
+        cold = load_community_month_profiles_cached(fname)
+        assert os.path.isfile(os.path.join(cache_path(fname), "community_month_profiles.npz"))
+        warm = load_community_month_profiles_cached(fname)
+        assert warm["names"] == cold["names"]
+        assert warm["total"].tolist() == cold["total"].tolist()
+        assert warm["total"].shape == (len(warm["names"]), 12)
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return True
+
+
+def main():
+    """
+    For testing purposes
+    """
+    print("test load_energy_columns_cached ... " + "PASS" if test_load_energy_columns_cached() else "FAIL")
+    print("test load_community_month_profiles_cached ... " + "PASS" if test_load_community_month_profiles_cached()
+          else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
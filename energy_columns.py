@@ -0,0 +1,373 @@
+"""
+    Columnar loader for the Chicago energy usage csvs
+
+    This module turns a Chicago energy usage csv into NumPy arrays, one per column that the analysis uses, so that the
+    monthly averages, the per-person energy use of residential buildings and the energy efficiency of multi-family
+    buildings can be computed as masked vector operations instead of line by line.
+"""
+from itertools import islice
+
+import numpy as np
+
+from csv_columns import column_picker, split_csv_text
+from energy_groups import QUANTILES, group_reduce, split_by_group
+
+# the positions of the columns of the 2010 energy csv that the analysis uses, used when a column's title isn't found
+COMMUNITY_INDEX = 0
+BUILDING_TYPE_INDEX = 2
+BUILDING_SUBTYPE_INDEX = 3
+MONTH_INDICES = range(4, 16)
+TOTAL_KWH_INDEX = 16
+SQ_FT_INDEX = 33
+POPULATION_INDEX = 63
+STORIES_INDEX = 65
+
+# the number of lines of an energy csv that are parsed at a time
+CHUNK_ROWS = 5000
+
+# the building sub-types compared in question 3, as [high-rise, low-rise]
+MULTI_FAMILY_SUBTYPES = ["Multi 7+", "Multi < 7"]
+
+# the columns buildings can be grouped by, and the column of the name of each of their codes
+GROUP_COLUMNS = {"building_subtype": "building_subtypes", "building_type": "building_types",
+                 "community": "community_names"}
+
+MONTH_NAMES = ["JANUARY", "FEBRUARY", "MARCH", "APRIL", "MAY", "JUNE", "JULY", "AUGUST", "SEPTEMBER", "OCTOBER",
+               "NOVEMBER", "DECEMBER"]
+
+# the used columns, in the order they are picked from each line, as (titles, title prefixes, default position). The
+# month columns are found by prefix so that the files of every year match
+ENERGY_COLUMNS = ([(["COMMUNITY AREA NAME"], [], COMMUNITY_INDEX),
+                   (["BUILDING TYPE"], [], BUILDING_TYPE_INDEX),
+                   (["BUILDING SUBTYPE"], [], BUILDING_SUBTYPE_INDEX)]
+                  + [([], ["KWH " + month_name], month_index)
+                     for month_name, month_index in zip(MONTH_NAMES, MONTH_INDICES)]
+                  + [(["TOTAL KWH"], [], TOTAL_KWH_INDEX),
+                     (["KWH TOTAL SQFT"], [], SQ_FT_INDEX),
+                     (["TOTAL POPULATION"], [], POPULATION_INDEX),
+                     (["AVERAGE STORIES"], [], STORIES_INDEX)])
+
+
+# the number of number-valued columns picked from each line: the twelve months, total KWH, square feet, population
+# and average stories
+_NUMBER_COLUMNS = len(MONTH_INDICES) + 4
+
+_NAN = float("nan")
+
+
+def _categorical_column(rows, position):
+    """
+    Takes the picked data values of the lines of an energy csv and returns an integer code for each value in one
+    position, along with the names of the codes
+    :param rows: (list) a list of tuples of the used data values of each line, in the order of ENERGY_COLUMNS
+    :param position: (int) position of the categorical column within each tuple
+    :return: (tuple) an int array of codes and a list of the name that each code stands for, in order of appearance
+    """
+    codes_by_name = {}
+    codes = np.array([codes_by_name.setdefault(row[position], len(codes_by_name)) for row in rows], dtype=np.int32)
+    return codes, list(codes_by_name)
+
+
+def columns_from_rows(rows):
+    """
+    Takes the used data values of the lines of an energy csv and returns them as a dictionary of columns
+    :param rows: (list) a list of tuples of the used data values of each line, in the order of ENERGY_COLUMNS
+    :return: (dict) the columns of the file, see load_energy_columns
+    """
+    community, community_names = _categorical_column(rows, 0)
+    building_type, building_types = _categorical_column(rows, 1)
+    building_subtype, building_subtypes = _categorical_column(rows, 2)
+
+    # convert every number in one go, with empty data values as nan, and lay them out one row per building
+    numbers = np.array([float(value) if value else _NAN for row in rows for value in row[3:]], dtype=np.float64)
+    numbers = numbers.reshape(len(rows), _NUMBER_COLUMNS)
+    month_count = len(MONTH_INDICES)
+
+    return {
+        "community": community,
+        "community_names": community_names,
+        "building_type": building_type,
+        "building_types": building_types,
+        "building_subtype": building_subtype,
+        "building_subtypes": building_subtypes,
+        "month_kwh": np.ascontiguousarray(numbers[:, :month_count]),
+        "total_kwh": numbers[:, month_count].copy(),
+        "sq_ft": numbers[:, month_count + 1].copy(),
+        "population": numbers[:, month_count + 2].copy(),
+        "stories": numbers[:, month_count + 3].copy(),
+    }
+
+
+def energy_column_picker(column_titles_line):
+    """
+    Takes the first line of an energy csv and returns a function that pulls the used columns out of the data values
+    of a line
+    :param column_titles_line: (str) the line of column titles
+    :return: (function) a function that takes the data values of a line and returns a tuple of the used data values,
+    in the order of ENERGY_COLUMNS
+    """
+    column_titles = split_csv_text(column_titles_line.replace("\r\n", "\n"))
+    return column_picker(column_titles[0] if column_titles else [], ENERGY_COLUMNS)
+
+
+def read_column_titles_line(fname):
+    """
+    Takes a csv file and returns its first line
+    :param fname: (str) name of a csv file
+    :return: (str) the line of column titles
+    """
+    file_in = open(fname, "rb")
+    column_titles_line = file_in.readline()
+    file_in.close()
+    return column_titles_line.decode("utf-8")
+
+
+def columns_from_text(text, pick_columns):
+    """
+    Takes lines of an energy csv, without the column titles, and returns the columns that the analysis uses
+    :param text: (str) lines of the file, separated by "\n"
+    :param pick_columns: (function) pulls the used data values out of a line, see energy_column_picker
+    :return: (dict) the columns of the lines, see load_energy_columns
+    """
+    # keep only the used data values of each line, skipping the whitespace line at the end of the file
+    lines = split_csv_text(text)
+    rows = [pick_columns(data_lst) for data_lst in lines]
+
+    return columns_from_rows(rows)
+
+
+def iter_energy_chunks(fname, chunk_rows=CHUNK_ROWS, digest=None):
+    """
+    Takes a csv file of Chicago building energy data and yields the columns that the analysis uses, one block of lines
+    at a time, so that only one block of the file is ever held in memory
+    :param fname: (str) name of a csv file containing Chicago building energy data
+    :param chunk_rows: (int) the number of lines in each block
+    :param digest: (hashlib hash) if given, every byte of the file is fed to it as the file is read
+    :return: (generator) dictionaries of the columns of each block, see load_energy_columns. The codes of the
+    categorical columns are only meaningful within their own block
+    """
+    # open the file
+    file_in = open(fname, "rb")
+
+    # find the used columns from the first line of the file, which only includes the column titles
+    column_titles_line = file_in.readline()
+    if digest is not None:
+        digest.update(column_titles_line)
+    pick_columns = energy_column_picker(column_titles_line.decode("utf-8"))
+
+    try:
+        while True:
+            block = b"".join(islice(file_in, chunk_rows))
+            if not block:
+                break
+            if digest is not None:
+                digest.update(block)
+
+            columns = columns_from_text(block.decode("utf-8").replace("\r\n", "\n"), pick_columns)
+            if len(columns["total_kwh"]):
+                yield columns
+
+    # close the file, even if the caller stops early
+    finally:
+        file_in.close()
+
+
+def _merge_category_codes(chunk_codes, chunk_names, codes_by_name):
+    """
+    Takes the codes of a categorical column of one block and returns them as codes shared by every block
+    :param chunk_codes: (array) int codes of the block
+    :param chunk_names: (list) the name that each code of the block stands for
+    :param codes_by_name: (dict) a dictionary of {name: shared code}, which new names are added to
+    :return: (array) the shared int codes of the block
+    """
+    lookup = np.array([codes_by_name.setdefault(name, len(codes_by_name)) for name in chunk_names], dtype=np.int32)
+    return lookup[chunk_codes]
+
+
+def concatenate_columns(chunks):
+    """
+    Takes the columns of consecutive blocks of an energy csv and returns them as the columns of the whole file
+    :param chunks: (iterable) dictionaries of the columns of each block, see iter_energy_chunks
+    :return: (dict) the columns of the whole file, see load_energy_columns
+    """
+    categorical = [("community", "community_names"), ("building_type", "building_types"),
+                   ("building_subtype", "building_subtypes")]
+    numeric = ["month_kwh", "total_kwh", "sq_ft", "population", "stories"]
+
+    # collect the arrays of every block, giving the categorical columns codes shared by every block
+    codes_by_name = {}
+    for codes_name, names_name in categorical:
+        codes_by_name[codes_name] = {}
+    pieces = {}
+    for name in [codes_name for codes_name, names_name in categorical] + numeric:
+        pieces[name] = []
+
+    for chunk in chunks:
+        for codes_name, names_name in categorical:
+            pieces[codes_name].append(_merge_category_codes(chunk[codes_name], chunk[names_name],
+                                                            codes_by_name[codes_name]))
+        for name in numeric:
+            pieces[name].append(chunk[name])
+
+    # an empty file still has columns, just with no buildings in them
+    if not pieces["total_kwh"]:
+        return columns_from_rows([])
+
+    columns = {}
+    for codes_name, names_name in categorical:
+        columns[codes_name] = np.concatenate(pieces[codes_name])
+        columns[names_name] = list(codes_by_name[codes_name])
+    for name in numeric:
+        columns[name] = np.concatenate(pieces[name])
+    return columns
+
+
+def load_energy_columns(fname, chunk_rows=CHUNK_ROWS, digest=None):
+    """
+    Takes a csv file of Chicago building energy data and returns the columns that the analysis uses as NumPy arrays.
+    The file is read one block of lines at a time, so only the arrays and a single block are held in memory
+    :param fname: (str) name of a csv file containing Chicago building energy data
+    :param chunk_rows: (int) the number of lines read at a time
+    :param digest: (hashlib hash) if given, every byte of the file is fed to it as the file is read
+    :return: (dict) a dictionary of columns with one entry per building:
+        "community", "building_type", "building_subtype": (array) int codes of the community name, building type and
+            building sub-type, whose names are listed in "community_names", "building_types" and "building_subtypes"
+        "month_kwh": (array) a float64 matrix of the KWH used in each month, January through December
+        "total_kwh", "sq_ft", "population", "stories": (array) float64 arrays of the total KWH, square feet,
+            population and average stories
+    Empty data values are nan.
+    """
+    return concatenate_columns(iter_energy_chunks(fname, chunk_rows, digest))
+
+
+def category_mask(codes, names, wanted):
+    """
+    Takes an array of categorical codes and returns which entries are one of the wanted names
+    :param codes: (array) int codes of a categorical column
+    :param names: (list) the name that each code stands for
+    :param wanted: (list) the names to keep
+    :return: (array) a boolean array that is True where the entry is one of the wanted names
+    """
+    wanted_codes = [code for code, name in enumerate(names) if name in wanted]
+    return np.isin(codes, wanted_codes)
+
+
+def month_kwh_totals(columns):
+    """
+    Takes the columns of an energy csv, or of a block of one, and returns the sums and counts behind the average KWH
+    usage of every month, so that the blocks of a file can be added up before the averages are taken
+    :param columns: (dict) the columns of an energy csv, see load_energy_columns
+    :return: (tuple) a float64 array of the twelve month sums of KWH and an int64 array of the number of buildings
+    with a KWH value in each month, January through December
+    """
+    month_kwh = columns["month_kwh"]
+    return np.nansum(month_kwh, axis=0), np.count_nonzero(~np.isnan(month_kwh), axis=0).astype(np.int64)
+
+
+def month_kwh_averages_from_totals(kwh_sums, kwh_counts):
+    """
+    Takes the month sums and counts of an energy csv and returns the average KWH usage of a building in every month
+    :param kwh_sums: (array) the twelve month sums of KWH, see month_kwh_totals
+    :param kwh_counts: (array) the number of buildings with a KWH value in each month, see month_kwh_totals
+    :return: (dict) a dictionary of {int(month column index): int(average KWH used in Chicago during that month)}, 0
+    for a month without any values
+    """
+    month_averages = {}
+    for month, month_index in enumerate(MONTH_INDICES):
+        month_averages[month_index] = int(kwh_sums[month] / kwh_counts[month]) if kwh_counts[month] else 0
+    return month_averages
+
+
+def month_kwh_averages(columns):
+    """
+    Takes the columns of an energy csv and returns the average KWH usage of a building in every month: the sum of
+    the month's KWH values divided by the number of buildings with a value, with empty data values left out
+    :param columns: (dict) the columns of an energy csv, see load_energy_columns
+    :return: (dict) a dictionary of {int(month column index): int(average KWH used in Chicago during that month)}
+    """
+    return month_kwh_averages_from_totals(*month_kwh_totals(columns))
+
+
+def residential_kwh_per_person_mask(columns):
+    """
+    Takes the columns of an energy csv and returns which buildings are residential buildings with a community name,
+    a total KWH and a population
+    :param columns: (dict) the columns of an energy csv, see load_energy_columns
+    :return: (array) a boolean array that is True for every building used in the per-person energy analysis
+    """
+    community_names = np.asarray(columns["community_names"], dtype=str)
+    return (category_mask(columns["building_type"], columns["building_types"], ["Residential"])
+            & (community_names[columns["community"]] != "")
+            & (np.nan_to_num(columns["total_kwh"]) != 0)
+            & (np.nan_to_num(columns["population"]) != 0))
+
+
+def residential_kwh_per_person(columns):
+    """
+    Takes the columns of an energy csv and returns the annual energy usage per person of every residential building
+    :param columns: (dict) the columns of an energy csv, see load_energy_columns
+    :return: (tuple) an int array of community codes and a float64 array of KWH per person, one entry per residential
+    building in file order
+    """
+    mask = residential_kwh_per_person_mask(columns)
+    return columns["community"][mask], columns["total_kwh"][mask] / columns["population"][mask]
+
+
+def kwh_per_sq_ft_mask(columns, building_types=("Residential",)):
+    """
+    Takes the columns of an energy csv and returns which buildings have 1 or more floors, a total KWH and a square
+    footage, so that their energy efficiency can be computed
+    :param columns: (dict) the columns of an energy csv, see load_energy_columns
+    :param building_types: (list) the building types to keep, or None to keep every building type
+    :return: (array) a boolean array that is True for every building used in the energy efficiency analysis
+    """
+    usable = ((columns["stories"] >= 1)
+              & (np.nan_to_num(columns["total_kwh"]) != 0)
+              & (np.nan_to_num(columns["sq_ft"]) != 0))
+    if building_types is not None:
+        usable &= category_mask(columns["building_type"], columns["building_types"], building_types)
+    return usable
+
+
+def kwh_per_sq_ft_by_group(columns, group_column="building_subtype", building_types=("Residential",),
+                           quantiles=QUANTILES):
+    """
+    Takes the columns of an energy csv and returns the count, sum, mean, median and quantiles of the energy
+    efficiency (KWH/sq feet) of the buildings in every group, such as every building sub-type or community area
+    :param columns: (dict) the columns of an energy csv, see load_energy_columns
+    :param group_column: (str) the column to group by, one of GROUP_COLUMNS
+    :param building_types: (list) the building types to keep, or None to keep every building type
+    :param quantiles: (list) the quantiles to compute for every group, between 0 and 1
+    :return: (dict) the statistics of every group, see energy_groups.group_reduce, and "names": (list) the name of
+    every group, in code order
+    """
+    usable = kwh_per_sq_ft_mask(columns, building_types)
+    group_names = columns[GROUP_COLUMNS[group_column]]
+
+    group_stats = group_reduce(columns[group_column][usable], columns["total_kwh"][usable] / columns["sq_ft"][usable],
+                               len(group_names), quantiles)
+    group_stats["names"] = list(group_names)
+    return group_stats
+
+
+def multi_family_kwh_per_sq_ft(columns):
+    """
+    Takes the columns of an energy csv and returns the energy efficiency of the multi-family residential buildings
+    with 1 or more floors
+    :param columns: (dict) the columns of an energy csv, see load_energy_columns
+    :return: (list) a list of float64 arrays of energy efficiency values (KWH/sq feet), one per sub-type in
+    MULTI_FAMILY_SUBTYPES
+    """
+    usable = kwh_per_sq_ft_mask(columns)
+    subtype_names = columns["building_subtypes"]
+    subtype_values = split_by_group(columns["building_subtype"][usable],
+                                    columns["total_kwh"][usable] / columns["sq_ft"][usable], len(subtype_names))
+
+    # the two multi-family groups of the split, in the order of MULTI_FAMILY_SUBTYPES
+    efficiency_arrays = []
+    for subtype in MULTI_FAMILY_SUBTYPES:
+        if subtype in subtype_names:
+            efficiency_arrays.append(subtype_values[subtype_names.index(subtype)])
+        else:
+            efficiency_arrays.append(np.empty(0, dtype=np.float64))
+    return efficiency_arrays
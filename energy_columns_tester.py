@@ -0,0 +1,126 @@
+"""
+Tester code for energy_columns.py
+"""
+import os
+import shutil
+import tempfile
+
+from conftest import write_small_energy_csv
+from energy_columns import *
+from energy_synthetic import write_energy_csv
+
+
+def test_load_energy_columns():
+    """
+    Runs a series of tests for load_energy_columns
+    :return: (bool) were all tests successful
+    """
+    temp_dir = tempfile.mkdtemp()
+    try:
+        fname = os.path.join(temp_dir, "energy-usage-2010.csv")
+        write_energy_csv(fname, 500)
+        columns = load_energy_columns(fname)
+
+        # check that every column has one entry per building
+        assert len(columns["community"]) == 500
+        assert columns["month_kwh"].shape == (500, 12)
+        for name in ["building_type", "building_subtype", "total_kwh", "sq_ft", "population", "stories"]:
+            assert len(columns[name]) == 500
+
+        # check the types of the columns
+        assert columns["month_kwh"].dtype == np.float64
+        assert columns["total_kwh"].dtype == np.float64
+        assert type(columns["community_names"][0]) == str
+
+        # check the values of the hand-written buildings, with empty cells as nan
+        columns = load_energy_columns(write_small_energy_csv(os.path.join(temp_dir, "energy-small.csv")))
+        assert [columns["community_names"][code] for code in columns["community"]] == [
+            "Ashburn", "Uptown", "Rogers Park", "Hyde Park", ""]
+        assert columns["month_kwh"][:, 0].tolist()[:2] == [100.0, 57.0] and np.isnan(columns["month_kwh"][2]).all()
+        assert columns["total_kwh"].tolist() == [10258.0, 3000.0, 5000.0, 0.0, 700.0]
+        assert np.isnan(columns["population"][1]) and np.isnan(columns["stories"][4])
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return True
+
+
+def test_month_kwh_averages():
+    """
+    Runs a series of tests for month_kwh_averages
+    :return: (bool) were all tests successful
+    """
+    temp_dir = tempfile.mkdtemp()
+    try:
+        fname = os.path.join(temp_dir, "energy-usage-2010.csv")
+        write_energy_csv(fname, 2000)
+        month_averages = month_kwh_averages(load_energy_columns(fname))
+
+        # check accuracy against a scan of the text: the sum of the values of a month column divided by the number of
+        # buildings with a value, leaving out the empty data values
+        lines = [line.split(",") for line in open(fname).read().splitlines()[1:]]
+        for month_index in [4, 10]:
+            month_values = [int(data_lst[month_index]) for data_lst in lines if data_lst[month_index]]
+            assert month_averages[month_index] == int(sum(month_values) / len(month_values))
+
+        # check the hand-written buildings, of which three have KWH values: (100 + 57 + 31) / 3
+        small_averages = month_kwh_averages(load_energy_columns(
+            write_small_energy_csv(os.path.join(temp_dir, "energy-small.csv"))))
+        assert small_averages[4] == 62 and small_averages[15] == 62
+
+        # check type
+        assert type(month_averages[4]) == int
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return True
+
+
+def test_residential_kwh_per_person():
+    """
+    Runs a series of tests for residential_kwh_per_person
+    :return: (bool) were all tests successful
+    """
+    temp_dir = tempfile.mkdtemp()
+    try:
+        # only buildings with all necessary data are kept
+        columns = load_energy_columns(write_small_energy_csv(os.path.join(temp_dir, "energy-small.csv")))
+        community_codes, kwh_per_person = residential_kwh_per_person(columns)
+        assert [columns["community_names"][code] for code in community_codes] == ["Ashburn"]
+        assert kwh_per_person.tolist() == [732.7142857142857]
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return True
+
+
+def test_multi_family_kwh_per_sq_ft():
+    """
+    Runs a series of tests for multi_family_kwh_per_sq_ft
+    :return: (bool) were all tests successful
+    """
+    temp_dir = tempfile.mkdtemp()
+    try:
+        columns = load_energy_columns(write_small_energy_csv(os.path.join(temp_dir, "energy-small.csv")))
+        efficiency_arrays = multi_family_kwh_per_sq_ft(columns)
+
+        # check accuracy, as [high-rise, low-rise], leaving out the building without stories
+        assert [array.tolist() for array in efficiency_arrays] == [[10258 / 5000], [3.0]]
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return True
+
+
+def main():
+    """
+    For testing purposes
+    """
+    print("test load_energy_columns ... " + "PASS" if test_load_energy_columns() else "FAIL")
+    print("test month_kwh_averages ... " + "PASS" if test_month_kwh_averages() else "FAIL")
+    print("test residential_kwh_per_person ... " + "PASS" if test_residential_kwh_per_person() else "FAIL")
+    print("test multi_family_kwh_per_sq_ft ... " + "PASS" if test_multi_family_kwh_per_sq_ft() else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
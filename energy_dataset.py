@@ -0,0 +1,154 @@
+"""
+    A parsed Chicago energy usage csv shared by every question of the analysis
+
+    An EnergyDataset reads its energy csv once (or memory-maps its binary cache) and keeps the columns the analysis
+    uses in memory. The seasonal averages of question 1, the per-person energy use of question 2 and the multi-family
+    efficiency of question 3 are all computed from those columns, so a full run of the analysis reads the file once.
+"""
+from community_join import join_income_and_energy
+from energy_cache import load_energy_columns_cached
+from energy_columns import (MONTH_INDICES, kwh_per_sq_ft_by_group, month_kwh_averages, multi_family_kwh_per_sq_ft,
+                            residential_kwh_per_person)
+from energy_periods import PeriodIndex, community_month_profiles
+from quantile_sketch import QuantileSketch
+
+
+class EnergyDataset:
+    """
+    The columns of one Chicago energy usage csv, parsed once, and the results of every question computed from them
+    """
+
+    def __init__(self, fname, columns=None, workers=1):
+        """
+        Takes a csv file of Chicago building energy data and parses it, or reads it from its binary cache
+        :param fname: (str) name of a csv file containing Chicago building energy data
+        :param columns: (dict) the already parsed columns of the file, see energy_columns.load_energy_columns
+        :param workers: (int) the number of worker processes parsing the file when it isn't cached, see
+        energy_cache.load_energy_columns_cached
+        """
+        self.fname = fname
+        if columns is None:
+            columns = load_energy_columns_cached(fname, workers)
+        self.columns = columns
+        self._month_averages = None
+        self._multi_family_sketches = None
+        self._period_indexes = {}
+
+    def __len__(self):
+        """
+        :return: (int) the number of buildings in the file
+        """
+        return len(self.columns["total_kwh"])
+
+    def month_averages(self):
+        """
+        Returns the average KWH usage of every month of the file
+        :return: (dict) a dictionary of {int(month column index): int(average KWH used in Chicago during that month)}
+        """
+        if self._month_averages is None:
+            self._month_averages = month_kwh_averages(self.columns)
+        return dict(self._month_averages)
+
+    def average_month_kwh(self, list_index_of_month):
+        """
+        Returns the average KWH usage of one month
+        :param list_index_of_month: (int) index of the month column that data is wanted for
+        :return: (int) the average KWH used in Chicago during the month specified
+        """
+        return self.month_averages()[list_index_of_month]
+
+    def average_energy_list(self):
+        """
+        Returns a list of the average energy for each month of the year
+        :return: (list) a list of average energies, January through December
+        """
+        month_averages = self.month_averages()
+        return [month_averages[month_index] for month_index in MONTH_INDICES]
+
+    def community_month_profiles(self):
+        """
+        Returns the total and mean KWH of every month in every community area
+        :return: (dict) the monthly load profiles of the communities, see energy_periods.community_month_profiles
+        """
+        return community_month_profiles(self.columns)
+
+    def average_season_kwh(self, month_1_index, month_2_index, month_3_index):
+        """
+        Returns the average KWH energy usage over three months
+        :param month_1_index: (int) index of the first month that data is wanted for
+        :param month_2_index: (int) index of the second month that data is wanted for
+        :param month_3_index: (int) index of the third month that data is wanted for
+        :return: (int) the average KWH usage over the three months inputted
+        """
+        month_averages = self.month_averages()
+        return int((month_averages[month_1_index] + month_averages[month_2_index] + month_averages[month_3_index])/3)
+
+    def period_index(self, group_column=None):
+        """
+        Returns the prefix sums of the month totals of the file, from which the KWH usage of any period of months is
+        read in constant time
+        :param group_column: (str) "community", "building_type" or "building_subtype", or None for citywide
+        :return: (PeriodIndex) the period index of every group of the column
+        """
+        if group_column not in self._period_indexes:
+            self._period_indexes[group_column] = PeriodIndex.from_columns(self.columns, group_column)
+        return self._period_indexes[group_column]
+
+    def residential_energy_list(self):
+        """
+        Returns the annual energy usage per person of every residential building that has all the appropriate data
+        :return: (list) a list of tuples with the data (community name, average individual energy use (kw/person) in
+        the residential building)
+        """
+        community_codes, kwh_per_person = residential_kwh_per_person(self.columns)
+        community_names = self.columns["community_names"]
+
+        energy_list = []
+        for community_code, building_kwh_per_person in zip(community_codes.tolist(), kwh_per_person.tolist()):
+            energy_list.append((community_names[community_code], building_kwh_per_person))
+        return energy_list
+
+    def income_and_energy_arrays(self, income_dict):
+        """
+        Returns the community income and annual energy usage per person of every residential building whose community
+        has an income, as two aligned arrays
+        :param income_dict: (dict) a dictionary mapping community name strings to ints representing the average
+        income of the community
+        :return: (tuple) an int64 array of average incomes, a float64 array of energy usages (kw/person), and the int
+        number of residential buildings whose community had no income
+        """
+        community_codes, kwh_per_person = residential_kwh_per_person(self.columns)
+        return join_income_and_energy(income_dict, community_codes, self.columns["community_names"], kwh_per_person)
+
+    def multi_family_efficiency(self):
+        """
+        Returns the energy efficiency of the multi-family residential buildings with 1 or more floors
+        :return: (list) a list of lists containing energy efficiency values (KWH/sq feet) for building sub-types of
+        Multi 7+ and Multi < 7
+        """
+        efficiency_values_list = []
+        for efficiency_array in multi_family_kwh_per_sq_ft(self.columns):
+            efficiency_values_list.append(efficiency_array.tolist())
+        return efficiency_values_list
+
+    def efficiency_by_group(self, group_column="building_subtype", building_types=("Residential",)):
+        """
+        Returns the count, sum, mean, median and quartiles of the energy efficiency of the buildings with 1 or more
+        floors in every group, such as every building sub-type, building type or community area
+        :param group_column: (str) "building_subtype", "building_type" or "community"
+        :param building_types: (list) the building types to keep, or None to keep every building type
+        :return: (dict) the statistics of every group, see energy_columns.kwh_per_sq_ft_by_group
+        """
+        return kwh_per_sq_ft_by_group(self.columns, group_column, building_types)
+
+    def multi_family_sketches(self):
+        """
+        Returns quantile sketches of the energy efficiency of the multi-family residential buildings with 1 or more
+        floors, from which medians and box plots are drawn without sorting the values again
+        :return: (list) a list of quantile sketches of energy efficiency values (KWH/sq feet) for building sub-types of
+        Multi 7+ and Multi < 7
+        """
+        if self._multi_family_sketches is None:
+            self._multi_family_sketches = [QuantileSketch(efficiency_array)
+                                           for efficiency_array in multi_family_kwh_per_sq_ft(self.columns)]
+        return list(self._multi_family_sketches)
@@ -0,0 +1,105 @@
+"""
+Tester code for energy_dataset.py
+"""
+import os
+import shutil
+import tempfile
+
+from conftest import write_small_energy_csv
+from energy_dataset import *
+from energy_stream import stream_month_kwh_averages
+from energy_synthetic import write_energy_csv
+
+
+def test_energy_dataset_question_1():
+    """
+    Runs a series of tests for the question 1 methods of EnergyDataset
+    :return: (bool) were all tests successful
+    """
+    temp_dir = tempfile.mkdtemp()
+    try:
+        fname = os.path.join(temp_dir, "energy-usage-2010.csv")
+        write_energy_csv(fname, 2000)
+        energy_dataset = EnergyDataset(fname)
+
+        # check accuracy against the averages of reading the file a block at a time
+        month_averages = stream_month_kwh_averages(fname, 100)
+        assert energy_dataset.average_month_kwh(4) == month_averages[4]
+        assert energy_dataset.average_month_kwh(10) == month_averages[10]
+        assert energy_dataset.average_season_kwh(4, 5, 15) == int(
+            (month_averages[4] + month_averages[5] + month_averages[15]) / 3)
+        assert energy_dataset.average_season_kwh(9, 10, 11) == int(
+            (month_averages[9] + month_averages[10] + month_averages[11]) / 3)
+
+        # check types
+        assert type(energy_dataset.average_energy_list()) == list
+        assert len(energy_dataset.average_energy_list()) == 12
+        assert type(energy_dataset.average_energy_list()[0]) == int
+
+        # check that a period that wraps around the year is the same as the set of its months
+        period_index = energy_dataset.period_index("community")
+        assert period_index.range_totals(15, 5)["total"].tolist() == period_index.month_set_totals([4, 5, 15])[
+            "total"].tolist()
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return True
+
+
+def test_energy_dataset_question_2():
+    """
+    Runs a series of tests for the question 2 methods of EnergyDataset
+    :return: (bool) were all tests successful
+    """
+    temp_dir = tempfile.mkdtemp()
+    try:
+        # only creates data entries if all necessary data is present
+        small_fname = write_small_energy_csv(os.path.join(temp_dir, "energy-small.csv"))
+        assert EnergyDataset(small_fname).residential_energy_list() == [('Ashburn', 732.7142857142857)]
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return True
+
+
+def test_energy_dataset_question_3():
+    """
+    Runs a series of tests for the question 3 methods of EnergyDataset
+    :return: (bool) were all tests successful
+    """
+    temp_dir = tempfile.mkdtemp()
+    try:
+        energy_dataset = EnergyDataset(write_small_energy_csv(os.path.join(temp_dir, "energy-small.csv")))
+        building_data = energy_dataset.multi_family_efficiency()
+
+        # check accuracy, leaving out the building without stories
+        assert building_data == [[10258 / 5000], [3.0]]
+
+        # check that its a list of lists of floats
+        assert type(building_data[0][0]) == float
+
+        # check that the grouped statistics of the building sub-types include the two multi-family groups
+        group_stats = energy_dataset.efficiency_by_group("building_subtype")
+        for subtype, building_efficiency in zip(["Multi 7+", "Multi < 7"], building_data):
+            assert group_stats["count"][group_stats["names"].index(subtype)] == 1
+            assert group_stats["median"][group_stats["names"].index(subtype)] == building_efficiency[0]
+
+        # check that the sketches give the same medians
+        assert [sketch.median() for sketch in energy_dataset.multi_family_sketches()] == [10258 / 5000, 3.0]
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return True
+
+
+def main():
+    """
+    For testing purposes
+    """
+    print("test EnergyDataset question 1 ... " + "PASS" if test_energy_dataset_question_1() else "FAIL")
+    print("test EnergyDataset question 2 ... " + "PASS" if test_energy_dataset_question_2() else "FAIL")
+    print("test EnergyDataset question 3 ... " + "PASS" if test_energy_dataset_question_3() else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""
+    SQLite storage of the Chicago energy, socioeconomic and grocery store csvs
+
+    Ingesting loads the csvs into one local SQLite file with indexes on community area name, building type and
+    building sub-type, so that each question can pull only the rows it needs with an indexed query instead of scanning
+    the whole csv text. The database remembers the size and modification time of every ingested csv, and the parsers
+    fall back to reading the csv whenever the database has no current copy of it.
+
+    Usage: python energy_db.py DATABASE ENERGY_CSV [ENERGY_CSV ...] [--income SOCIOECONOMIC_CSV]
+           [--grocery GROCERY_CSV]
+"""
+import argparse
+import hashlib
+import math
+import os
+import sqlite3
+
+from csv_columns import find_column, normalize_title, split_csv_text
+from energy_columns import MONTH_INDICES, MULTI_FAMILY_SUBTYPES, load_energy_columns
+
+_MONTH_COLUMNS = ["kwh_" + str(month + 1) for month in range(len(MONTH_INDICES))]
+
+# the tables every database has, which the table of an ingested text csv must never replace
+SCHEMA_TABLES = ["sources", "energy"]
+
+# the table of every ingested text csv starts with this, so that it can't be named like a table of the schema
+TEXT_TABLE_PREFIX = "csv_"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    source TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS energy (
+    row_id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    community TEXT,
+    building_type TEXT,
+    building_subtype TEXT,
+    """ + ",\n    ".join(month_column + " REAL" for month_column in _MONTH_COLUMNS) + """,
+    total_kwh REAL,
+    sq_ft REAL,
+    population REAL,
+    stories REAL
+);
+CREATE INDEX IF NOT EXISTS energy_community ON energy (source, community);
+CREATE INDEX IF NOT EXISTS energy_building_type ON energy (source, building_type, building_subtype);
+"""
+
+
+def source_name(fname):
+    """
+    Takes the name of a csv file and returns the name it is stored under in the database
+    :param fname: (str) name of a csv file
+    :return: (str) the absolute path of the file
+    """
+    return os.path.abspath(fname)
+
+
+def connect(db_fname):
+    """
+    Takes the name of a database file and returns a connection to it, creating its tables if they don't exist yet
+    :param db_fname: (str) name of a SQLite database file
+    :return: (sqlite3.Connection) a connection to the database
+    """
+    connection = sqlite3.connect(db_fname)
+    connection.executescript(_SCHEMA)
+    return connection
+
+
+def _table_name(fname):
+    """
+    Takes the name of a csv file and returns the name of the table its rows are stored in. The name is made from the
+    name of the file and a hash of its absolute path, so that csvs with the same name in different directories are
+    kept in tables of their own
+    :param fname: (str) name of a csv file
+    :return: (str) the table name, such as "csv_socioeconomic_1a2b3c4d"
+    """
+    base_name = os.path.splitext(os.path.basename(fname))[0]
+    path_hash = hashlib.sha1(source_name(fname).encode("utf-8")).hexdigest()[:8]
+    return (TEXT_TABLE_PREFIX + "".join(character if character.isalnum() else "_" for character in base_name).lower()
+            + "_" + path_hash)
+
+
+def _column_name(column_title):
+    """
+    Takes a column title and returns the name of the table column it is stored in
+    :param column_title: (str) a column title, such as "COMMUNITY AREA NAME"
+    :return: (str) the column name, such as "community_area_name"
+    """
+    return normalize_title(column_title).lower().replace(" ", "_")
+
+
+def _record_source(connection, fname):
+    """
+    Remembers the size and modification time of a csv file that was just ingested
+    :param connection: (sqlite3.Connection) a connection to the database
+    :param fname: (str) name of the ingested csv file
+    """
+    file_stat = os.stat(fname)
+    connection.execute("INSERT OR REPLACE INTO sources (source, size, mtime_ns) VALUES (?, ?, ?)",
+                       (source_name(fname), file_stat.st_size, file_stat.st_mtime_ns))
+
+
+def has_current_source(connection, fname):
+    """
+    Takes a connection to a database and a csv file and returns whether the database holds the current file
+    :param connection: (sqlite3.Connection) a connection to the database
+    :param fname: (str) name of a csv file
+    :return: (bool) True if the file was ingested and hasn't changed since
+    """
+    row = connection.execute("SELECT size, mtime_ns FROM sources WHERE source = ?", (source_name(fname),)).fetchone()
+    if row is None or not os.path.exists(fname):
+        return False
+    file_stat = os.stat(fname)
+    return row == (file_stat.st_size, file_stat.st_mtime_ns)
+
+
+def _none_if_nan(value):
+    """
+    :param value: (float) a data value
+    :return: (float) the value, or None if it is nan
+    """
+    return None if math.isnan(value) else value
+
+
+def ingest_energy_csv(connection, fname):
+    """
+    Loads a csv file of Chicago building energy data into the energy table, replacing any earlier copy of the file
+    :param connection: (sqlite3.Connection) a connection to the database
+    :param fname: (str) name of a csv file containing Chicago building energy data
+    """
+    columns = load_energy_columns(fname)
+    source = source_name(fname)
+
+    community_names = columns["community_names"]
+    building_types = columns["building_types"]
+    building_subtypes = columns["building_subtypes"]
+    month_kwh = columns["month_kwh"].tolist()
+
+    rows = []
+    for building, (community, building_type, building_subtype, total_kwh, sq_ft, population, stories) in enumerate(
+            zip(columns["community"].tolist(), columns["building_type"].tolist(),
+                columns["building_subtype"].tolist(), columns["total_kwh"].tolist(), columns["sq_ft"].tolist(),
+                columns["population"].tolist(), columns["stories"].tolist())):
+        rows.append([source, community_names[community], building_types[building_type],
+                     building_subtypes[building_subtype]]
+                    + [_none_if_nan(kwh) for kwh in month_kwh[building]]
+                    + [_none_if_nan(total_kwh), _none_if_nan(sq_ft), _none_if_nan(population),
+                       _none_if_nan(stories)])
+
+    column_names = ["source", "community", "building_type", "building_subtype"] + _MONTH_COLUMNS + [
+        "total_kwh", "sq_ft", "population", "stories"]
+    with connection:
+        connection.execute("DELETE FROM energy WHERE source = ?", (source,))
+        connection.executemany("INSERT INTO energy (" + ", ".join(column_names) + ") VALUES ("
+                               + ", ".join("?" * len(column_names)) + ")", rows)
+        _record_source(connection, fname)
+
+
+def ingest_text_csv(connection, fname):
+    """
+    Loads any csv file into a table of its own, named after the file, with one text column per column title and an
+    index on the community area name column if there is one. A line with more or fewer data values than there are
+    column titles is an error, and leaves the database as it was
+    :param connection: (sqlite3.Connection) a connection to the database
+    :param fname: (str) name of a csv file, such as the socioeconomic or grocery store csv
+    :return: (str) the name of the table, see _table_name
+    """
+    file_in = open(fname, "r")
+    lines = split_csv_text(file_in.read().replace("\r\n", "\n"))
+    file_in.close()
+
+    table = _table_name(fname)
+    if table in SCHEMA_TABLES:
+        raise ValueError("can't ingest " + fname + " into the " + table + " table of the database")
+    column_names = [_column_name(column_title) for column_title in lines[0]]
+
+    # every line must have a data value for every column, as the csv parsers need
+    ragged_lines = [line_number for line_number, data_lst in enumerate(lines[1:], 2)
+                    if len(data_lst) != len(column_names)]
+    if ragged_lines:
+        raise ValueError(fname + " has " + str(len(ragged_lines)) + " lines without " + str(len(column_names))
+                         + " data values, the first is line " + str(ragged_lines[0]))
+    quoted_columns = ", ".join('"' + column_name + '"' for column_name in column_names)
+
+    with connection:
+        connection.execute('DROP TABLE IF EXISTS "' + table + '"')
+        connection.execute('CREATE TABLE "' + table + '" (row_id INTEGER PRIMARY KEY, '
+                           + ", ".join('"' + column_name + '" TEXT' for column_name in column_names) + ")")
+        connection.executemany('INSERT INTO "' + table + '" (' + quoted_columns + ") VALUES ("
+                               + ", ".join("?" * len(column_names)) + ")", lines[1:])
+        if "community_area_name" in column_names:
+            connection.execute('CREATE INDEX "' + table + '_community" ON "' + table + '" (community_area_name)')
+        _record_source(connection, fname)
+
+    return table
+
+
+def query_income_data(connection, fname, wanted_columns):
+    """
+    Takes a connection to a database holding a socioeconomic csv and returns the same dictionary as parse_income_data.
+    The community name and income columns are found by their titles, as in the csv
+    :param connection: (sqlite3.Connection) a connection to the database
+    :param fname: (str) name of the ingested socioeconomic csv
+    :param wanted_columns: (list) (titles, prefixes, default position) of the community name and income columns, see
+    csv_columns.find_column
+    :return: (dict) a dictionary of {str(community name): int(average income)}
+    """
+    table = _table_name(fname)
+
+    # the columns of the table after row_id are the columns of the csv, in order
+    column_names = [column[1] for column in connection.execute('PRAGMA table_info("' + table + '")')][1:]
+    community_column, income_column = [column_names[find_column(column_names, titles, prefixes, default)]
+                                       for titles, prefixes, default in wanted_columns]
+
+    rows = connection.execute('SELECT "' + community_column + '", "' + income_column + '" FROM "' + table
+                              + '" ORDER BY row_id')
+    income_dict = {}
+    for community_name, income in rows:
+        income_dict[community_name] = int(income)
+    return income_dict
+
+
+def query_energy_data(connection, fname):
+    """
+    Takes a connection to a database holding an energy csv and returns the same list as parse_energy_data, pulling
+    only the residential buildings through the building type index
+    :param connection: (sqlite3.Connection) a connection to the database
+    :param fname: (str) name of the ingested energy csv
+    :return: (list) a list of tuples with the data (community name, average individual energy use (kw/person) in the
+    residential building)
+    """
+    rows = connection.execute("SELECT community, total_kwh / population FROM energy "
+                              "WHERE source = ? AND building_type = 'Residential' AND community != '' "
+                              "AND total_kwh != 0 AND population != 0 ORDER BY row_id", (source_name(fname),))
+    return [(community, kwh_per_person) for community, kwh_per_person in rows]
+
+
+def query_energy_for_apartments(connection, fname):
+    """
+    Takes a connection to a database holding an energy csv and returns the same list as parse_energy_for_apartments,
+    pulling only the multi-family buildings through the building sub-type index
+    :param connection: (sqlite3.Connection) a connection to the database
+    :param fname: (str) name of the ingested energy csv
+    :return: (list) a list of lists containing energy efficiency values for building sub-types of Multi 7+ and
+    Multi < 7
+    """
+    efficiency_values_list = []
+    for subtype in MULTI_FAMILY_SUBTYPES:
+        rows = connection.execute("SELECT total_kwh / sq_ft FROM energy "
+                                  "WHERE source = ? AND building_type = 'Residential' AND building_subtype = ? "
+                                  "AND stories >= 1 AND total_kwh != 0 AND sq_ft != 0 ORDER BY row_id",
+                                  (source_name(fname), subtype))
+        efficiency_values_list.append([kwh_per_sq_ft for (kwh_per_sq_ft,) in rows])
+    return efficiency_values_list
+
+
+def open_current(db_fname, fname):
+    """
+    Takes the name of a database file and a csv file and returns a connection to the database if it holds the current
+    file, so that the caller can fall back to reading the csv otherwise
+    :param db_fname: (str) name of a SQLite database file, or None
+    :param fname: (str) name of a csv file
+    :return: (sqlite3.Connection) a connection to the database, or None
+    """
+    if db_fname is None or not os.path.exists(db_fname):
+        return None
+    connection = connect(db_fname)
+    if has_current_source(connection, fname):
+        return connection
+    connection.close()
+    return None
+
+
+def main():
+    """
+    Ingests the csv files named on the command line into a SQLite database
+    """
+    parser = argparse.ArgumentParser(description="Load the Chicago energy csvs into a SQLite database")
+    parser.add_argument("database", help="SQLite database file to create or update")
+    parser.add_argument("energy", nargs="+", help="energy usage csv files")
+    parser.add_argument("--income", help="socioeconomic csv file")
+    parser.add_argument("--grocery", help="grocery store csv file")
+    args = parser.parse_args()
+
+    connection = connect(args.database)
+    for energy_fname in args.energy:
+        ingest_energy_csv(connection, energy_fname)
+        print("ingested " + energy_fname)
+    for text_fname in [args.income, args.grocery]:
+        if text_fname is not None:
+            ingest_text_csv(connection, text_fname)
+            print("ingested " + text_fname)
+    connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Tester code for energy_db.py
+"""
+import shutil
+import tempfile
+
+from energy_db import *
+from energy_analysis import INCOME_COLUMNS, parse_energy_data, parse_energy_for_apartments, parse_income_data
+from energy_synthetic import write_energy_csv, write_socioeconomic_csv
+
+# the grocery store csv kept next to the analysis
+GROCERY_FNAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), "grocery_stores_2013.csv")
+
+
+def test_ingest_and_query():
+    """
+    Runs a series of tests for ingesting the csvs and querying them back
+    :return: (bool) were all tests successful
+    """
+    temp_dir = tempfile.mkdtemp()
+    db_fname = os.path.join(temp_dir, "energy.sqlite")
+    energy_fname = os.path.join(temp_dir, "energy-usage-2010.csv")
+    other_energy_fname = os.path.join(temp_dir, "energy-usage-2011.csv")
+    income_fname = os.path.join(temp_dir, "socioeconomic.csv")
+    write_energy_csv(energy_fname, 2000)
+    write_energy_csv(other_energy_fname, 500, seed=1)
+    write_socioeconomic_csv(income_fname)
+
+    try:
+        connection = connect(db_fname)
+        ingest_energy_csv(connection, energy_fname)
+        ingest_text_csv(connection, income_fname)
+        grocery_table = ingest_text_csv(connection, GROCERY_FNAME)
+
+        # check that the queries return the same data as the csv parsers
+        assert query_income_data(connection, income_fname, INCOME_COLUMNS) == parse_income_data(income_fname)
+        assert query_energy_data(connection, energy_fname) == parse_energy_data(energy_fname)
+        assert query_energy_for_apartments(connection, energy_fname) == parse_energy_for_apartments(energy_fname)
+
+        # check that the grocery store csv keeps its quoted LOCATION column together
+        assert connection.execute('SELECT COUNT(*) FROM "' + grocery_table + '"').fetchone()[0] == 506
+
+        # check that only ingested files are current
+        assert has_current_source(connection, income_fname)
+        assert not has_current_source(connection, other_energy_fname)
+        connection.close()
+
+        # check that the parsers use the database for ingested files and fall back to the csv for the others
+        assert parse_energy_data(energy_fname, db_fname) == parse_energy_data(energy_fname)
+        assert parse_energy_for_apartments(other_energy_fname, db_fname) == \
+            parse_energy_for_apartments(other_energy_fname)
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return True
+
+
+def test_text_table_names():
+    """
+    Runs a series of tests for the tables of ingested text csvs
+    :return: (bool) were all tests successful
+    """
+    temp_dir = tempfile.mkdtemp()
+    db_fname = os.path.join(temp_dir, "energy.sqlite")
+    energy_fname = os.path.join(temp_dir, "energy-usage-2010.csv")
+    write_energy_csv(energy_fname, 1000)
+
+    try:
+        connection = connect(db_fname)
+        ingest_energy_csv(connection, energy_fname)
+        energy_rows = connection.execute("SELECT COUNT(*) FROM energy").fetchone()[0]
+
+        # check that text csvs named like the tables of the schema don't replace them
+        for table in SCHEMA_TABLES:
+            text_fname = os.path.join(temp_dir, table + ".csv")
+            open(text_fname, "w").write("COMMUNITY AREA NAME,PER CAPITA INCOME\nAshburn,23482\n")
+            assert ingest_text_csv(connection, text_fname).startswith(TEXT_TABLE_PREFIX + table + "_")
+        assert connection.execute("SELECT COUNT(*) FROM energy").fetchone()[0] == energy_rows
+        assert parse_energy_data(energy_fname, db_fname) == parse_energy_data(energy_fname)
+
+        # check that csvs of the same name in different directories are kept apart
+        os.mkdir(os.path.join(temp_dir, "csvs"))
+        income_fnames = [os.path.join(temp_dir, "socioeconomic.csv"),
+                         os.path.join(temp_dir, "csvs", "socioeconomic.csv")]
+        for income, income_fname in zip([23482, 35787], income_fnames):
+            open(income_fname, "w").write("COMMUNITY AREA NAME,PER CAPITA INCOME\nAshburn," + str(income) + "\n")
+            ingest_text_csv(connection, income_fname)
+        assert [query_income_data(connection, income_fname, INCOME_COLUMNS) for income_fname in income_fnames] == [
+            {"Ashburn": 23482}, {"Ashburn": 35787}]
+
+        # check that the columns are found by their titles, in any order and spelling
+        moved_fname = os.path.join(temp_dir, "moved.csv")
+        open(moved_fname, "w").write("Per_Capita_Income,HARDSHIP INDEX,Community Area Name\n23482,37,Ashburn\n")
+        ingest_text_csv(connection, moved_fname)
+        assert query_income_data(connection, moved_fname, INCOME_COLUMNS) == {"Ashburn": 23482}
+        assert parse_income_data(moved_fname, db_fname) == parse_income_data(moved_fname) == {"Ashburn": 23482}
+
+        # check that a line with a missing data value is an error rather than left out
+        ragged_fname = os.path.join(temp_dir, "ragged.csv")
+        open(ragged_fname, "w").write("COMMUNITY AREA NAME,PER CAPITA INCOME\nAshburn,23482\nUptown\n")
+        try:
+            ingest_text_csv(connection, ragged_fname)
+            return False
+        except ValueError as error:
+            assert "line 3" in str(error)
+        assert not has_current_source(connection, ragged_fname)
+        connection.close()
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return True
+
+
+def main():
+    """
+    For testing purposes
+    """
+    print("test ingest and query ... " + "PASS" if test_ingest_and_query() else "FAIL")
+    print("test text table names ... " + "PASS" if test_text_table_names() else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+    Group-by reductions over integer group codes
+
+    The analysis groups buildings by building sub-type, building type or community area, and every such column is
+    already stored as integer codes (see energy_columns.load_energy_columns). The functions here reduce a value per
+    building to statistics per group in one pass: counts and sums with numpy.bincount, and medians and other quantiles
+    from one sort of all the values by (group, value), so no Python loop ever visits a building or a group.
+"""
+import numpy as np
+
+# the quantiles reported for every group
+QUANTILES = (0.25, 0.5, 0.75)
+
+
+def group_codes(keys):
+    """
+    Takes a group key for every value and returns an integer code for every value and the key of every code
+    :param keys: (list) the group key of every value, such as a building sub-type name
+    :return: (tuple) an intp array of the code of every value, in order of first appearance, and a list of the key
+    that each code stands for
+    """
+    codes_by_key = {}
+    codes = np.array([codes_by_key.setdefault(key, len(codes_by_key)) for key in keys], dtype=np.intp)
+    return codes, list(codes_by_key)
+
+
+def _group_count(codes, group_count):
+    """
+    :param codes: (array) the group code of every value
+    :param group_count: (int) the number of groups, or None for one more than the largest code
+    :return: (int) the number of groups
+    """
+    if group_count is None:
+        return int(codes.max()) + 1 if len(codes) else 0
+    return group_count
+
+
+def split_by_group(codes, values, group_count=None):
+    """
+    Takes a group code and a value for every building and returns the values of each group, in their original order
+    :param codes: (array) the int group code of every value
+    :param values: (array) the value of every building
+    :param group_count: (int) the number of groups, or None for one more than the largest code
+    :return: (list) one array of values per group code, empty for groups without values
+    """
+    codes = np.asarray(codes, dtype=np.intp)
+    values = np.asarray(values)
+    group_count = _group_count(codes, group_count)
+
+    # a stable sort by code keeps the values of each group in their original order
+    order = np.argsort(codes, kind="stable")
+    group_ends = np.cumsum(np.bincount(codes, minlength=group_count))
+    return np.split(values[order], group_ends[:-1]) if group_count else []
+
+
+def _sorted_quantiles(sorted_values, group_starts, counts, quantiles):
+    """
+    Takes values sorted by group and then by value and returns quantiles of every group, interpolated linearly like
+    numpy.quantile
+    :param sorted_values: (array) float64 values, sorted by group and within each group
+    :param group_starts: (array) the position of the first value of each group
+    :param counts: (array) the number of values of each group
+    :param quantiles: (array) quantiles between 0 and 1
+    :return: (array) float64 array of shape (groups, quantiles), nan for groups without values
+    """
+    quantile_values = np.full((len(counts), len(quantiles)), np.nan)
+    filled = counts > 0
+    if not filled.any():
+        return quantile_values
+
+    positions = group_starts[filled, None] + quantiles[None, :] * (counts[filled, None] - 1)
+    lower = np.floor(positions).astype(np.intp)
+    upper = np.ceil(positions).astype(np.intp)
+    quantile_values[filled] = sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (positions - lower)
+    return quantile_values
+
+
+def group_reduce(codes, values, group_count=None, quantiles=QUANTILES):
+    """
+    Takes a group code and a value for every building and returns the count, sum, mean, median and quantiles of the
+    values of every group. Nan values are left out
+    :param codes: (array) the int group code of every value
+    :param values: (array) the value of every building
+    :param group_count: (int) the number of groups, or None for one more than the largest code
+    :param quantiles: (list) the quantiles to compute for every group, between 0 and 1
+    :return: (dict) arrays indexed by group code:
+        "count": (array) int64 number of values
+        "sum": (array) float64 sum of the values
+        "mean": (array) float64 mean of the values, nan for groups without values
+        "median": (array) float64 median of the values, nan for groups without values
+        "quantiles": (array) float64 array of shape (groups, len(quantiles)), nan for groups without values
+    """
+    codes = np.asarray(codes, dtype=np.intp)
+    values = np.asarray(values, dtype=np.float64)
+    group_count = _group_count(codes, group_count)
+
+    present = ~np.isnan(values)
+    codes = codes[present]
+    values = values[present]
+
+    counts = np.bincount(codes, minlength=group_count).astype(np.int64)
+    sums = np.bincount(codes, weights=values, minlength=group_count).astype(np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+
+    # one sort orders the values of every group at once, and each group's values then sit in one run
+    sorted_values = values[np.lexsort((values, codes))]
+    group_starts = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.intp)
+    quantile_values = _sorted_quantiles(sorted_values, group_starts, counts,
+                                        np.concatenate((np.asarray(quantiles, dtype=np.float64), [0.5])))
+
+    return {
+        "count": counts,
+        "sum": sums,
+        "mean": means,
+        "median": quantile_values[:, -1],
+        "quantiles": quantile_values[:, :-1],
+    }
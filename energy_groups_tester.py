@@ -0,0 +1,75 @@
+"""
+Tester code for energy_groups.py
+"""
+
+from energy_groups import *
+
+
+def test_group_codes():
+    """
+    Runs a series of tests for group_codes
+    :return: (bool) were all tests successful
+    """
+    codes, keys = group_codes(["Multi 7+", "Single Family", "Multi 7+", "Multi < 7"])
+    assert codes.tolist() == [0, 1, 0, 2]
+    assert keys == ["Multi 7+", "Single Family", "Multi < 7"]
+
+    codes, keys = group_codes([])
+    assert codes.tolist() == [] and keys == []
+
+    return True
+
+
+def test_split_by_group():
+    """
+    Runs a series of tests for split_by_group
+    :return: (bool) were all tests successful
+    """
+    # check that each group keeps its values in their original order, and that groups without values are empty
+    groups = split_by_group([2, 0, 2, 0, 2], [5.0, 6.0, 1.0, 2.0, 3.0], 4)
+    assert [group.tolist() for group in groups] == [[6.0, 2.0], [], [5.0, 1.0, 3.0], []]
+
+    assert split_by_group([], []) == []
+
+    return True
+
+
+def test_group_reduce():
+    """
+    Runs a series of tests for group_reduce
+    :return: (bool) were all tests successful
+    """
+    codes = [0, 1, 0, 1, 1, 0, 0]
+    values = [4.0, 10.0, 1.0, 30.0, 20.0, 3.0, 2.0]
+    group_stats = group_reduce(codes, values, 3)
+
+    assert group_stats["count"].tolist() == [4, 3, 0]
+    assert group_stats["sum"].tolist()[:2] == [10.0, 60.0]
+    assert group_stats["mean"].tolist()[:2] == [2.5, 20.0]
+
+    # check that the medians and quartiles are the same as numpy's, and missing for a group without values
+    assert group_stats["median"].tolist()[:2] == [2.5, 20.0]
+    assert group_stats["quantiles"][0].tolist() == np.quantile([4.0, 1.0, 3.0, 2.0], QUANTILES).tolist()
+    assert group_stats["quantiles"][1].tolist() == np.quantile([10.0, 30.0, 20.0], QUANTILES).tolist()
+    assert np.isnan(group_stats["median"][2]) and np.isnan(group_stats["mean"][2])
+
+    # check that nan values are left out
+    group_stats = group_reduce([0, 0, 0], [1.0, np.nan, 3.0], quantiles=[0.0, 1.0])
+    assert group_stats["count"].tolist() == [2]
+    assert group_stats["median"].tolist() == [2.0]
+    assert group_stats["quantiles"].tolist() == [[1.0, 3.0]]
+
+    return True
+
+
+def main():
+    """
+    For testing purposes
+    """
+    print("test group_codes ... " + "PASS" if test_group_codes() else "FAIL")
+    print("test split_by_group ... " + "PASS" if test_split_by_group() else "FAIL")
+    print("test group_reduce ... " + "PASS" if test_group_reduce() else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
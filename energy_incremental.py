@@ -0,0 +1,293 @@
+"""
+    Incremental, append-only analysis of a growing Chicago energy usage csv
+
+    A meter feed only ever appends new lines to its energy csv, so the month sums and counts behind the monthly averages
+    and the per-community totals behind the per-person energy use are kept as running state in a small json file next to
+    the csv, along with the byte offset up to which the csv has been folded in. Refreshing the state parses only the
+    lines appended since the last refresh, so the parsing done is proportional to the new batch rather than to the whole
+    file. The state remembers the size and modification time of the file and a hash of every byte it has read: when
+    the file has been touched since, the bytes before the offset are hashed again, which is much faster than parsing
+    them, and the state is rebuilt from the start of the file if they have changed anywhere, such as when the csv was
+    replaced or rewritten in the middle.
+
+    Usage: python energy_incremental.py ENERGY_CSV [ENERGY_CSV ...]
+"""
+import argparse
+import copy
+import hashlib
+import json
+import os
+import tempfile
+from itertools import islice
+
+import numpy as np
+
+from energy_columns import (CHUNK_ROWS, MONTH_INDICES, columns_from_text, energy_column_picker,
+                            month_kwh_averages_from_totals, month_kwh_totals, residential_kwh_per_person)
+
+# bump this whenever the layout of the state changes so that old states are rebuilt
+STATE_VERSION = 3
+
+# the state of "energy-usage-2010.csv" is the file "energy-usage-2010.csv.state.json"
+STATE_SUFFIX = ".state.json"
+
+# the number of bytes hashed at a time when checking the bytes already read
+HASH_BLOCK_BYTES = 1 << 20
+
+
+def state_path(fname):
+    """
+    Takes the name of an energy csv and returns the name of the file its running state is kept in
+    :param fname: (str) name of a csv file containing Chicago building energy data
+    :return: (str) name of the state file
+    """
+    return fname + STATE_SUFFIX
+
+
+def new_state():
+    """
+    Returns the running state of an energy csv of which nothing has been read yet
+    :return: (dict) the running state:
+        "version": (int) STATE_VERSION
+        "offset": (int) byte offset just past the last complete line folded into the state
+        "digest": (str) sha256 of the bytes of the file before the offset
+        "size", "mtime_ns": (int) the size and modification time of the file when the state was last updated
+        "column_titles_line": (str) the first line of the file
+        "row_count": (int) the number of buildings folded in
+        "month_sums", "month_values": (list) the sum and number of the KWH values of each month, see
+            energy_columns.month_kwh_totals
+        "community_totals": (dict) {str(community name): [int(residential building count), float(sum of kw/person)]}
+    """
+    return {
+        "version": STATE_VERSION,
+        "offset": 0,
+        "digest": None,
+        "size": None,
+        "mtime_ns": None,
+        "column_titles_line": "",
+        "row_count": 0,
+        "month_sums": [0.0] * len(MONTH_INDICES),
+        "month_values": [0] * len(MONTH_INDICES),
+        "community_totals": {},
+    }
+
+
+def load_state(fname):
+    """
+    Takes the name of an energy csv and returns its saved running state, or a new state if none was saved
+    :param fname: (str) name of a csv file containing Chicago building energy data
+    :return: (dict) the running state, see new_state
+    """
+    try:
+        with open(state_path(fname), "r") as state_in:
+            state = json.load(state_in)
+    except (OSError, ValueError):
+        return new_state()
+    if state.get("version") != STATE_VERSION:
+        return new_state()
+    return state
+
+
+def save_state(fname, state):
+    """
+    Saves the running state of an energy csv, replacing the saved state in one step so that a crash never leaves a
+    half-written state behind
+    :param fname: (str) name of a csv file containing Chicago building energy data
+    :param state: (dict) the running state, see new_state
+    """
+    state_dir = os.path.dirname(os.path.abspath(state_path(fname)))
+    temp_fd, temp_fname = tempfile.mkstemp(dir=state_dir, suffix=STATE_SUFFIX)
+    try:
+        with os.fdopen(temp_fd, "w") as state_out:
+            json.dump(state, state_out)
+        os.replace(temp_fname, state_path(fname))
+    except OSError:
+        try:
+            os.remove(temp_fname)
+        except OSError:
+            pass
+        raise
+
+
+def _prefix_digest(fname, end):
+    """
+    :param fname: (str) name of a file
+    :param end: (int) byte offset just past the end of the bytes hashed
+    :return: (hashlib.sha256) the sha256 of the bytes of the file before the offset, which more bytes can be added to
+    """
+    digest = hashlib.sha256()
+    with open(fname, "rb") as file_in:
+        remaining = end
+        while remaining > 0:
+            block = file_in.read(min(remaining, HASH_BLOCK_BYTES))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest
+
+
+def _check_state(fname, file_stat, state):
+    """
+    Takes an energy csv and its running state and returns whether the bytes the state was built from are still the
+    start of the file
+    :param fname: (str) name of a csv file containing Chicago building energy data
+    :param file_stat: (os.stat_result) the status of the open file
+    :param state: (dict) the running state, see new_state
+    :return: (tuple) True if the state can be brought up to date by reading only the bytes after its offset, and the
+    sha256 of the bytes before the offset when they had to be hashed to find out, or None
+    """
+    if state["offset"] == 0 or file_stat.st_size < state["offset"]:
+        return False, None
+
+    # a file that wasn't touched since the last update still starts with the bytes that were read
+    if (file_stat.st_size, file_stat.st_mtime_ns) == (state["size"], state["mtime_ns"]):
+        return True, None
+
+    digest = _prefix_digest(fname, state["offset"])
+    return digest.hexdigest() == state["digest"], digest
+
+
+def fold_text(state, text):
+    """
+    Adds the buildings of some lines of an energy csv to a running state
+    :param state: (dict) the running state, see new_state. It is updated in place
+    :param text: (str) lines of the csv, without the column titles, separated by "\n"
+    """
+    columns = columns_from_text(text, energy_column_picker(state["column_titles_line"]))
+    if len(columns["total_kwh"]) == 0:
+        return
+
+    state["row_count"] += len(columns["total_kwh"])
+    month_sums, month_values = month_kwh_totals(columns)
+    state["month_sums"] = (np.asarray(state["month_sums"]) + month_sums).tolist()
+    state["month_values"] = (np.asarray(state["month_values"], dtype=np.int64) + month_values).tolist()
+
+    # total up the batch by community code, then add the batch totals to the running totals
+    community_codes, kwh_per_person = residential_kwh_per_person(columns)
+    code_count = len(columns["community_names"])
+    building_counts = np.bincount(community_codes, minlength=code_count)
+    kwh_sums = np.bincount(community_codes, weights=kwh_per_person, minlength=code_count)
+    for community_code in np.flatnonzero(building_counts).tolist():
+        totals = state["community_totals"].setdefault(columns["community_names"][community_code], [0, 0.0])
+        totals[0] += int(building_counts[community_code])
+        totals[1] += float(kwh_sums[community_code])
+
+
+def update_state(fname, chunk_rows=CHUNK_ROWS, save=True):
+    """
+    Brings the running state of an energy csv up to date, reading only the lines appended since it was last updated,
+    or every line if the file was replaced
+    :param fname: (str) name of a csv file containing Chicago building energy data
+    :param chunk_rows: (int) the number of lines read at a time
+    :param save: (bool) whether to save the updated state next to the csv
+    :return: (dict) the running state of every line of the file, see new_state. A last line that doesn't end in a
+    newline yet is included in the returned state but not in the saved one, since the feed may still be writing it
+    """
+    state = load_state(fname)
+    file_in = open(fname, "rb")
+    try:
+        file_stat = os.fstat(file_in.fileno())
+        is_current, digest = _check_state(fname, file_stat, state)
+        if not is_current:
+            # the file is new or was changed, so start over from its column titles
+            state = new_state()
+            file_in.seek(0)
+            column_titles_line = file_in.readline()
+            state["column_titles_line"] = column_titles_line.decode("utf-8")
+            state["offset"] = len(column_titles_line)
+            digest = hashlib.sha256(column_titles_line)
+
+        file_in.seek(state["offset"])
+        partial_line = b""
+        while True:
+            block = b"".join(islice(file_in, chunk_rows))
+            if not block:
+                break
+
+            # only a block at the end of the file can end in a line that isn't finished yet
+            if not block.endswith(b"\n"):
+                last_newline = block.rfind(b"\n") + 1
+                partial_line = block[last_newline:]
+                block = block[:last_newline]
+                if not block:
+                    break
+
+            # the bytes before the offset are only hashed once there are new bytes to add to the hash
+            if digest is None:
+                digest = _prefix_digest(fname, state["offset"])
+            digest.update(block)
+            fold_text(state, block.decode("utf-8").replace("\r\n", "\n"))
+            state["offset"] += len(block)
+
+        if digest is not None:
+            state["digest"] = digest.hexdigest()
+        state["size"], state["mtime_ns"] = file_stat.st_size, file_stat.st_mtime_ns
+    finally:
+        file_in.close()
+
+    if save:
+        try:
+            save_state(fname, state)
+        except OSError:
+            # the state is only a speed-up, so a directory that can't be written to just means reading every line
+            # every time
+            pass
+
+    # the unfinished line counts now, and is read again once it is finished
+    if partial_line.strip():
+        state = copy.deepcopy(state)
+        fold_text(state, partial_line.decode("utf-8").replace("\r\n", "\n"))
+    return state
+
+
+def append_energy_rows(fname, text, chunk_rows=CHUNK_ROWS):
+    """
+    Appends a batch of lines to an energy csv and folds them into its running state
+    :param fname: (str) name of a csv file containing Chicago building energy data
+    :param text: (str) the new lines, in the same column layout as the file
+    :param chunk_rows: (int) the number of lines read at a time
+    :return: (dict) the updated running state, see new_state
+    """
+    with open(fname, "ab") as file_out:
+        file_out.write(text.encode("utf-8"))
+    return update_state(fname, chunk_rows)
+
+
+def incremental_month_kwh_averages(fname):
+    """
+    Takes a csv file of Chicago KWH energy data and returns the average KWH usage of every month, reading only the
+    lines appended since the last call
+    :param fname: (str) name of a csv file containing KWH energy usage
+    :return: (dict) a dictionary of {int(month column index): int(average KWH used in Chicago during that month)}
+    """
+    state = update_state(fname)
+    return month_kwh_averages_from_totals(state["month_sums"], state["month_values"])
+
+
+def incremental_community_kwh_per_person(fname):
+    """
+    Takes a csv file of Chicago building energy data and returns, for every community, the number of residential
+    buildings and the sum of their annual energy usage per person, reading only the lines appended since the last call
+    :param fname: (str) name of a csv file containing Chicago building energy data
+    :return: (dict) a dictionary of {str(community name): [int(building count), float(sum of kw/person)]}
+    """
+    return update_state(fname)["community_totals"]
+
+
+def main():
+    """
+    Brings the running state of the csv files named on the command line up to date
+    """
+    parser = argparse.ArgumentParser(description="Fold newly appended lines of energy csvs into their running state")
+    parser.add_argument("energy", nargs="+", help="energy usage csv files")
+    args = parser.parse_args()
+
+    for energy_fname in args.energy:
+        state = update_state(energy_fname)
+        print(energy_fname + ": " + str(state["row_count"]) + " buildings, " + str(len(state["community_totals"]))
+              + " communities")
+
+
+if __name__ == "__main__":
+    main()
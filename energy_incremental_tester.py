@@ -0,0 +1,145 @@
+"""
+Tester code for energy_incremental.py
+"""
+import os
+import tempfile
+
+from energy_incremental import *
+from energy_stream import stream_community_kwh_per_person, stream_month_kwh_averages
+
+COLUMN_TITLES_LINE = ("COMMUNITY AREA NAME,BUILDING TYPE,BUILDING_SUBTYPE,"
+                      + ",".join("KWH " + month_name + " 2010" for month_name in
+                                 ["JANUARY", "FEBRUARY", "MARCH", "APRIL", "MAY", "JUNE", "JULY", "AUGUST",
+                                  "SEPTEMBER", "OCTOBER", "NOVEMBER", "DECEMBER"])
+                      + ",TOTAL KWH,KWH TOTAL SQFT,TOTAL POPULATION,AVERAGE STORIES\n")
+
+BATCHES = ["Ashburn,Residential,Multi 7+," + ",".join(["100"] * 12) + ",1200,600,4,8\n"
+           "Uptown,Commercial,Commercial," + ",".join(["57"] * 12) + ",684,100,,2\n",
+           "Ashburn,Residential,Single Family," + ",".join(["31"] * 12) + ",372,1000,2,1\n"
+           "Hyde Park,Residential,Multi < 7,,,,,,,,,,,,,0,0,3,1\n"]
+
+
+def _write_csv(temp_dir, text):
+    """
+    :param temp_dir: (str) the directory the file is written to
+    :param text: (str) the contents of a csv file
+    :return: (str) the name of a new file in the directory holding the text
+    """
+    fname = os.path.join(temp_dir, "energy-usage-test.csv")
+    file_out = open(fname, "w")
+    file_out.write(text)
+    file_out.close()
+    return fname
+
+
+def test_append_energy_rows():
+    """
+    Runs a series of tests for update_state and append_energy_rows
+    :return: (bool) were all tests successful
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        fname = _write_csv(temp_dir, COLUMN_TITLES_LINE + BATCHES[0])
+        assert update_state(fname)["row_count"] == 2
+
+        # check that an appended batch is folded in from the saved offset, giving the same results as a full scan
+        state = append_energy_rows(fname, BATCHES[1])
+        assert state["row_count"] == 4
+        assert state["offset"] == os.path.getsize(fname)
+        assert incremental_month_kwh_averages(fname) == stream_month_kwh_averages(fname)
+        assert incremental_community_kwh_per_person(fname) == stream_community_kwh_per_person(fname)
+        assert incremental_community_kwh_per_person(fname) == {"Ashburn": [2, 486.0]}
+
+        # check the true monthly sums and value counts
+        assert state["month_sums"][0] == 188.0 and state["month_values"][0] == 3
+
+    return True
+
+
+def test_update_state_rebuilds():
+    """
+    Runs a series of tests for update_state when the csv is replaced or ends in an unfinished line
+    :return: (bool) were all tests successful
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        fname = _write_csv(temp_dir, COLUMN_TITLES_LINE + BATCHES[0] + BATCHES[1])
+        assert update_state(fname)["row_count"] == 4
+
+        # check that a replaced file is read again from the start
+        file_out = open(fname, "w")
+        file_out.write(COLUMN_TITLES_LINE + BATCHES[1])
+        file_out.close()
+        assert update_state(fname)["row_count"] == 2
+        assert incremental_month_kwh_averages(fname) == stream_month_kwh_averages(fname)
+
+        # check that an unfinished last line counts but isn't saved, and is read once it is finished
+        file_out = open(fname, "a")
+        file_out.write(BATCHES[0].rstrip("\n"))
+        file_out.close()
+        assert update_state(fname)["row_count"] == 4
+        assert load_state(fname)["row_count"] == 3
+        assert append_energy_rows(fname, "\n")["row_count"] == 4
+
+    return True
+
+
+def test_update_state_middle_rewrite():
+    """
+    Runs a series of tests for update_state when bytes before the saved offset are rewritten without shrinking the file
+    :return: (bool) were all tests successful
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        fname = _write_csv(temp_dir, COLUMN_TITLES_LINE + BATCHES[0] + BATCHES[1])
+        assert update_state(fname)["month_sums"][0] == 188.0
+
+        # check that a file that wasn't touched is brought up to date without being changed
+        assert update_state(fname)["row_count"] == 4
+
+        # check that a value rewritten in the middle of the file is found when the file keeps its size
+        text = open(fname).read()
+        file_out = open(fname, "w")
+        file_out.write(text.replace("Uptown,Commercial,Commercial,57", "Uptown,Commercial,Commercial,75"))
+        file_out.close()
+        os.utime(fname, ns=(os.stat(fname).st_atime_ns, load_state(fname)["mtime_ns"] + 10 ** 9))
+        assert os.path.getsize(fname) == len(text)
+        assert update_state(fname)["month_sums"][0] == 206.0
+
+        # check that it is found when lines are appended at the same time
+        text = open(fname).read()
+        file_out = open(fname, "w")
+        file_out.write(text.replace("Single Family,31", "Single Family,13") + BATCHES[0].replace("100", "200"))
+        file_out.close()
+        state = update_state(fname)
+        assert state["row_count"] == 6 and state["month_sums"][0] == 100 + 75 + 13 + 200 + 57
+
+    return True
+
+
+def test_unwritable_state():
+    """
+    Runs a series of tests for update_state when its state can't be saved
+    :return: (bool) were all tests successful
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        fname = _write_csv(temp_dir, COLUMN_TITLES_LINE + BATCHES[0])
+
+        # a directory in the way of the state file makes saving it fail
+        os.mkdir(state_path(fname))
+        assert update_state(fname)["row_count"] == 2
+        assert append_energy_rows(fname, BATCHES[1])["row_count"] == 4
+        assert sorted(os.listdir(temp_dir)) == ["energy-usage-test.csv", "energy-usage-test.csv" + STATE_SUFFIX]
+
+    return True
+
+
+def main():
+    """
+    For testing purposes
+    """
+    print("test append_energy_rows ... " + "PASS" if test_append_energy_rows() else "FAIL")
+    print("test update_state rebuilds ... " + "PASS" if test_update_state_rebuilds() else "FAIL")
+    print("test update_state middle rewrite ... " + "PASS" if test_update_state_middle_rewrite() else "FAIL")
+    print("test unwritable state ... " + "PASS" if test_unwritable_state() else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
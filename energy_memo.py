@@ -0,0 +1,120 @@
+"""
+    Memoized results of queries on the Chicago energy usage csvs
+
+    The same month, season and month-list queries are asked of the same csv many times over. A QueryMemo remembers
+    the result of every query, keyed on the identity of the file (its path, size and modification time), the column
+    or columns queried and the kind of query, so a repeated query is answered without touching the file. The memo
+    holds a bounded number of results and evicts the least recently used one when full, and it drops every result of a
+    file as soon as that file is seen to have changed.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+# the most query results remembered at once
+MEMO_ENTRIES = 256
+
+
+def file_identity(fname):
+    """
+    Takes the name of a file and returns a key that changes whenever the file is replaced or modified
+    :param fname: (str) name of a file
+    :return: (tuple) the absolute path, size and modification time of the file
+    """
+    file_stat = os.stat(fname)
+    return os.path.abspath(fname), file_stat.st_size, file_stat.st_mtime_ns
+
+
+class QueryMemo:
+    """
+    A bounded least-recently-used memo of query results, keyed on (file identity, column, filter)
+    """
+
+    def __init__(self, max_entries=MEMO_ENTRIES):
+        """
+        Makes an empty memo
+        :param max_entries: (int) the most query results remembered at once
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._identities = {}
+
+        # queries may be answered from several threads at once
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """
+        :return: (int) the number of query results remembered
+        """
+        return len(self._entries)
+
+    def _forget_path(self, path):
+        """
+        Drops every remembered result of one file. The lock must be held
+        :param path: (str) the absolute path of the file
+        """
+        for key in [key for key in self._entries if key[0][0] == path]:
+            del self._entries[key]
+        self._identities.pop(path, None)
+
+    def get(self, fname, column, query_filter, compute):
+        """
+        Returns the result of a query on a file, computing it only if it isn't remembered for the file as it is now
+        :param fname: (str) name of the file queried
+        :param column: (hashable) the column index, or tuple of indices, that the query is about
+        :param query_filter: (hashable) what the query computes from the column, such as "season_average", or None
+        :param compute: (function) a function of no arguments that computes the result
+        :return: the result of the query
+        """
+        identity = file_identity(fname)
+        key = (identity, column, query_filter)
+
+        with self._lock:
+            # a file that changed since its results were remembered has none of them answered again
+            if self._identities.get(identity[0], identity) != identity:
+                self._forget_path(identity[0])
+            self._identities[identity[0]] = identity
+
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        result = compute()
+
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def invalidate(self, fname=None):
+        """
+        Drops the remembered results of one file, or of every file
+        :param fname: (str) name of the file, or None for every file
+        """
+        with self._lock:
+            if fname is None:
+                self._entries.clear()
+                self._identities.clear()
+            else:
+                self._forget_path(os.path.abspath(fname))
+
+    def stats(self):
+        """
+        Returns the hit and miss counts of the memo
+        :return: (dict) {"hits": int, "misses": int, "evictions": int, "entries": int}
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "entries": len(self._entries)}
+
+
+# the memo shared by the month and season queries of the analysis
+query_memo = QueryMemo()
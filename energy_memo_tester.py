@@ -0,0 +1,87 @@
+"""
+Tester code for energy_memo.py
+"""
+import os
+import tempfile
+
+from energy_memo import *
+
+
+def _write_file(temp_dir, text):
+    """
+    :param temp_dir: (str) the directory the file is written to
+    :param text: (str) the contents of a file
+    :return: (str) the name of a new file in the directory holding the text
+    """
+    fname = os.path.join(temp_dir, "energy-usage-test.csv")
+    file_out = open(fname, "w")
+    file_out.write(text)
+    file_out.close()
+    return fname
+
+
+def test_query_memo():
+    """
+    Runs a series of tests for QueryMemo.get
+    :return: (bool) were all tests successful
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        fname = _write_file(temp_dir, "a,b\n1,2\n")
+        memo = QueryMemo()
+        computed = []
+
+        def compute():
+            computed.append(1)
+            return len(computed)
+
+        # check that a repeated query is answered without computing it again
+        assert memo.get(fname, 4, None, compute) == 1
+        assert memo.get(fname, 4, None, compute) == 1
+        assert memo.get(fname, 4, "season_average", compute) == 2
+        assert memo.stats() == {"hits": 1, "misses": 2, "evictions": 0, "entries": 2}
+
+        # check that every result of a changed file is dropped
+        file_out = open(fname, "a")
+        file_out.write("3,4\n")
+        file_out.close()
+        assert memo.get(fname, 4, None, compute) == 3
+        assert len(memo) == 1
+
+        # check that invalidate drops the results of the file
+        memo.invalidate(fname)
+        assert memo.get(fname, 4, None, compute) == 4
+
+    return True
+
+
+def test_query_memo_eviction():
+    """
+    Runs a series of tests for the least-recently-used eviction of QueryMemo
+    :return: (bool) were all tests successful
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        fname = _write_file(temp_dir, "a,b\n1,2\n")
+        memo = QueryMemo(max_entries=2)
+        memo.get(fname, 1, None, lambda: "one")
+        memo.get(fname, 2, None, lambda: "two")
+
+        # using column 1 again makes column 2 the least recently used, so it is the one evicted
+        assert memo.get(fname, 1, None, lambda: "not one") == "one"
+        memo.get(fname, 3, None, lambda: "three")
+        assert memo.stats()["evictions"] == 1
+        assert memo.get(fname, 1, None, lambda: "not one") == "one"
+        assert memo.get(fname, 2, None, lambda: "two again") == "two again"
+
+    return True
+
+
+def main():
+    """
+    For testing purposes
+    """
+    print("test query_memo ... " + "PASS" if test_query_memo() else "FAIL")
+    print("test query_memo eviction ... " + "PASS" if test_query_memo_eviction() else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
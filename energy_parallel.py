@@ -0,0 +1,218 @@
+"""
+    Multi-process parsing of the Chicago energy usage csvs
+
+    The lines of an energy csv are split into byte ranges that start and end on line boundaries. Each range is parsed
+    by its own worker process, and the partial results of the ranges are merged back together in file order, so the
+    results are the same as parsing the file in one process.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from energy_columns import (MONTH_INDICES, MULTI_FAMILY_SUBTYPES, columns_from_text, concatenate_columns,
+                            energy_column_picker, month_kwh_averages_from_totals, month_kwh_totals,
+                            multi_family_kwh_per_sq_ft, read_column_titles_line, residential_kwh_per_person)
+from quantile_sketch import QuantileSketch, merge_sketches
+
+# files are not split into ranges smaller than this, since starting a worker costs more than parsing a small range
+MIN_SHARD_BYTES = 1 << 20
+
+
+def shard_byte_ranges(fname, shard_count):
+    """
+    Takes a csv file and splits the lines after its column titles into byte ranges that start and end on line
+    boundaries
+    :param fname: (str) name of a csv file
+    :param shard_count: (int) the most ranges to split the file into
+    :return: (list) a list of (start, end) byte offsets, in file order
+    """
+    file_size = os.path.getsize(fname)
+    file_in = open(fname, "rb")
+
+    # the first range starts after the column titles
+    file_in.readline()
+    data_start = file_in.tell()
+
+    # put a boundary near every evenly spaced offset, moved forward to the start of the next line
+    boundaries = [data_start]
+    shard_size = max(1, (file_size - data_start) // max(1, shard_count))
+    for shard in range(1, shard_count):
+        file_in.seek(max(data_start + shard * shard_size, boundaries[-1]))
+        if file_in.tell() > data_start:
+            file_in.seek(file_in.tell() - 1)
+            file_in.readline()
+        boundary = file_in.tell()
+        if boundary >= file_size:
+            break
+        if boundary > boundaries[-1]:
+            boundaries.append(boundary)
+    boundaries.append(file_size)
+
+    # close the file
+    file_in.close()
+
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+
+def _read_shard_text(fname, start, end):
+    """
+    Takes a csv file and a byte range of it and returns the lines in that range
+    :param fname: (str) name of a csv file
+    :param start: (int) byte offset of the first line of the range
+    :param end: (int) byte offset just past the last line of the range
+    :return: (str) the lines of the range, separated by "\n"
+    """
+    file_in = open(fname, "rb")
+    file_in.seek(start)
+    data = file_in.read(end - start)
+    file_in.close()
+    return data.decode("utf-8").replace("\r\n", "\n")
+
+
+def _parse_shard_columns(fname, start, end):
+    """
+    Takes a csv file of Chicago building energy data and a byte range of it and returns the columns of that range
+    :param fname: (str) name of a csv file containing Chicago building energy data
+    :param start: (int) byte offset of the first line of the range
+    :param end: (int) byte offset just past the last line of the range
+    :return: (dict) the columns of the range, see energy_columns.load_energy_columns
+    """
+    pick_columns = energy_column_picker(read_column_titles_line(fname))
+    return columns_from_text(_read_shard_text(fname, start, end), pick_columns)
+
+
+def _summarize_shard(fname, start, end):
+    """
+    Takes a csv file of Chicago building energy data and a byte range of it and returns the partial results of every
+    question for that range
+    :param fname: (str) name of a csv file containing Chicago building energy data
+    :param start: (int) byte offset of the first line of the range
+    :param end: (int) byte offset just past the last line of the range
+    :return: (dict) the partial results of the range:
+        "kwh_sums", "kwh_counts": (array) the twelve month sums and counts, see energy_columns.month_kwh_totals
+        "community_codes": (array) the int community code of every residential building in the range
+        "community_names": (list) the name of each community code
+        "kwh_per_person": (array) the float64 kw/person of every residential building in the range
+        "efficiency_arrays": (list) float64 arrays of KWH/sq feet, one per sub-type in MULTI_FAMILY_SUBTYPES
+        "efficiency_sketches": (list) quantile sketches of the efficiency arrays
+    """
+    columns = _parse_shard_columns(fname, start, end)
+    kwh_sums, kwh_counts = month_kwh_totals(columns)
+    efficiency_arrays = multi_family_kwh_per_sq_ft(columns)
+    community_codes, kwh_per_person = residential_kwh_per_person(columns)
+
+    return {
+        "kwh_sums": kwh_sums,
+        "kwh_counts": kwh_counts,
+        "community_codes": community_codes,
+        "community_names": columns["community_names"],
+        "kwh_per_person": kwh_per_person,
+        "efficiency_arrays": efficiency_arrays,
+        "efficiency_sketches": [QuantileSketch(efficiency_array) for efficiency_array in efficiency_arrays],
+    }
+
+
+def merge_shard_summaries(summaries):
+    """
+    Takes the partial results of consecutive byte ranges of an energy csv and merges them into the results of the
+    whole file
+    :param summaries: (list) the partial results of each range, in file order, see _summarize_shard
+    :return: (dict) the results of the whole file:
+        "month_averages": (dict) {int(month column index): int(average KWH)}, see energy_columns.month_kwh_averages
+        "energy_list": (list) tuples of (community name, kw/person), as returned by parse_energy_data
+        "efficiency_arrays": (list) float64 arrays of KWH/sq feet, one per sub-type in MULTI_FAMILY_SUBTYPES
+        "efficiency_sketches": (list) quantile sketches of the efficiency arrays, merged from the sketches of the ranges
+    """
+    kwh_sums = np.zeros(len(MONTH_INDICES), dtype=np.float64)
+    kwh_counts = np.zeros(len(MONTH_INDICES), dtype=np.int64)
+    codes_by_name = {}
+    code_pieces = [np.empty(0, dtype=np.int64)]
+    kwh_per_person_pieces = [np.empty(0, dtype=np.float64)]
+    efficiency_pieces = []
+    for subtype in MULTI_FAMILY_SUBTYPES:
+        efficiency_pieces.append([np.empty(0, dtype=np.float64)])
+
+    for summary in summaries:
+        kwh_sums += summary["kwh_sums"]
+        kwh_counts += summary["kwh_counts"]
+
+        # give the communities of every range the codes of the whole file, then look the range's codes up
+        merged_codes = np.array([codes_by_name.setdefault(name, len(codes_by_name))
+                                 for name in summary["community_names"]], dtype=np.int64)
+        code_pieces.append(merged_codes[summary["community_codes"]])
+        kwh_per_person_pieces.append(summary["kwh_per_person"])
+        for subtype_pieces, efficiency_array in zip(efficiency_pieces, summary["efficiency_arrays"]):
+            subtype_pieces.append(efficiency_array)
+
+    community_names = list(codes_by_name)
+    energy_list = []
+    for community_code, building_kwh_per_person in zip(np.concatenate(code_pieces).tolist(),
+                                                       np.concatenate(kwh_per_person_pieces).tolist()):
+        energy_list.append((community_names[community_code], building_kwh_per_person))
+
+    efficiency_arrays = []
+    for subtype_pieces in efficiency_pieces:
+        efficiency_arrays.append(np.concatenate(subtype_pieces))
+
+    efficiency_sketches = []
+    for subtype_number in range(len(MULTI_FAMILY_SUBTYPES)):
+        efficiency_sketches.append(merge_sketches([summary["efficiency_sketches"][subtype_number]
+                                                   for summary in summaries]))
+
+    return {
+        "month_averages": month_kwh_averages_from_totals(kwh_sums, kwh_counts),
+        "energy_list": energy_list,
+        "efficiency_arrays": efficiency_arrays,
+        "efficiency_sketches": efficiency_sketches,
+    }
+
+
+def _map_shards(shard_function, fname, workers, serial):
+    """
+    Takes a function of a byte range of a csv file and returns its results for every range of the file, computed in
+    worker processes unless serial is True
+    :param shard_function: (function) a module-level function of (fname, start, end)
+    :param fname: (str) name of a csv file
+    :param workers: (int) the number of worker processes, or None for one per CPU
+    :param serial: (bool) whether to parse every range in this process, one after another
+    :return: (list) the results of every range, in file order
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # small files are split into fewer ranges
+    shard_count = max(1, min(workers, os.path.getsize(fname) // MIN_SHARD_BYTES))
+    byte_ranges = shard_byte_ranges(fname, shard_count)
+
+    if serial or len(byte_ranges) <= 1:
+        return [shard_function(fname, start, end) for start, end in byte_ranges]
+
+    with ProcessPoolExecutor(max_workers=len(byte_ranges)) as executor:
+        futures = [executor.submit(shard_function, fname, start, end) for start, end in byte_ranges]
+        return [future.result() for future in futures]
+
+
+def load_energy_columns_parallel(fname, workers=None, serial=False):
+    """
+    Takes a csv file of Chicago building energy data and returns the columns that the analysis uses, parsing byte
+    ranges of the file in worker processes
+    :param fname: (str) name of a csv file containing Chicago building energy data
+    :param workers: (int) the number of worker processes, or None for one per CPU
+    :param serial: (bool) whether to parse every range in this process, one after another
+    :return: (dict) the columns of the file, see energy_columns.load_energy_columns
+    """
+    return concatenate_columns(_map_shards(_parse_shard_columns, fname, workers, serial))
+
+
+def parse_energy_parallel(fname, workers=None, serial=False):
+    """
+    Takes a csv file of Chicago building energy data and returns the monthly averages, the per-person energy use of
+    residential buildings and the efficiency of multi-family buildings, parsing byte ranges of the file in worker
+    processes and merging their partial results
+    :param fname: (str) name of a csv file containing Chicago building energy data
+    :param workers: (int) the number of worker processes, or None for one per CPU
+    :param serial: (bool) whether to parse every range in this process, one after another
+    :return: (dict) the results of the whole file, see merge_shard_summaries
+    """
+    return merge_shard_summaries(_map_shards(_summarize_shard, fname, workers, serial))
@@ -0,0 +1,129 @@
+"""
+Tester code for energy_parallel.py
+"""
+import shutil
+import tempfile
+
+from energy_parallel import *
+from energy_parallel import _summarize_shard
+from energy_analysis import parse_energy_data, parse_energy_for_apartments, parse_month_kwh_data
+from energy_columns import load_energy_columns
+from energy_synthetic import write_energy_csv
+
+
+def test_shard_byte_ranges():
+    """
+    Runs a series of tests for shard_byte_ranges
+    :return: (bool) were all tests successful
+    """
+    temp_dir = tempfile.mkdtemp()
+    try:
+        fname = os.path.join(temp_dir, "energy-usage-2010.csv")
+        write_energy_csv(fname, 300)
+
+        # split a small file into many ranges, so that the evenly spaced offsets land in the middle of lines
+        byte_ranges = shard_byte_ranges(fname, 37)
+        assert len(byte_ranges) > 20
+
+        # check that the ranges cover every line after the column titles, in order
+        file_in = open(fname, "rb")
+        first_line = file_in.readline()
+        shard_size = (os.path.getsize(fname) - len(first_line)) // 37
+        assert byte_ranges[0][0] == len(first_line)
+        assert byte_ranges[-1][1] == os.path.getsize(fname)
+        offsets_in_lines = 0
+        for shard, ((start, end), (next_start, next_end)) in enumerate(zip(byte_ranges, byte_ranges[1:])):
+            assert end == next_start
+
+            # check that every range starts at the beginning of a line
+            file_in.seek(next_start - 1)
+            assert file_in.read(1) == b"\n"
+
+            # count the evenly spaced offsets that had to be moved to the next line
+            file_in.seek(len(first_line) + (shard + 1) * shard_size - 1)
+            offsets_in_lines += file_in.read(1) != b"\n"
+        file_in.close()
+        assert offsets_in_lines > 0
+
+        # check that the lines of the ranges put together are the lines of the file
+        file_in = open(fname, "rb")
+        data = file_in.read()
+        file_in.close()
+        assert b"".join(data[start:end] for start, end in byte_ranges) == data[len(first_line):]
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return True
+
+
+def test_merge_shard_summaries():
+    """
+    Runs a series of tests for merge_shard_summaries
+    :return: (bool) were all tests successful
+    """
+    temp_dir = tempfile.mkdtemp()
+    try:
+        fname = os.path.join(temp_dir, "energy-usage-2010.csv")
+        write_energy_csv(fname, 2000)
+
+        # check that the results of ranges split in the middle of lines merge into the results of the whole file
+        summaries = [_summarize_shard(fname, start, end) for start, end in shard_byte_ranges(fname, 29)]
+        merged = merge_shard_summaries(summaries)
+        assert merged["month_averages"] == parse_month_kwh_data(fname)
+        assert merged["energy_list"] == parse_energy_data(fname)
+        assert [array.tolist() for array in merged["efficiency_arrays"]] == parse_energy_for_apartments(fname)
+        assert [len(sketch) for sketch in merged["efficiency_sketches"]] == \
+            [len(array) for array in merged["efficiency_arrays"]]
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return True
+
+
+def test_parse_energy_parallel():
+    """
+    Runs a series of tests for load_energy_columns_parallel and parse_energy_parallel
+    :return: (bool) were all tests successful
+    """
+    temp_dir = tempfile.mkdtemp()
+    try:
+        # a file large enough to be split into several ranges of at least MIN_SHARD_BYTES
+        fname = os.path.join(temp_dir, "energy-usage-2010.csv")
+        write_energy_csv(fname, 12000)
+        assert os.path.getsize(fname) > 3 * MIN_SHARD_BYTES
+
+        # check that the parallel columns are the same as the columns of one process
+        columns = load_energy_columns(fname)
+        parallel_columns = load_energy_columns_parallel(fname, workers=4)
+        assert np.array_equal(parallel_columns["month_kwh"], columns["month_kwh"], equal_nan=True)
+        assert [parallel_columns["community_names"][code] for code in parallel_columns["community"]] == \
+            [columns["community_names"][code] for code in columns["community"]]
+
+        parallel = parse_energy_parallel(fname, workers=4)
+        serial = parse_energy_parallel(fname, workers=4, serial=True)
+
+        # check that the parallel results are the same as the serial results and the single-process parsers
+        assert parallel["month_averages"] == serial["month_averages"] == parse_month_kwh_data(fname)
+        assert parallel["energy_list"] == serial["energy_list"] == parse_energy_data(fname)
+        assert [array.tolist() for array in parallel["efficiency_arrays"]] == parse_energy_for_apartments(fname)
+
+        # check that the merged sketches summarize every efficiency value of their sub-type
+        assert [len(sketch) for sketch in parallel["efficiency_sketches"]] == \
+            [len(array) for array in parallel["efficiency_arrays"]]
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return True
+
+
+def main():
+    """
+    For testing purposes
+    """
+    print("test shard_byte_ranges ... " + "PASS" if test_shard_byte_ranges() else "FAIL")
+    print("test merge_shard_summaries ... " + "PASS" if test_merge_shard_summaries() else "FAIL")
+    print("test parse_energy_parallel ... " + "PASS" if test_parse_energy_parallel() else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
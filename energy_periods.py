@@ -0,0 +1,187 @@
+"""
+    Period queries over the month columns of a Chicago energy usage csv
+
+    A period is any run of months, such as June through August or the wrap-around December through February, or any set
+    of months. A PeriodIndex adds up the KWH of every month once, citywide or per community, building type or building
+    sub-type, and keeps running (prefix) sums of the month totals and of the number of buildings with a value in each
+    month over two years laid end to end. The total, count and mean of a run of months is then one subtraction of two
+    prefix sums, whether or not the run wraps around the end of the year, and a set of months is a few such runs, so
+    a query never looks at a building again. The same month totals per community are the load profiles of the
+    community areas.
+"""
+import numpy as np
+
+from energy_columns import GROUP_COLUMNS, MONTH_INDICES
+
+# the seasons compared by the dashboard, as month column indices: December through February and June through August
+HEATING_MONTHS = (15, 4, 5)
+COOLING_MONTHS = (9, 10, 11)
+
+_MONTH_COUNT = len(MONTH_INDICES)
+
+
+def _month_position(month_index):
+    """
+    :param month_index: (int) index of a month column, 4 for January through 15 for December
+    :return: (int) the position of the month in the year, 0 for January through 11 for December
+    """
+    if month_index not in MONTH_INDICES:
+        raise ValueError("not a month column index: " + str(month_index))
+    return month_index - MONTH_INDICES[0]
+
+
+def _month_runs(month_indices):
+    """
+    Takes a set of months and returns the runs of consecutive months it is made of
+    :param month_indices: (list) indices of month columns, in any order
+    :return: (list) a list of tuples (int(position of the first month), int(number of months)), a run that wraps from
+    December into January counting as one
+    """
+    positions = sorted(set(_month_position(month_index) for month_index in month_indices))
+    runs = []
+    for position in positions:
+        if runs and runs[-1][0] + runs[-1][1] == position:
+            runs[-1][1] += 1
+        else:
+            runs.append([position, 1])
+
+    # December and January are neighbours, so a run ending in December continues into the run starting in January
+    if len(runs) > 1 and runs[0][0] == 0 and runs[-1][0] + runs[-1][1] == _MONTH_COUNT:
+        runs[-1][1] += runs.pop(0)[1]
+    return [tuple(run) for run in runs]
+
+
+class PeriodIndex:
+    """
+    Prefix sums of the month totals and counts of the buildings of an energy csv, per group, from which the total,
+    count and mean KWH of any period is read in constant time
+    """
+
+    def __init__(self, month_kwh, group_codes=None, group_names=None):
+        """
+        Adds up the KWH of every month of every group in one pass
+        :param month_kwh: (array) float64 array of shape (buildings, 12) of KWH per month, nan where there is no value
+        :param group_codes: (array) the int group code of every building, or None for one citywide group
+        :param group_names: (list) the name of every group code, or None for one citywide group
+        """
+        month_kwh = np.asarray(month_kwh, dtype=np.float64).reshape(-1, _MONTH_COUNT)
+        if group_codes is None:
+            group_codes = np.zeros(len(month_kwh), dtype=np.intp)
+            group_names = ["Chicago"]
+        self.names = list(group_names)
+
+        # every (group, month) pair is one bin, so one bincount totals every month of every group
+        bins = np.asarray(group_codes, dtype=np.intp)[:, None] * _MONTH_COUNT + np.arange(_MONTH_COUNT)
+        present = ~np.isnan(month_kwh)
+        bin_count = len(self.names) * _MONTH_COUNT
+        totals = np.bincount(bins[present], weights=month_kwh[present], minlength=bin_count).astype(np.float64)
+        counts = np.bincount(bins[present], minlength=bin_count).astype(np.int64)
+
+        self.month_totals = totals.reshape(-1, _MONTH_COUNT)
+        self.month_counts = counts.reshape(-1, _MONTH_COUNT)
+
+        # running sums over two years end to end, so that a run wrapping into January is still one subtraction
+        self._total_prefix = self._prefix_sums(self.month_totals)
+        self._count_prefix = self._prefix_sums(self.month_counts)
+
+    @staticmethod
+    def _prefix_sums(month_values):
+        """
+        :param month_values: (array) array of shape (groups, 12) of a value per group and month
+        :return: (array) array of shape (groups, 25) whose column i is the sum of the first i months of two years
+        """
+        two_years = np.concatenate((month_values, month_values), axis=1)
+        return np.concatenate((np.zeros((len(month_values), 1), dtype=month_values.dtype),
+                               np.cumsum(two_years, axis=1)), axis=1)
+
+    @classmethod
+    def from_columns(cls, columns, group_column=None):
+        """
+        Takes the columns of an energy csv and returns the period index of every group of one column
+        :param columns: (dict) the columns of an energy csv, see energy_columns.load_energy_columns
+        :param group_column: (str) the column to group by, one of energy_columns.GROUP_COLUMNS, or None for citywide
+        :return: (PeriodIndex) the period index
+        """
+        if group_column is None:
+            return cls(columns["month_kwh"])
+        return cls(columns["month_kwh"], columns[group_column], columns[GROUP_COLUMNS[group_column]])
+
+    def _runs_totals(self, runs):
+        """
+        :param runs: (list) a list of tuples (int(position of the first month), int(number of months))
+        :return: (dict) the period statistics of the runs together, see range_totals
+        """
+        totals = np.zeros(len(self.names))
+        counts = np.zeros(len(self.names), dtype=np.int64)
+        for start, length in runs:
+            totals += self._total_prefix[:, start + length] - self._total_prefix[:, start]
+            counts += self._count_prefix[:, start + length] - self._count_prefix[:, start]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = totals / counts
+        return {"total": totals, "count": counts, "mean": means}
+
+    def range_totals(self, first_month_index, last_month_index):
+        """
+        Returns the KWH statistics of every group over a run of months. A last month before the first wraps around the
+        end of the year, so range_totals(15, 5) is December through February
+        :param first_month_index: (int) index of the first month column of the period
+        :param last_month_index: (int) index of the last month column of the period
+        :return: (dict) arrays indexed by group code:
+            "total": (array) float64 total KWH used over the period
+            "count": (array) int64 number of monthly values over the period
+            "mean": (array) float64 mean KWH of a monthly value, nan for groups without values
+        """
+        start = _month_position(first_month_index)
+        length = (_month_position(last_month_index) - start) % _MONTH_COUNT + 1
+        return self._runs_totals([(start, length)])
+
+    def month_set_totals(self, month_indices):
+        """
+        Returns the KWH statistics of every group over any set of months
+        :param month_indices: (list) indices of the month columns of the period, in any order
+        :return: (dict) the period statistics of every group, see range_totals
+        """
+        return self._runs_totals(_month_runs(month_indices))
+
+    def compare_periods(self, first_month_indices=HEATING_MONTHS, second_month_indices=COOLING_MONTHS):
+        """
+        Returns the mean monthly KWH of every group over two periods, such as the heating and cooling seasons
+        :param first_month_indices: (list) indices of the month columns of the first period
+        :param second_month_indices: (list) indices of the month columns of the second period
+        :return: (dict) a dictionary of {str(group name): (float(first period mean), float(second period mean))} for
+        every group with values in both periods
+        """
+        first_means = self.month_set_totals(first_month_indices)["mean"]
+        second_means = self.month_set_totals(second_month_indices)["mean"]
+
+        compared = {}
+        for name, first_mean, second_mean in zip(self.names, first_means.tolist(), second_means.tolist()):
+            if name != "" and not (np.isnan(first_mean) or np.isnan(second_mean)):
+                compared[name] = (first_mean, second_mean)
+        return compared
+
+
+def community_month_profiles(columns):
+    """
+    Takes the columns of an energy csv and returns the total and mean KWH of every month in every community area,
+    from one grouped pass over the buildings
+    :param columns: (dict) the columns of an energy csv, see energy_columns.load_energy_columns
+    :return: (dict) arrays with one row per named community, in order of name:
+        "names": (list) the name of the community of every row
+        "total": (array) float64 array of shape (communities, 12) of the KWH used in each month, January through
+        December
+        "count": (array) int64 array of shape (communities, 12) of the number of buildings with a value in each month
+        "mean": (array) float64 array of shape (communities, 12) of the mean KWH of a building in each month, nan where
+        no building has a value
+    """
+    period_index = PeriodIndex.from_columns(columns, "community")
+
+    # buildings without a community name are left out, and the rest are ordered by name
+    rows = sorted((name, code) for code, name in enumerate(period_index.names) if name != "")
+    codes = np.array([code for name, code in rows], dtype=np.intp)
+
+    totals = period_index.month_totals[codes]
+    counts = period_index.month_counts[codes]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = totals / counts
+    return {"names": [name for name, code in rows], "total": totals, "count": counts, "mean": means}
@@ -0,0 +1,103 @@
+"""
+Tester code for energy_periods.py
+"""
+
+from energy_periods import *
+
+# three buildings in two communities, with KWH 1 through 12 in every month but one missing value
+MONTH_KWH = np.array([np.arange(1.0, 13.0), np.arange(1.0, 13.0) * 10, np.arange(1.0, 13.0) * 100])
+MONTH_KWH[2, 11] = np.nan
+COMMUNITY_CODES = [0, 1, 1]
+COMMUNITY_NAMES = ["Ashburn", "Uptown"]
+
+
+def test_range_totals():
+    """
+    Runs a series of tests for PeriodIndex.range_totals
+    :return: (bool) were all tests successful
+    """
+    period_index = PeriodIndex(MONTH_KWH, COMMUNITY_CODES, COMMUNITY_NAMES)
+
+    # check a run of months within the year, June through August
+    summer = period_index.range_totals(9, 11)
+    assert summer["total"].tolist() == [21.0, 2310.0]
+    assert summer["count"].tolist() == [3, 6]
+    assert summer["mean"].tolist() == [7.0, 385.0]
+
+    # check a run wrapping around the end of the year, December through February, with a missing value
+    winter = period_index.range_totals(15, 5)
+    assert winter["total"].tolist() == [15.0, 450.0]
+    assert winter["count"].tolist() == [3, 5]
+
+    # check that the whole year is one run
+    assert period_index.range_totals(4, 15)["total"].tolist() == [78.0, 7380.0]
+
+    return True
+
+
+def test_month_set_totals():
+    """
+    Runs a series of tests for PeriodIndex.month_set_totals
+    :return: (bool) were all tests successful
+    """
+    period_index = PeriodIndex(MONTH_KWH)
+
+    # check that a set of months gives the same totals as adding up the month columns
+    month_totals = period_index.month_set_totals([4, 7, 8, 15])
+    assert month_totals["total"].tolist() == [np.nansum(MONTH_KWH[:, [0, 3, 4, 11]])]
+    assert month_totals["count"].tolist() == [11]
+    winter_total = period_index.range_totals(15, 5)["total"].tolist()
+    assert period_index.month_set_totals([15, 4, 5])["total"].tolist() == winter_total
+
+    # check that a month that isn't a month column is refused
+    try:
+        period_index.month_set_totals([3])
+        assert False
+    except ValueError:
+        pass
+
+    return True
+
+
+def test_compare_periods():
+    """
+    Runs a series of tests for PeriodIndex.compare_periods
+    :return: (bool) were all tests successful
+    """
+    period_index = PeriodIndex(MONTH_KWH, COMMUNITY_CODES, COMMUNITY_NAMES)
+    compared = period_index.compare_periods(HEATING_MONTHS, COOLING_MONTHS)
+    assert compared == {"Ashburn": (5.0, 7.0), "Uptown": (90.0, 385.0)}
+
+    return True
+
+
+def test_community_month_profiles():
+    """
+    Runs a series of tests for community_month_profiles
+    :return: (bool) were all tests successful
+    """
+    columns = {"month_kwh": MONTH_KWH, "community": np.array([1, 0, 1]), "community_names": ["Uptown", "Ashburn"]}
+    profiles = community_month_profiles(columns)
+
+    # check that the rows are in order of name, with a total and mean for every month
+    assert profiles["names"] == ["Ashburn", "Uptown"]
+    assert profiles["total"].shape == profiles["mean"].shape == (2, 12)
+    assert profiles["total"][1].tolist() == MONTH_KWH[1].tolist()
+    assert profiles["count"][0].tolist() == [2] * 11 + [1]
+    assert profiles["mean"][0, 0] == 50.5 and profiles["mean"][0, 11] == 12.0
+
+    return True
+
+
+def main():
+    """
+    For testing purposes
+    """
+    print("test range_totals ... " + "PASS" if test_range_totals() else "FAIL")
+    print("test month_set_totals ... " + "PASS" if test_month_set_totals() else "FAIL")
+    print("test compare_periods ... " + "PASS" if test_compare_periods() else "FAIL")
+    print("test community_month_profiles ... " + "PASS" if test_community_month_profiles() else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+    Streaming analysis of Chicago energy usage csvs of any size
+
+    Every function here reads its energy csv one block of lines at a time with energy_columns.iter_energy_chunks and
+    folds each block into running totals, so the memory used stays bounded by the block size no matter how many years
+    of buildings the file holds.
+"""
+import numpy as np
+
+from energy_columns import (CHUNK_ROWS, MONTH_INDICES, MULTI_FAMILY_SUBTYPES, iter_energy_chunks,
+                            month_kwh_averages_from_totals, month_kwh_totals, multi_family_kwh_per_sq_ft,
+                            residential_kwh_per_person, residential_kwh_per_person_mask)
+from quantile_sketch import QuantileSketch
+
+
+def stream_month_kwh_averages(fname, chunk_rows=CHUNK_ROWS):
+    """
+    Takes a csv file of Chicago KWH energy data and returns the average KWH usage of every month, adding up the month
+    sums and counts of one block of lines at a time
+    :param fname: (str) name of a csv file containing KWH energy usage
+    :param chunk_rows: (int) the number of lines read at a time
+    :return: (dict) a dictionary of {int(month column index): int(average KWH used in Chicago during that month)}
+    """
+    kwh_sums = np.zeros(len(MONTH_INDICES), dtype=np.float64)
+    kwh_counts = np.zeros(len(MONTH_INDICES), dtype=np.int64)
+
+    for chunk in iter_energy_chunks(fname, chunk_rows):
+        chunk_sums, chunk_counts = month_kwh_totals(chunk)
+        kwh_sums += chunk_sums
+        kwh_counts += chunk_counts
+
+    return month_kwh_averages_from_totals(kwh_sums, kwh_counts)
+
+
+def iter_residential_kwh_per_person(fname, chunk_rows=CHUNK_ROWS):
+    """
+    Takes a csv file of Chicago building energy data and yields the community and annual energy usage per person of
+    every residential building, one block of lines at a time
+    :param fname: (str) name of a csv file containing Chicago building energy data
+    :param chunk_rows: (int) the number of lines read at a time
+    :return: (generator) tuples of (community name, average individual energy use (kw/person) in the residential
+    building), in file order
+    """
+    for chunk in iter_energy_chunks(fname, chunk_rows):
+        community_codes, kwh_per_person = residential_kwh_per_person(chunk)
+        community_names = chunk["community_names"]
+        for community_code, building_kwh_per_person in zip(community_codes.tolist(), kwh_per_person.tolist()):
+            yield community_names[community_code], building_kwh_per_person
+
+
+def stream_community_kwh_per_person(fname, chunk_rows=CHUNK_ROWS):
+    """
+    Takes a csv file of Chicago building energy data and returns, for every community, the number of residential
+    buildings and the sum of their annual energy usage per person, adding up one block of lines at a time
+    :param fname: (str) name of a csv file containing Chicago building energy data
+    :param chunk_rows: (int) the number of lines read at a time
+    :return: (dict) a dictionary of {str(community name): [int(building count), float(sum of kw/person)]}
+    """
+    community_totals = {}
+
+    for chunk in iter_energy_chunks(fname, chunk_rows):
+        community_codes, kwh_per_person = residential_kwh_per_person(chunk)
+
+        # total up the block by community code, then add the block totals to the running totals
+        code_count = len(chunk["community_names"])
+        building_counts = np.bincount(community_codes, minlength=code_count)
+        kwh_sums = np.bincount(community_codes, weights=kwh_per_person, minlength=code_count)
+        for community_code in np.flatnonzero(building_counts).tolist():
+            totals = community_totals.setdefault(chunk["community_names"][community_code], [0, 0.0])
+            totals[0] += int(building_counts[community_code])
+            totals[1] += float(kwh_sums[community_code])
+
+    return community_totals
+
+
+def stream_multi_family_kwh_per_sq_ft(fname, chunk_rows=CHUNK_ROWS):
+    """
+    Takes a csv file of Chicago building energy data and returns the energy efficiency of the multi-family residential
+    buildings with 1 or more floors, parsing one block of lines at a time and keeping only the efficiency values
+    :param fname: (str) name of a csv file containing Chicago building energy data
+    :param chunk_rows: (int) the number of lines read at a time
+    :return: (list) a list of float64 arrays of energy efficiency values (KWH/sq feet), one per sub-type in
+    MULTI_FAMILY_SUBTYPES
+    """
+    pieces = []
+    for subtype in MULTI_FAMILY_SUBTYPES:
+        pieces.append([np.empty(0, dtype=np.float64)])
+
+    for chunk in iter_energy_chunks(fname, chunk_rows):
+        for subtype_pieces, efficiency_array in zip(pieces, multi_family_kwh_per_sq_ft(chunk)):
+            subtype_pieces.append(efficiency_array)
+
+    efficiency_arrays = []
+    for subtype_pieces in pieces:
+        efficiency_arrays.append(np.concatenate(subtype_pieces))
+    return efficiency_arrays
+
+
+def stream_multi_family_sketches(fname, chunk_rows=CHUNK_ROWS):
+    """
+    Takes a csv file of Chicago building energy data and returns quantile sketches of the energy efficiency of the
+    multi-family residential buildings with 1 or more floors, parsing one block of lines at a time so that only the
+    sketches are kept
+    :param fname: (str) name of a csv file containing Chicago building energy data
+    :param chunk_rows: (int) the number of lines read at a time
+    :return: (list) a list of quantile sketches of energy efficiency values (KWH/sq feet), one per sub-type in
+    MULTI_FAMILY_SUBTYPES
+    """
+    efficiency_sketches = []
+    for subtype in MULTI_FAMILY_SUBTYPES:
+        efficiency_sketches.append(QuantileSketch())
+
+    for chunk in iter_energy_chunks(fname, chunk_rows):
+        for efficiency_sketch, efficiency_array in zip(efficiency_sketches, multi_family_kwh_per_sq_ft(chunk)):
+            efficiency_sketch.add(efficiency_array)
+
+    return efficiency_sketches
+
+
+def stream_community_kwh_and_population(fname, chunk_rows=CHUNK_ROWS):
+    """
+    Takes a csv file of Chicago building energy data and returns the month sums and counts of every building along with
+    the total KWH and population of the residential buildings of every community, adding up one block of lines at a time
+    :param fname: (str) name of a csv file containing Chicago building energy data
+    :param chunk_rows: (int) the number of lines read at a time
+    :return: (tuple) the float64 array of the KWH sum and int64 array of the number of KWH values of each month, see
+    energy_columns.month_kwh_totals, and a dictionary of {str(community name): [float(total KWH), float(population)]}
+    of the residential buildings of the per-person analysis
+    """
+    kwh_sums = np.zeros(len(MONTH_INDICES), dtype=np.float64)
+    kwh_counts = np.zeros(len(MONTH_INDICES), dtype=np.int64)
+    community_totals = {}
+
+    for chunk in iter_energy_chunks(fname, chunk_rows):
+        chunk_sums, chunk_counts = month_kwh_totals(chunk)
+        kwh_sums += chunk_sums
+        kwh_counts += chunk_counts
+
+        # total up the block by community code, then add the block totals to the running totals
+        mask = residential_kwh_per_person_mask(chunk)
+        community_codes = chunk["community"][mask]
+        code_count = len(chunk["community_names"])
+        total_kwh = np.bincount(community_codes, chunk["total_kwh"][mask], minlength=code_count)
+        population = np.bincount(community_codes, chunk["population"][mask], minlength=code_count)
+        for community_code in np.flatnonzero(population).tolist():
+            totals = community_totals.setdefault(chunk["community_names"][community_code], [0.0, 0.0])
+            totals[0] += float(total_kwh[community_code])
+            totals[1] += float(population[community_code])
+
+    return kwh_sums, kwh_counts, community_totals
@@ -0,0 +1,169 @@
+"""
+Tester code for energy_stream.py
+"""
+import os
+import shutil
+import tempfile
+
+from conftest import write_small_energy_csv
+from energy_stream import *
+from energy_columns import load_energy_columns, month_kwh_averages, month_kwh_totals, multi_family_kwh_per_sq_ft, \
+    residential_kwh_per_person, residential_kwh_per_person_mask
+from energy_synthetic import write_energy_csv
+
+# the block sizes the streamed results are checked at, from one line at a time to the whole file at once
+TEST_CHUNK_ROWS = [1, 7, 1000, CHUNK_ROWS]
+
+
+def test_stream_month_kwh_averages():
+    """
+    Runs a series of tests for stream_month_kwh_averages
+    :return: (bool) were all tests successful
+    """
+    temp_dir = tempfile.mkdtemp()
+    try:
+        fname = os.path.join(temp_dir, "energy-usage-2010.csv")
+        write_energy_csv(fname, 2000)
+
+        # check that reading in blocks of any size gives the same averages as reading the whole file
+        month_averages = month_kwh_averages(load_energy_columns(fname))
+        for chunk_rows in TEST_CHUNK_ROWS:
+            assert stream_month_kwh_averages(fname, chunk_rows) == month_averages
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return True
+
+
+def test_iter_residential_kwh_per_person():
+    """
+    Runs a series of tests for iter_residential_kwh_per_person
+    :return: (bool) were all tests successful
+    """
+    temp_dir = tempfile.mkdtemp()
+    try:
+        # only creates data entries if all necessary data is present, even one line at a time
+        small_fname = write_small_energy_csv(os.path.join(temp_dir, "energy-small.csv"))
+        assert list(iter_residential_kwh_per_person(small_fname, 1)) == [("Ashburn", 732.7142857142857)]
+
+        # check that the buildings are the same as those of the whole file, in order
+        fname = os.path.join(temp_dir, "energy-usage-2010.csv")
+        write_energy_csv(fname, 2000)
+        columns = load_energy_columns(fname)
+        community_codes, kwh_per_person = residential_kwh_per_person(columns)
+        expected = [(columns["community_names"][code], value)
+                    for code, value in zip(community_codes.tolist(), kwh_per_person.tolist())]
+        for chunk_rows in TEST_CHUNK_ROWS:
+            assert list(iter_residential_kwh_per_person(fname, chunk_rows)) == expected
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return True
+
+
+def test_stream_community_kwh_per_person():
+    """
+    Runs a series of tests for stream_community_kwh_per_person
+    :return: (bool) were all tests successful
+    """
+    temp_dir = tempfile.mkdtemp()
+    try:
+        small_fname = write_small_energy_csv(os.path.join(temp_dir, "energy-small.csv"))
+        assert stream_community_kwh_per_person(small_fname, 1) == {"Ashburn": [1, 732.7142857142857]}
+
+        # check that the totals add up to every residential building of the file, whatever the block size
+        fname = os.path.join(temp_dir, "energy-usage-2010.csv")
+        write_energy_csv(fname, 2000)
+        building_count = len(list(iter_residential_kwh_per_person(fname)))
+        for chunk_rows in TEST_CHUNK_ROWS:
+            community_totals = stream_community_kwh_per_person(fname, chunk_rows)
+            assert sum(totals[0] for totals in community_totals.values()) == building_count
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return True
+
+
+def test_stream_community_kwh_and_population():
+    """
+    Runs a series of tests for stream_community_kwh_and_population
+    :return: (bool) were all tests successful
+    """
+    temp_dir = tempfile.mkdtemp()
+    try:
+        fname = os.path.join(temp_dir, "energy-usage-2010.csv")
+        write_energy_csv(fname, 2000)
+        columns = load_energy_columns(fname)
+        month_sums, month_counts = month_kwh_totals(columns)
+        mask = residential_kwh_per_person_mask(columns)
+
+        # check that reading in blocks of any size gives the totals of the whole file
+        for chunk_rows in TEST_CHUNK_ROWS:
+            kwh_sums, kwh_counts, community_totals = stream_community_kwh_and_population(fname, chunk_rows)
+            assert np.allclose(kwh_sums, month_sums) and kwh_counts.tolist() == month_counts.tolist()
+            assert np.isclose(sum(totals[0] for totals in community_totals.values()),
+                              columns["total_kwh"][mask].sum())
+            assert np.isclose(sum(totals[1] for totals in community_totals.values()),
+                              columns["population"][mask].sum())
+            assert "" not in community_totals
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return True
+
+
+def test_stream_multi_family_kwh_per_sq_ft():
+    """
+    Runs a series of tests for stream_multi_family_kwh_per_sq_ft
+    :return: (bool) were all tests successful
+    """
+    temp_dir = tempfile.mkdtemp()
+    try:
+        small_fname = write_small_energy_csv(os.path.join(temp_dir, "energy-small.csv"))
+        efficiency_arrays = stream_multi_family_kwh_per_sq_ft(small_fname, 1)
+        assert [array.tolist() for array in efficiency_arrays] == [[10258 / 5000], [3.0]]
+
+        # check against the efficiencies of the whole file
+        fname = os.path.join(temp_dir, "energy-usage-2010.csv")
+        write_energy_csv(fname, 2000)
+        expected = [array.tolist() for array in multi_family_kwh_per_sq_ft(load_energy_columns(fname))]
+        for chunk_rows in TEST_CHUNK_ROWS:
+            assert [array.tolist() for array in stream_multi_family_kwh_per_sq_ft(fname, chunk_rows)] == expected
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return True
+
+
+def test_stream_multi_family_sketches():
+    """
+    Runs a series of tests for stream_multi_family_sketches
+    :return: (bool) were all tests successful
+    """
+    temp_dir = tempfile.mkdtemp()
+    try:
+        small_fname = write_small_energy_csv(os.path.join(temp_dir, "energy-small.csv"))
+        efficiency_sketches = stream_multi_family_sketches(small_fname, 1)
+        assert [sketch.median() for sketch in efficiency_sketches] == [10258 / 5000, 3.0]
+        assert [len(sketch) for sketch in efficiency_sketches] == [1, 1]
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return True
+
+
+def main():
+    """
+    For testing purposes
+    """
+    print("test stream_month_kwh_averages ... " + "PASS" if test_stream_month_kwh_averages() else "FAIL")
+    print("test iter_residential_kwh_per_person ... " + "PASS" if test_iter_residential_kwh_per_person() else "FAIL")
+    print("test stream_community_kwh_per_person ... " + "PASS" if test_stream_community_kwh_per_person() else "FAIL")
+    print("test stream_community_kwh_and_population ... " + "PASS" if test_stream_community_kwh_and_population()
+          else "FAIL")
+    print("test stream_multi_family_kwh_per_sq_ft ... " + "PASS" if test_stream_multi_family_kwh_per_sq_ft() else "FAIL")
+    print("test stream_multi_family_sketches ... " + "PASS" if test_stream_multi_family_sketches() else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+    Synthetic Chicago energy usage and socioeconomic csvs
+
+    The files written here have the same layout as the real 2010 energy usage csv (73 columns, with the KWH, square
+    footage, population and stories columns at their usual positions) and the real socioeconomic csv, with random but
+    plausible values and a few empty cells, so that the analysis can be timed and tested at any size without the real
+    data. Rows are generated and written a block at a time with NumPy, so a file of millions of buildings doesn't have
+    to fit in memory.
+
+    Usage: python energy_synthetic.py ROWS [--energy FILE] [--socioeconomic FILE] [--seed N]
+"""
+import argparse
+
+import numpy as np
+
+from energy_columns import MONTH_NAMES
+
+# the 77 community areas of Chicago, in the order of the socioeconomic csv
+COMMUNITY_NAMES = ["Rogers Park", "West Ridge", "Uptown", "Lincoln Square", "North Center", "Lake View",
+                   "Lincoln Park", "Near North Side", "Edison Park", "Norwood Park", "Jefferson Park", "Forest Glen",
+                   "North Park", "Albany Park", "Portage Park", "Irving Park", "Dunning", "Montclaire",
+                   "Belmont Cragin", "Hermosa", "Avondale", "Logan Square", "Humboldt park", "West Town", "Austin",
+                   "West Garfield Park", "East Garfield Park", "Near West Side", "North Lawndale", "South Lawndale",
+                   "Lower West Side", "Loop", "Near South Side", "Armour Square", "Douglas", "Oakland", "Fuller Park",
+                   "Grand Boulevard", "Kenwood", "Washington Park", "Hyde Park", "Woodlawn", "South Shore", "Chatham",
+                   "Avalon Park", "South Chicago", "Burnside", "Calumet Heights", "Roseland", "Pullman",
+                   "South Deering", "East Side", "West Pullman", "Riverdale", "Hegewisch", "Garfield Ridge",
+                   "Archer Heights", "Brighton Park", "McKinley Park", "Bridgeport", "New City", "West Elsdon",
+                   "Gage Park", "Clearing", "West Lawn", "Chicago Lawn", "West Englewood", "Englewood",
+                   "Greater Grand Crossing", "Ashburn", "Auburn Gresham", "Beverly", "Washington Height",
+                   "Mount Greenwood", "Morgan Park", "O'Hare", "Edgewater"]
+
+# the building types and the sub-types of each
+BUILDING_SUBTYPES = {"Residential": ["Multi 7+", "Multi < 7", "Single Family"],
+                     "Commercial": ["Commercial"],
+                     "Industrial": ["Industrial"]}
+
+# the share of buildings of each type, and the share of cells left empty
+BUILDING_TYPE_SHARES = {"Residential": 0.7, "Commercial": 0.25, "Industrial": 0.05}
+EMPTY_SHARE = 0.05
+
+# the number of buildings generated and written at a time
+BLOCK_ROWS = 100000
+
+_STATISTICS = ["MEAN", "STANDARD DEVIATION", "MINIMUM", "1ST QUARTILE", "2ND QUARTILE", "3RD QUARTILE", "MAXIMUM"]
+
+# the 73 column titles of the 2010 energy csv
+ENERGY_COLUMN_TITLES = (["COMMUNITY AREA NAME", "CENSUS BLOCK", "BUILDING TYPE", "BUILDING_SUBTYPE"]
+                        + ["KWH " + month_name + " 2010" for month_name in MONTH_NAMES]
+                        + ["TOTAL KWH", "ELECTRICITY ACCOUNTS", "ZERO KWH ACCOUNTS"]
+                        + ["THERM " + month_name + " 2010" for month_name in MONTH_NAMES]
+                        + ["TOTAL THERMS", "GAS ACCOUNTS", "KWH TOTAL SQFT"]
+                        + ["KWH " + statistic + " 2010" for statistic in _STATISTICS]
+                        + ["KWH SQFT " + statistic + " 2010" for statistic in _STATISTICS]
+                        + ["THERM " + statistic + " 2010" for statistic in _STATISTICS]
+                        + ["THERMS TOTAL SQFT"]
+                        + ["THERMS SQFT " + statistic + " 2010" for statistic in _STATISTICS]
+                        + ["TOTAL POPULATION", "TOTAL UNITS", "AVERAGE STORIES", "AVERAGE BUILDING AGE",
+                           "AVERAGE HOUSESIZE", "OCCUPIED UNITS", "OCCUPIED UNITS PERCENTAGE",
+                           "RENTER-OCCUPIED HOUSING UNITS", "RENTER-OCCUPIED HOUSING PERCENTAGE",
+                           "OCCUPIED HOUSING UNITS"])
+
+SOCIOECONOMIC_COLUMN_TITLES = ["Community Area Number", "COMMUNITY AREA NAME", "PERCENT OF HOUSING CROWDED",
+                               "PERCENT HOUSEHOLDS BELOW POVERTY", "PERCENT AGED 16+ UNEMPLOYED",
+                               "PERCENT AGED 25+ WITHOUT HIGH SCHOOL DIPLOMA", "PERCENT AGED UNDER 18 OR OVER 64",
+                               "PER CAPITA INCOME ", "HARDSHIP INDEX"]
+
+# the columns the analysis doesn't use are filled from a few random variants each, as the runs of columns between
+# the used ones: after total kwh, after square footage, and after average stories
+_FILLER_RUNS = [(17, 33), (34, 63), (66, 73)]
+_FILLER_VARIANTS = 16
+
+
+def _text_column(values, empty):
+    """
+    :param values: (array) the values of a column
+    :param empty: (array) a boolean array that is True where the cell is left empty
+    :return: (array) an object array of the text of every cell
+    """
+    text = values.astype(str).astype(object)
+    text[empty] = ""
+    return text
+
+
+def _filler_text(rng):
+    """
+    :param rng: (Generator) the random number generator
+    :return: (list) for every run of unused columns, an object array of variants of the text of the run
+    """
+    filler_text = []
+    for start, end in _FILLER_RUNS:
+        variants = rng.integers(0, 100, size=(_FILLER_VARIANTS, end - start)).astype(str)
+        filler_text.append(np.array([",".join(variant) for variant in variants.tolist()], dtype=object))
+    return filler_text
+
+
+def energy_block(rng, first_row, rows, filler_text):
+    """
+    Generates the lines of a block of buildings of a synthetic energy csv
+    :param rng: (Generator) the random number generator
+    :param first_row: (int) the number of buildings generated before this block, used for the census blocks
+    :param rows: (int) the number of buildings in the block
+    :param filler_text: (list) the variants of the unused columns, see _filler_text
+    :return: (str) the lines of the block, each ending in "\n"
+    """
+    building_types = list(BUILDING_TYPE_SHARES)
+    type_codes = rng.choice(len(building_types), size=rows, p=list(BUILDING_TYPE_SHARES.values()))
+    subtype_names = np.empty(rows, dtype=object)
+    for type_code, building_type in enumerate(building_types):
+        of_type = type_codes == type_code
+        subtype_names[of_type] = rng.choice(BUILDING_SUBTYPES[building_type], size=int(of_type.sum()))
+
+    # monthly use swings between a winter and a summer peak, and scales with the size of the building
+    sq_ft = rng.integers(500, 90000, size=rows)
+    season = 1.0 + 0.25 * np.cos(np.arange(12) * np.pi / 6.0)
+    month_kwh = (sq_ft[:, None] * rng.uniform(0.5, 2.0, size=(rows, 1)) * season * 0.1).astype(np.int64)
+    month_empty = rng.random((rows, 12)) < EMPTY_SHARE
+    total_kwh = np.where(month_empty, 0, month_kwh).sum(axis=1)
+
+    cells = [_text_column(np.array(COMMUNITY_NAMES)[rng.integers(0, len(COMMUNITY_NAMES), size=rows)],
+                          rng.random(rows) < EMPTY_SHARE / 2),
+             np.arange(170310000000000 + first_row, 170310000000000 + first_row + rows).astype(str).astype(object),
+             np.array(building_types, dtype=object)[type_codes],
+             subtype_names]
+    cells += [_text_column(month_kwh[:, month], month_empty[:, month]) for month in range(12)]
+    cells += [_text_column(total_kwh, rng.random(rows) < EMPTY_SHARE),
+              filler_text[0][rng.integers(0, _FILLER_VARIANTS, size=rows)],
+              _text_column(sq_ft, rng.random(rows) < EMPTY_SHARE),
+              filler_text[1][rng.integers(0, _FILLER_VARIANTS, size=rows)],
+              _text_column(rng.integers(1, 300, size=rows), rng.random(rows) < EMPTY_SHARE),
+              rng.integers(1, 50, size=rows).astype(str).astype(object),
+              _text_column(np.round(rng.uniform(0.5, 20.0, size=rows), 1), rng.random(rows) < EMPTY_SHARE),
+              filler_text[2][rng.integers(0, _FILLER_VARIANTS, size=rows)]]
+
+    lines = np.column_stack(cells).tolist()
+    return "\n".join(map(",".join, lines)) + "\n"
+
+
+def write_energy_csv(fname, rows, seed=0, block_rows=BLOCK_ROWS):
+    """
+    Writes a synthetic energy usage csv with the layout of the 2010 file
+    :param fname: (str) name of the csv file to write
+    :param rows: (int) the number of buildings
+    :param seed: (int) the seed of the random values, so that the same seed always writes the same file
+    :param block_rows: (int) the number of buildings generated and written at a time
+    """
+    rng = np.random.default_rng(seed)
+    filler_text = _filler_text(rng)
+    with open(fname, "w") as file_out:
+        file_out.write(",".join(ENERGY_COLUMN_TITLES) + "\n")
+        for first_row in range(0, rows, block_rows):
+            file_out.write(energy_block(rng, first_row, min(block_rows, rows - first_row), filler_text))
+
+
+def write_socioeconomic_csv(fname, seed=0):
+    """
+    Writes a synthetic socioeconomic csv with a line for every community area and a last line for all of Chicago
+    :param fname: (str) name of the csv file to write
+    :param seed: (int) the seed of the random values
+    """
+    rng = np.random.default_rng(seed)
+    with open(fname, "w") as file_out:
+        file_out.write(",".join(SOCIOECONOMIC_COLUMN_TITLES) + "\n")
+        for community_number, community_name in enumerate(COMMUNITY_NAMES + ["CHICAGO"]):
+            percentages = np.round(rng.uniform(1.0, 60.0, size=5), 1).astype(str).tolist()
+            line = ([str(community_number + 1) if community_name != "CHICAGO" else "", community_name] + percentages
+                    + [str(int(rng.integers(8000, 90000))), str(int(rng.integers(1, 100)))])
+            file_out.write(",".join(line) + "\n")
+
+
+def main():
+    """
+    Writes a synthetic energy csv and socioeconomic csv of the size given on the command line
+    """
+    parser = argparse.ArgumentParser(description="Write synthetic Chicago energy usage and socioeconomic csvs")
+    parser.add_argument("rows", type=int, help="the number of buildings in the energy csv")
+    parser.add_argument("--energy", default="energy-usage-synthetic.csv", help="the energy csv to write")
+    parser.add_argument("--socioeconomic", default="socioeconomic-synthetic.csv", help="the socioeconomic csv to write")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the random values")
+    args = parser.parse_args()
+
+    write_energy_csv(args.energy, args.rows, args.seed)
+    write_socioeconomic_csv(args.socioeconomic, args.seed)
+
+
+if __name__ == "__main__":
+    main()
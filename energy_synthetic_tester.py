@@ -0,0 +1,97 @@
+"""
+Tester code for energy_synthetic.py
+"""
+import os
+import tempfile
+
+from energy_synthetic import *
+from energy_columns import load_energy_columns
+
+
+def test_write_energy_csv():
+    """
+    Runs a series of tests for write_energy_csv
+    :return: (bool) were all tests successful
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        fname = os.path.join(temp_dir, "energy-usage-2010.csv")
+        write_energy_csv(fname, 250)
+        lines = open(fname, "r").read().split("\n")
+
+        # check that the file has the column titles of the 2010 file and a line of 73 values per building
+        assert lines[0].split(",") == ENERGY_COLUMN_TITLES
+        assert len(ENERGY_COLUMN_TITLES) == 73
+        assert lines[-1] == ""
+        assert len(lines) == 1 + 250 + 1
+        assert all(len(line.split(",")) == 73 for line in lines[1:-1])
+
+        # check the values of the columns the analysis reads
+        for line in lines[1:-1]:
+            values = line.split(",")
+            assert values[0] == "" or values[0] in COMMUNITY_NAMES
+            assert values[3] in BUILDING_SUBTYPES[values[2]]
+            month_kwh = [int(value) for value in values[4:16] if value != ""]
+            if values[16] != "":
+                assert int(values[16]) == sum(month_kwh)
+            assert values[33] == "" or 500 <= int(values[33]) < 90000
+            assert values[63] == "" or 1 <= int(values[63]) < 300
+            assert values[65] == "" or 0.5 <= float(values[65]) <= 20.0
+
+        # check that the census blocks number the buildings in order
+        assert [int(line.split(",")[1]) for line in lines[1:-1]] == list(range(170310000000000, 170310000000250))
+
+        # check that the analysis reads every building back
+        columns = load_energy_columns(fname)
+        assert len(columns["total_kwh"]) == 250
+        assert set(columns["building_types"]) <= set(BUILDING_SUBTYPES)
+
+        # check that the same seed writes the same file and that another seed doesn't
+        other_fname = os.path.join(temp_dir, "energy-usage-2011.csv")
+        write_energy_csv(other_fname, 250)
+        assert open(other_fname, "r").read() == "\n".join(lines)
+
+        # check that a file written a block of buildings at a time has every building
+        write_energy_csv(other_fname, 250, block_rows=100)
+        assert len(load_energy_columns(other_fname)["total_kwh"]) == 250
+        write_energy_csv(other_fname, 250, seed=1)
+        assert open(other_fname, "r").read() != "\n".join(lines)
+
+        # check that an empty file has only the column titles
+        write_energy_csv(other_fname, 0)
+        assert open(other_fname, "r").read() == ",".join(ENERGY_COLUMN_TITLES) + "\n"
+
+    return True
+
+
+def test_write_socioeconomic_csv():
+    """
+    Runs a series of tests for write_socioeconomic_csv
+    :return: (bool) were all tests successful
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        fname = os.path.join(temp_dir, "socioeconomic.csv")
+        write_socioeconomic_csv(fname)
+        lines = open(fname, "r").read().splitlines()
+
+        # check that there is a line for every community area, numbered in order, and a last line for all of Chicago
+        assert lines[0].split(",") == SOCIOECONOMIC_COLUMN_TITLES
+        assert len(lines) == 1 + len(COMMUNITY_NAMES) + 1
+        rows = [line.split(",") for line in lines[1:]]
+        assert all(len(row) == 9 for row in rows)
+        assert [row[1] for row in rows] == COMMUNITY_NAMES + ["CHICAGO"]
+        assert [row[0] for row in rows] == [str(number) for number in range(1, 78)] + [""]
+        assert all(8000 <= int(row[7]) < 90000 for row in rows)
+
+    return True
+
+
+def main():
+    """
+    For testing purposes
+    """
+    print("test write_energy_csv ... " + "PASS" if test_write_energy_csv() else "FAIL")
+    print("test write_socioeconomic_csv ... " + "PASS" if test_write_socioeconomic_csv() else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
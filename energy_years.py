@@ -0,0 +1,154 @@
+"""
+    Multi-year batch analysis of the Chicago energy usage csvs, one csv per year such as energy-usage-2010.csv
+
+    Each yearly csv is streamed one block of lines at a time by its own worker process (see energy_stream), so a worker
+    never holds more than a block of a year in memory, and sends back only a small summary of the year: the mean KWH
+    usage of a building in every month, and the total KWH and population of the residential buildings of every
+    community. The summaries are merged into a year by month matrix and a year by community table of KWH per person,
+    with the communities of every year matched by their normalized names.
+
+    The months are compared by the same mean KWH of a building as question 1 (see average_energy_list), kept as floats
+    rather than whole numbers.
+"""
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from community_join import normalize_community
+from energy_columns import CHUNK_ROWS, MONTH_NAMES
+from energy_stream import stream_community_kwh_and_population
+
+# a year in the name of a yearly energy csv
+YEAR_PATTERN = re.compile(r"(?<!\d)(\d{4})(?!\d)")
+
+
+def year_of(fname):
+    """
+    Takes the name of a yearly energy csv and returns its year
+    :param fname: (str) name of a csv file, such as "csvs/energy-usage-2010.csv"
+    :return: (int) the last four digit number in the base name of the file, such as 2010
+    """
+    years = YEAR_PATTERN.findall(os.path.basename(fname))
+    if not years:
+        raise ValueError("no year in the name of " + fname)
+    return int(years[-1])
+
+
+def summarize_year(fname, chunk_rows=CHUNK_ROWS):
+    """
+    Takes a yearly csv file of Chicago building energy data and returns what the batch analysis needs of it, reading the
+    file one block of lines at a time
+    :param fname: (str) name of a csv file containing Chicago building energy data
+    :param chunk_rows: (int) the number of lines read at a time
+    :return: (dict) the summary of the year:
+        "fname": (str) the name of the file
+        "year": (int) the year of the file, see year_of
+        "month_means": (list) the mean KWH usage of a building in each month, January through December
+        "community_names": (list) the name of every community with a residential building with a population
+        "total_kwh": (array) the total KWH of those buildings in each community
+        "population": (array) the total population of those buildings in each community
+    """
+    kwh_sums, kwh_counts, community_totals = stream_community_kwh_and_population(fname, chunk_rows)
+
+    # the buildings without a value in a month are left out of its mean
+    month_means = np.where(kwh_counts > 0, kwh_sums / np.maximum(kwh_counts, 1), np.nan)
+
+    return {"fname": fname,
+            "year": year_of(fname),
+            "month_means": month_means.tolist(),
+            "community_names": list(community_totals),
+            "total_kwh": np.array([totals[0] for totals in community_totals.values()], dtype=np.float64),
+            "population": np.array([totals[1] for totals in community_totals.values()], dtype=np.float64)}
+
+
+def merge_year_summaries(summaries):
+    """
+    Takes the summaries of several years and merges them into tables with one row per year, in order of year
+    :param summaries: (list) the summaries of every year, see summarize_year
+    :return: (dict) the tables of every year:
+        "years": (list) the year of every row
+        "fnames": (list) the name of the file of every row
+        "month_matrix": (array) the mean KWH usage of a building in each month, as a float64 array of shape (years, 12)
+        "communities": (list) the name of every community, in order of normalized name, spelled as in its first year
+        "kwh_per_person": (array) the annual residential KWH per person of each community, as a float64 array of
+        shape (years, communities) that is NaN where a community has no residential buildings that year
+    """
+    summaries = sorted(summaries, key=lambda summary: summary["year"])
+    years = [summary["year"] for summary in summaries]
+    if len(set(years)) < len(years):
+        raise ValueError("more than one csv of the same year: " + ", ".join(summary["fname"] for summary in summaries))
+
+    # give every community a column, whatever the spelling of its name in each year
+    community_spellings = {}
+    for summary in summaries:
+        for community_name in summary["community_names"]:
+            community_spellings.setdefault(normalize_community(community_name), community_name)
+    normalized_names = sorted(community_spellings)
+    community_columns = {normalized_name: column for column, normalized_name in enumerate(normalized_names)}
+
+    total_kwh = np.zeros((len(summaries), len(normalized_names)))
+    population = np.zeros((len(summaries), len(normalized_names)))
+    for row, summary in enumerate(summaries):
+        columns = [community_columns[normalize_community(name)] for name in summary["community_names"]]
+        np.add.at(total_kwh[row], columns, summary["total_kwh"])
+        np.add.at(population[row], columns, summary["population"])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kwh_per_person = np.where(population > 0, total_kwh / population, np.nan)
+
+    return {"years": years,
+            "fnames": [summary["fname"] for summary in summaries],
+            "month_matrix": np.array([summary["month_means"] for summary in summaries],
+                                     dtype=np.float64).reshape(-1, 12),
+            "communities": [community_spellings[normalized_name] for normalized_name in normalized_names],
+            "kwh_per_person": kwh_per_person}
+
+
+def analyze_years(fnames, workers=None, serial=False):
+    """
+    Takes yearly csv files of Chicago building energy data, summarizes each in a worker process of its own and merges
+    the summaries
+    :param fnames: (list) names of csv files containing Chicago building energy data, with a different year in each
+    name
+    :param workers: (int) the number of worker processes, or None for one per CPU
+    :param serial: (bool) whether to summarize every year in this process, one after another
+    :return: (dict) the tables of every year, see merge_year_summaries
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if serial or workers <= 1 or len(fnames) <= 1:
+        return merge_year_summaries([summarize_year(fname) for fname in fnames])
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(fnames))) as executor:
+        return merge_year_summaries(list(executor.map(summarize_year, fnames)))
+
+
+def write_year_tables(year_tables, output_dir):
+    """
+    Writes the tables of a batch of years to csv files: year_month_kwh.csv with a row per year and a column per month,
+    and year_community_kwh_per_person.csv with a row per year and a column per community
+    :param year_tables: (dict) the tables of every year, see merge_year_summaries
+    :param output_dir: (str) the directory the csv files are written to
+    :return: (list) the names of the two files written
+    """
+    month_fname = os.path.join(output_dir, "year_month_kwh.csv")
+    file_out = open(month_fname, "w")
+    file_out.write(",".join(["YEAR"] + MONTH_NAMES) + "\n")
+    for year, month_means in zip(year_tables["years"], year_tables["month_matrix"].tolist()):
+        file_out.write(",".join([str(year)] + ["" if np.isnan(value) else repr(value) for value in month_means]) + "\n")
+    file_out.close()
+
+    # the names are quoted, since a community name could contain a comma
+    community_fname = os.path.join(output_dir, "year_community_kwh_per_person.csv")
+    file_out = open(community_fname, "w")
+    file_out.write(",".join(["YEAR"] + ['"' + name.replace('"', '""') + '"'
+                                        for name in year_tables["communities"]]) + "\n")
+    for year, kwh_per_person in zip(year_tables["years"], year_tables["kwh_per_person"].tolist()):
+        file_out.write(",".join([str(year)] + ["" if np.isnan(value) else repr(value)
+                                               for value in kwh_per_person]) + "\n")
+    file_out.close()
+
+    return [month_fname, community_fname]
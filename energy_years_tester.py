@@ -0,0 +1,147 @@
+"""
+Tester code for energy_years.py
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+
+from energy_columns import load_energy_columns, residential_kwh_per_person_mask
+from energy_years import *
+from energy_synthetic import write_energy_csv
+
+
+@contextmanager
+def yearly_csvs(years, rows=1000):
+    """
+    :param years: (list) the years to write a synthetic energy csv of
+    :param rows: (int) the number of buildings in each csv
+    :return: (context manager) the names of the csvs, in a new temporary directory that is removed on leaving the
+    context
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        fnames = []
+        for year in years:
+            fname = os.path.join(temp_dir, "energy-usage-" + str(year) + ".csv")
+            write_energy_csv(fname, rows, seed=year)
+            fnames.append(fname)
+        yield fnames
+
+
+def test_year_of():
+    """
+    Runs a series of tests for year_of
+    :return: (bool) were all tests successful
+    """
+    assert year_of("csvs/energy-usage-2010.csv") == 2010
+    assert year_of("2019/energy-usage-2011-v2.csv") == 2011
+
+    # check that a name without a year is an error
+    try:
+        year_of("energy-usage-20101.csv")
+        return False
+    except ValueError:
+        pass
+
+    return True
+
+
+def test_summarize_year():
+    """
+    Runs a series of tests for summarize_year
+    :return: (bool) were all tests successful
+    """
+    with yearly_csvs([2012]) as fnames:
+        fname = fnames[0]
+        summary = summarize_year(fname)
+        columns = load_energy_columns(fname)
+
+        # check the month means against the columns
+        assert summary["year"] == 2012
+        assert np.allclose(summary["month_means"], np.nanmean(columns["month_kwh"], axis=0))
+
+        # check that the communities add up to every residential building of the per-person analysis
+        mask = residential_kwh_per_person_mask(columns)
+        assert np.isclose(summary["total_kwh"].sum(), columns["total_kwh"][mask].sum())
+        assert np.isclose(summary["population"].sum(), columns["population"][mask].sum())
+        assert "" not in summary["community_names"]
+
+        # check that the summary doesn't depend on the number of lines streamed at a time
+        small_blocks = summarize_year(fname, chunk_rows=7)
+        assert np.allclose(small_blocks["month_means"], summary["month_means"])
+        small_order = [small_blocks["community_names"].index(name) for name in summary["community_names"]]
+        assert sorted(small_blocks["community_names"]) == sorted(summary["community_names"])
+        assert np.allclose(small_blocks["total_kwh"][small_order], summary["total_kwh"])
+        assert np.allclose(small_blocks["population"][small_order], summary["population"])
+
+    return True
+
+
+def test_merge_year_summaries():
+    """
+    Runs a series of tests for merge_year_summaries
+    :return: (bool) were all tests successful
+    """
+    summaries = [{"fname": "b-2011.csv", "year": 2011, "month_means": [2.0] * 12,
+                  "community_names": ["WEST RIDGE", "Uptown"], "total_kwh": np.array([30.0, 40.0]),
+                  "population": np.array([3.0, 4.0])},
+                 {"fname": "a-2010.csv", "year": 2010, "month_means": [1.0] * 12,
+                  "community_names": ["West Ridge", "Ashburn"], "total_kwh": np.array([10.0, 50.0]),
+                  "population": np.array([2.0, 5.0])}]
+    year_tables = merge_year_summaries(summaries)
+
+    # check that the years are in order and the communities are matched by their normalized names
+    assert year_tables["years"] == [2010, 2011] and year_tables["fnames"] == ["a-2010.csv", "b-2011.csv"]
+    assert year_tables["month_matrix"].tolist() == [[1.0] * 12, [2.0] * 12]
+    assert year_tables["communities"] == ["Ashburn", "Uptown", "West Ridge"]
+    assert np.array_equal(year_tables["kwh_per_person"], [[10.0, np.nan, 5.0], [np.nan, 10.0, 10.0]], equal_nan=True)
+
+    # check that two csvs of the same year are an error
+    try:
+        merge_year_summaries([summaries[0], summaries[0]])
+        return False
+    except ValueError:
+        pass
+
+    return True
+
+
+def test_analyze_years():
+    """
+    Runs a series of tests for analyze_years and write_year_tables
+    :return: (bool) were all tests successful
+    """
+    with yearly_csvs([2012, 2010, 2011]) as fnames:
+
+        # check that the worker processes give the same tables as one process
+        year_tables = analyze_years(fnames, workers=3)
+        serial_tables = analyze_years(fnames, serial=True)
+        assert year_tables["years"] == [2010, 2011, 2012]
+        assert year_tables["month_matrix"].shape == (3, 12)
+        assert year_tables["kwh_per_person"].shape == (3, len(year_tables["communities"]))
+        assert np.array_equal(year_tables["month_matrix"], serial_tables["month_matrix"])
+        assert np.array_equal(year_tables["kwh_per_person"], serial_tables["kwh_per_person"], equal_nan=True)
+
+        # check the csv files of the tables
+        month_fname, community_fname = write_year_tables(year_tables, os.path.dirname(fnames[0]))
+        month_lines = open(month_fname).read().splitlines()
+        assert month_lines[0].split(",")[:2] == ["YEAR", "JANUARY"] and len(month_lines) == 4
+        community_lines = open(community_fname).read().splitlines()
+        assert [line.split(",")[0] for line in community_lines] == ["YEAR", "2010", "2011", "2012"]
+
+    return True
+
+
+def main():
+    """
+    For testing purposes
+    """
+    print("test year_of ... " + "PASS" if test_year_of() else "FAIL")
+    print("test summarize_year ... " + "PASS" if test_summarize_year() else "FAIL")
+    print("test merge_year_summaries ... " + "PASS" if test_merge_year_summaries() else "FAIL")
+    print("test analyze_years ... " + "PASS" if test_analyze_years() else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
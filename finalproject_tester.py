@@ -1,4 +1,5 @@
 from finalproject import*
+from test_finalproject import csv_month_means
 
 # *** QUESTION 1 *** #
 
@@ -8,9 +9,10 @@ def average_month_kwh_data_tester():
     runs a series of tests for average_month_kwh_data
     :return: (bool) were all tests successful
     """
-    # check accuracy
-    assert average_month_kwh_data("energy-usage-2010.csv", 4) == 14584
-    assert average_month_kwh_data("energy-usage-2010.csv", 10) == 16227
+    # check accuracy against the mean KWH of the buildings with a value in the month
+    month_means = csv_month_means("energy-usage-2010.csv")
+    assert average_month_kwh_data("energy-usage-2010.csv", 4) == month_means[4]
+    assert average_month_kwh_data("energy-usage-2010.csv", 10) == month_means[10]
 
     # check type
     assert type(average_month_kwh_data("energy-usage-2010.csv", 4)) == int
@@ -18,18 +20,55 @@ def average_month_kwh_data_tester():
     return True
 
 
+def parse_month_kwh_data_tester():
+    """
+    runs a series of tests for parse_month_kwh_data
+    :return: (bool) were all tests successful
+    """
+    month_averages = parse_month_kwh_data("energy-usage-2010.csv")
+
+    # check that every month column is averaged in the one pass
+    assert list(month_averages.keys()) == list(range(4, 16))
+
+    # check accuracy against the single-month lookups
+    assert month_averages == csv_month_means("energy-usage-2010.csv")
+
+    # check type
+    assert type(month_averages[4]) == int
+
+    return True
+
+
 def average_season_kwh_data_tester():
     """
     runs a series of tests for average_season_kwh_data
     :return: (bool) were all tests successful
     """
-    assert average_season_kwh_data(4, 5, 15) == 15287
-    assert average_season_kwh_data(9, 10, 11) == 16071
+    month_means = csv_month_means("energy-usage-2010.csv")
+    assert average_season_kwh_data(4, 5, 15) == int((month_means[4] + month_means[5] + month_means[15]) / 3)
+    assert average_season_kwh_data(9, 10, 11) == int((month_means[9] + month_means[10] + month_means[11]) / 3)
     assert type(average_season_kwh_data(9, 10, 11)) == int
 
     return True
 
 
+def average_period_kwh_data_tester():
+    """
+    runs a series of tests for average_period_kwh_data and heating_and_cooling_by_community
+    :return: (bool) were all tests successful
+    """
+    # check that the order of the months doesn't matter, and that a wrap-around season is a float mean
+    assert average_period_kwh_data([15, 4, 5]) == average_period_kwh_data([4, 5, 15])
+    assert type(average_period_kwh_data([15, 4, 5])) == float
+
+    # check that every community has a heating and a cooling mean
+    heating_and_cooling = heating_and_cooling_by_community()
+    assert len(heating_and_cooling) > 0
+    assert all(len(means) == 2 for means in heating_and_cooling.values())
+
+    return True
+
+
 def average_energy_list_tester():
     """
     runs a series of tests for average_energy_list
@@ -38,6 +77,11 @@ def average_energy_list_tester():
     assert type(average_energy_list()) == list
     assert type(average_energy_list()[0]) == int
 
+    # check that asking again answers from the memo without reading the file
+    hits = query_memo.stats()["hits"]
+    assert average_energy_list() == average_energy_list()
+    assert query_memo.stats()["hits"] >= hits + 2
+
     return True
 
 
@@ -204,7 +248,9 @@ def test_energy_efficiency_medians():
 
 def main():
     print("test average_month_kwh_data() ... " + "PASS" if average_month_kwh_data_tester() else "FAIL")
+    print("test parse_month_kwh_data() ... " + "PASS" if parse_month_kwh_data_tester() else "FAIL")
     print("test average_season_kwh_data() ... " + "PASS" if average_season_kwh_data_tester() else "FAIL")
+    print("test average_period_kwh_data() ... " + "PASS" if average_period_kwh_data_tester() else "FAIL")
     print("test average_energy_list() ... " + "PASS" if average_energy_list_tester() else "FAIL")
     print("test parse_income_data ... " + "PASS" if test_parse_income_data() else "FAIL")
     print("test parse_energy_data ... " + "PASS" if test_parse_energy_data() else "FAIL")
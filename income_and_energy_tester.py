@@ -3,8 +3,6 @@ Tester code for income_and_energy_usage.py
 """
 
 from income_and_energy_usage import *
-import pandas as pd
-import re
 
 # *** QUESTION 2 *** #
 
@@ -0,0 +1,229 @@
+"""
+    Mergeable quantile summaries of energy efficiency values
+
+    A QuantileSketch keeps every value of a small group, and serves exact quantiles from them. Once a group grows past
+    EXACT_LIMIT values it switches to a t-digest style summary: the sorted values are combined into weighted centroids,
+    with small centroids near the tails and large ones near the median, so that a few hundred centroids give accurate
+    medians, quartiles and whiskers however many values were added. Sketches of different file shards or years merge
+    into the sketch of all their values, so the summary of a subtype is built once while parsing and never needs the
+    full list of values again.
+"""
+import math
+
+import numpy as np
+
+# groups of up to this many values keep every value and give exact quantiles
+EXACT_LIMIT = 10000
+
+# about twice the number of centroids kept by a compressed sketch
+COMPRESSION = 200
+
+
+def _compress_centroids(means, weights, compression):
+    """
+    Takes weighted centroids sorted by mean and combines neighbouring ones, keeping small centroids near the tails
+    :param means: (array) float64 centroid means, sorted
+    :param weights: (array) float64 number of values behind each centroid
+    :param compression: (int) about twice the number of centroids to keep
+    :return: (tuple) float64 arrays of the means and weights of the combined centroids
+    """
+    cumulative_weights = np.cumsum(weights)
+    middle_quantiles = (cumulative_weights - weights / 2) / cumulative_weights[-1]
+
+    # the t-digest scale function maps quantiles to buckets that are narrow near 0 and 1 and wide near 0.5
+    scale = compression / (2 * math.pi) * np.arcsin(2 * middle_quantiles - 1)
+    buckets = np.floor(scale + compression / 4).astype(np.int64)
+
+    # centroids in the same bucket are next to each other, so each bucket is one run to sum
+    bucket_starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    combined_weights = np.add.reduceat(weights, bucket_starts)
+    combined_means = np.add.reduceat(means * weights, bucket_starts) / combined_weights
+    return combined_means, combined_weights
+
+
+class QuantileSketch:
+    """
+    A summary of a group of values that answers quantile queries, exact for small groups and approximate for large
+    ones, and that can be merged with the summary of another group
+    """
+
+    def __init__(self, values=(), compression=COMPRESSION, exact_limit=EXACT_LIMIT):
+        """
+        Makes a sketch of some values
+        :param values: (array) the first values of the group, nan values are left out
+        :param compression: (int) about twice the number of centroids kept once the sketch is compressed
+        :param exact_limit: (int) the most values the sketch keeps before it is compressed
+        """
+        self.compression = compression
+        self.exact_limit = exact_limit
+        self.count = 0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+        # every value while the group is small, then centroids once it is compressed
+        self._value_pieces = []
+        self._is_sorted = True
+        self._means = None
+        self._weights = None
+        self.add(values)
+
+    def __len__(self):
+        """
+        :return: (int) the number of values added to the sketch
+        """
+        return self.count
+
+    @property
+    def exact(self):
+        """
+        :return: (bool) True while the sketch still holds every value and gives exact quantiles
+        """
+        return self._means is None
+
+    def _sorted_values(self):
+        """
+        Returns every value of an exact sketch, sorted
+        :return: (array) float64 values, sorted
+        """
+        if len(self._value_pieces) != 1 or not self._is_sorted:
+            self._value_pieces = [np.sort(np.concatenate(self._value_pieces or [np.empty(0, dtype=np.float64)]))]
+            self._is_sorted = True
+        return self._value_pieces[0]
+
+    def _centroids(self):
+        """
+        Returns the centroids of the sketch, with every value of an exact sketch as a centroid of its own
+        :return: (tuple) float64 arrays of the sorted centroid means and of their weights
+        """
+        if self.exact:
+            values = self._sorted_values()
+            return values, np.ones(len(values), dtype=np.float64)
+        return self._means, self._weights
+
+    def _combine(self, means, weights):
+        """
+        Adds weighted centroids to the sketch and compresses it
+        :param means: (array) float64 centroid means
+        :param weights: (array) float64 number of values behind each centroid
+        """
+        own_means, own_weights = self._centroids()
+        means = np.concatenate((own_means, means))
+        weights = np.concatenate((own_weights, weights))
+        order = np.argsort(means, kind="mergesort")
+        self._means, self._weights = _compress_centroids(means[order], weights[order], self.compression)
+        self._value_pieces = []
+
+    def add(self, values):
+        """
+        Adds values to the sketch
+        :param values: (array) values to add, nan values are left out
+        :return: (QuantileSketch) the sketch itself
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+
+        self.count += len(values)
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+
+        if self.exact and self.count <= self.exact_limit:
+            self._value_pieces.append(values)
+            self._is_sorted = False
+        else:
+            self._combine(values, np.ones(len(values), dtype=np.float64))
+        return self
+
+    def merge(self, other):
+        """
+        Adds every value summarized by another sketch to this sketch
+        :param other: (QuantileSketch) the sketch of another group of values, such as another shard or year
+        :return: (QuantileSketch) the sketch itself
+        """
+        if other.count == 0:
+            return self
+        if other.exact:
+            return self.add(other._sorted_values())
+
+        self.count += other.count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self._combine(other._means, other._weights)
+        return self
+
+    def quantile(self, q):
+        """
+        Returns quantiles of the values of the sketch, interpolated linearly like numpy.quantile
+        :param q: (float or array) quantiles between 0 and 1
+        :return: (float or array) the value at each quantile, nan if the sketch is empty
+        """
+        if self.count == 0:
+            return np.full(np.shape(q), np.nan)[()]
+        if self.exact:
+            return np.quantile(self._sorted_values(), q)
+
+        # each centroid stands for the values around the middle of its weight, and the extremes are known exactly
+        cumulative_weights = np.cumsum(self._weights)
+        positions = np.concatenate(([0.0], (cumulative_weights - self._weights / 2) / self.count, [1.0]))
+        values = np.concatenate(([self.minimum], self._means, [self.maximum]))
+        return np.interp(q, positions, values)
+
+    def median(self):
+        """
+        :return: (float) the median of the values of the sketch, nan if the sketch is empty
+        """
+        return float(self.quantile(0.5))
+
+    def box_stats(self, label=None, whis=1.5):
+        """
+        Returns the statistics of a box plot of the values of the sketch, in the form taken by Axes.bxp
+        :param label: (str) the label of the box
+        :param whis: (float) the whiskers reach the most extreme values within whis times the interquartile range of
+        the quartiles
+        :return: (dict) the median, quartiles and whisker ends of the values, and no outliers
+        """
+        q1, median, q3 = (float(value) for value in self.quantile([0.25, 0.5, 0.75]))
+        low_limit = q1 - whis * (q3 - q1)
+        high_limit = q3 + whis * (q3 - q1)
+
+        # an exact sketch knows every value, a compressed one only its centroids and extremes
+        means, weights = self._centroids()
+        if self.exact:
+            candidates = means
+        else:
+            candidates = np.concatenate(([self.minimum], means, [self.maximum]))
+        inside_low = candidates[candidates >= low_limit]
+        inside_high = candidates[candidates <= high_limit]
+
+        stats = {"med": median, "q1": q1, "q3": q3,
+                 "whislo": min(float(inside_low.min()), q1) if len(inside_low) else q1,
+                 "whishi": max(float(inside_high.max()), q3) if len(inside_high) else q3,
+                 "mean": float(np.sum(means * weights) / self.count) if self.count else math.nan,
+                 "fliers": np.empty(0, dtype=np.float64)}
+        if label is not None:
+            stats["label"] = label
+        return stats
+
+
+def as_sketch(values):
+    """
+    Takes a group of values or a sketch of them and returns a sketch
+    :param values: (list or QuantileSketch) the values, or their sketch
+    :return: (QuantileSketch) the sketch of the values
+    """
+    if isinstance(values, QuantileSketch):
+        return values
+    return QuantileSketch(values)
+
+
+def merge_sketches(sketches):
+    """
+    Takes sketches of several groups of values and returns the sketch of all of them together
+    :param sketches: (list) sketches, such as the sketches of one subtype in each file shard or year
+    :return: (QuantileSketch) a new sketch of every value summarized by the sketches
+    """
+    merged_sketch = QuantileSketch()
+    for sketch in sketches:
+        merged_sketch.merge(sketch)
+    return merged_sketch
@@ -0,0 +1,100 @@
+"""
+Tester code for quantile_sketch.py
+"""
+
+from quantile_sketch import *
+
+
+def test_exact_sketch():
+    """
+    Runs a series of tests for QuantileSketch on small groups of values
+    :return: (bool) were all tests successful
+    """
+    sketch = QuantileSketch([4, 1, 3, 2])
+
+    # check that small groups give the same quantiles as numpy
+    assert sketch.exact
+    assert sketch.median() == 2.5
+    assert sketch.quantile([0.25, 0.75]).tolist() == np.quantile([1, 2, 3, 4], [0.25, 0.75]).tolist()
+    assert len(sketch) == 4
+
+    # check that nan values are left out and an empty sketch has no median
+    assert QuantileSketch([1.0, np.nan, 3.0]).median() == 2.0
+    assert np.isnan(QuantileSketch().median())
+
+    return True
+
+
+def test_box_stats():
+    """
+    Runs a series of tests for QuantileSketch.box_stats
+    :return: (bool) were all tests successful
+    """
+    box_stats = QuantileSketch([1, 2, 3, 4, 5, 6, 7, 8, 100]).box_stats("Low-Rise")
+
+    # the quartiles are 3 and 7, so the whiskers reach the most extreme values within 3 - 6 and 7 + 6
+    assert (box_stats["q1"], box_stats["med"], box_stats["q3"]) == (3.0, 5.0, 7.0)
+    assert (box_stats["whislo"], box_stats["whishi"]) == (1.0, 8.0)
+    assert box_stats["label"] == "Low-Rise"
+    assert len(box_stats["fliers"]) == 0
+
+    return True
+
+
+def test_compressed_sketch():
+    """
+    Runs a series of tests for QuantileSketch on groups larger than EXACT_LIMIT
+    :return: (bool) were all tests successful
+    """
+    values = np.random.default_rng(0).lognormal(3, 0.7, 100000)
+    sketch = QuantileSketch(values)
+
+    # check that the sketch keeps a bounded number of centroids and stays close to the exact quantiles
+    assert not sketch.exact
+    assert len(sketch._means) <= COMPRESSION
+    sorted_values = np.sort(values)
+    for q in [0.01, 0.25, 0.5, 0.75, 0.99]:
+        rank = np.searchsorted(sorted_values, sketch.quantile(q)) / len(values)
+        assert abs(rank - q) < 0.005
+
+    # check that the extremes are exact
+    assert sketch.quantile(0) == values.min() and sketch.quantile(1) == values.max()
+
+    return True
+
+
+def test_merge_sketches():
+    """
+    Runs a series of tests for QuantileSketch.merge and merge_sketches
+    :return: (bool) were all tests successful
+    """
+    # small sketches merge into the exact sketch of every value
+    merged_sketch = merge_sketches([QuantileSketch([1, 2]), QuantileSketch(), QuantileSketch([3, 4, 5])])
+    assert merged_sketch.exact and merged_sketch.median() == 3.0 and len(merged_sketch) == 5
+
+    # large sketches, such as those of file shards or years, merge into a sketch close to that of every value
+    values = np.random.default_rng(1).normal(10, 2, 60000)
+    merged_sketch = merge_sketches([QuantileSketch(piece) for piece in np.array_split(values, 6)])
+    assert len(merged_sketch) == len(values)
+    assert abs(merged_sketch.median() - np.median(values)) < 0.02
+    assert merged_sketch.minimum == values.min() and merged_sketch.maximum == values.max()
+
+    # check that as_sketch keeps sketches and sketches lists
+    assert as_sketch(merged_sketch) is merged_sketch
+    assert as_sketch([5, 6, 7]).median() == 6.0
+
+    return True
+
+
+def main():
+    """
+    For testing purposes
+    """
+    print("test exact sketch ... " + "PASS" if test_exact_sketch() else "FAIL")
+    print("test box_stats ... " + "PASS" if test_box_stats() else "FAIL")
+    print("test compressed sketch ... " + "PASS" if test_compressed_sketch() else "FAIL")
+    print("test merge_sketches ... " + "PASS" if test_merge_sketches() else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+    Timing and profiling of the stages of the analysis
+
+    A StageRecorder times each stage of a run, such as parsing the income csv, parsing the energy csv, correlating or
+    drawing one plot. Every stage is a with block (or a decorated function) that records its wall time, CPU time, the
+    number of rows it processed and the peak resident memory of the process when it finished. At the end of the run
+    the records are printed as a table or written as a json trace. Chosen stages can also be run under cProfile, or
+    under pyinstrument when it is installed, with the profile written to a file per stage.
+
+    Stages may run in several threads at once, such as the plots; the CPU time of a stage is then the CPU time of the
+    whole process over the stage, shared with the stages that overlap it. Only one stage of the process is profiled at
+    a time, since a profiler started while another is running either fails or takes over the other's hooks: a stage
+    that starts while another stage is being profiled, in another thread or around it, is timed but not profiled.
+"""
+import cProfile
+import functools
+import json
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows, where the peak memory isn't recorded
+    resource = None
+
+# the profilers a stage can be run under
+PROFILERS = ["cprofile", "pyinstrument"]
+
+# held while a stage of any recorder is being profiled
+_PROFILER_LOCK = threading.Lock()
+
+
+def peak_rss_bytes():
+    """
+    :return: (int) the peak resident memory of the process so far in bytes, or None where it can't be read
+    """
+    if resource is None:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # macOS reports bytes, and Linux reports kilobytes
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def _profile_fname(profile_dir, stage_name, suffix):
+    """
+    :param profile_dir: (str) the directory profiles are written to
+    :param stage_name: (str) the name of a stage
+    :param suffix: (str) the file extension of the profile
+    :return: (str) the name of the file the profile of the stage is written to
+    """
+    return os.path.join(profile_dir, "stage-" + re.sub(r"[^A-Za-z0-9_.-]+", "-", stage_name).strip("-") + suffix)
+
+
+class StageRecorder:
+    """
+    The records of the timed stages of one run
+    """
+
+    def __init__(self, profile_stages=(), profiler="cprofile", profile_dir="."):
+        """
+        Makes a recorder without any records
+        :param profile_stages: (list) the names of the stages to profile, or ["all"] to profile every stage
+        :param profiler: (str) the profiler used, one of PROFILERS
+        :param profile_dir: (str) the directory the profiles are written to
+        """
+        if profiler not in PROFILERS:
+            raise ValueError("unknown profiler: " + str(profiler))
+        self.profile_stages = set(profile_stages)
+        self.profiler = profiler
+        self.profile_dir = profile_dir
+        self.records = []
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def _profiles(self, stage_name):
+        """
+        :param stage_name: (str) the name of a stage
+        :return: (bool) whether the stage is profiled
+        """
+        return "all" in self.profile_stages or stage_name in self.profile_stages
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """
+        Times a with block as one stage. The number of rows can be given up front, or set on the record inside the
+        block as record["rows"] = n once it is known
+        :param name: (str) the name of the stage
+        :param rows: (int) the number of rows the stage processes, or None
+        :return: (dict) the record of the stage, filled in when the block ends:
+            "stage": (str) the name of the stage
+            "start_seconds": (float) seconds from the creation of the recorder to the start of the stage
+            "wall_seconds": (float) wall time of the stage
+            "cpu_seconds": (float) CPU time of the process over the stage
+            "rows": (int) rows processed, or None
+            "peak_rss_bytes": (int) peak resident memory of the process at the end of the stage, or None
+            "rss_growth_bytes": (int) how much the peak resident memory grew during the stage, or None
+            "profile": (str) the file the profile of the stage was written to, for profiled stages, or None when the
+            stage overlapped another profiled stage and wasn't profiled
+        """
+        record = {"stage": name, "rows": rows}
+        profiler = None
+        if self._profiles(name):
+            record["profile"] = None
+            profiler = self._start_profiler()
+        rss_before = peak_rss_bytes()
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            wall_end = time.perf_counter()
+            cpu_end = time.process_time()
+            rss_after = peak_rss_bytes()
+            if profiler is not None:
+                record["profile"] = self._stop_profiler(profiler, name)
+
+            record["start_seconds"] = wall_start - self._start
+            record["wall_seconds"] = wall_end - wall_start
+            record["cpu_seconds"] = cpu_end - cpu_start
+            record["peak_rss_bytes"] = rss_after
+            record["rss_growth_bytes"] = None if rss_after is None else rss_after - rss_before
+            with self._lock:
+                self.records.append(record)
+
+    def timed(self, name=None):
+        """
+        Returns a decorator that times every call of a function as a stage. The rows of the stage are the length of
+        the function's result, when it has one
+        :param name: (str) the name of the stage, or None for the name of the function
+        :return: (function) the decorator
+        """
+        def decorator(function):
+            stage_name = function.__name__ if name is None else name
+
+            @functools.wraps(function)
+            def timed_function(*args, **kwargs):
+                with self.stage(stage_name) as record:
+                    result = function(*args, **kwargs)
+                    if hasattr(result, "__len__"):
+                        record["rows"] = len(result)
+                return result
+            return timed_function
+        return decorator
+
+    def _start_profiler(self):
+        """
+        :return: the started profiler of a stage, or None if a stage is already being profiled
+        """
+        if not _PROFILER_LOCK.acquire(blocking=False):
+            return None
+        try:
+            if self.profiler == "pyinstrument":
+                from pyinstrument import Profiler
+                profiler = Profiler()
+                profiler.start()
+                return profiler
+            profiler = cProfile.Profile()
+            profiler.enable()
+            return profiler
+        except ValueError:
+            # another tool, such as a debugger or a coverage run, is already profiling the process
+            _PROFILER_LOCK.release()
+            return None
+        except BaseException:
+            _PROFILER_LOCK.release()
+            raise
+
+    def _stop_profiler(self, profiler, stage_name):
+        """
+        Stops the profiler of a stage and writes its profile
+        :param profiler: the started profiler of the stage
+        :param stage_name: (str) the name of the stage
+        :return: (str) the name of the file the profile was written to
+        """
+        try:
+            if self.profiler == "pyinstrument":
+                profiler.stop()
+            else:
+                profiler.disable()
+        finally:
+            _PROFILER_LOCK.release()
+
+        if self.profiler == "pyinstrument":
+            profile_fname = _profile_fname(self.profile_dir, stage_name, ".txt")
+            with open(profile_fname, "w") as file_out:
+                file_out.write(profiler.output_text())
+            return profile_fname
+        profile_fname = _profile_fname(self.profile_dir, stage_name, ".prof")
+        profiler.dump_stats(profile_fname)
+        return profile_fname
+
+    def summary_table(self):
+        """
+        Returns the records as a table, one line per stage in the order the stages finished
+        :return: (str) the table
+        """
+        lines = ["stage".ljust(32) + "wall s".rjust(10) + "cpu s".rjust(10) + "rows".rjust(12) + "rows/s".rjust(14)
+                 + "peak RSS MiB".rjust(14)]
+        for record in self.records:
+            rows = "" if record["rows"] is None else str(record["rows"])
+            rows_per_second = ""
+            if record["rows"] is not None and record["wall_seconds"] > 0:
+                rows_per_second = "%.0f" % (record["rows"] / record["wall_seconds"])
+            peak_rss = "" if record["peak_rss_bytes"] is None else "%.1f" % (record["peak_rss_bytes"] / 2 ** 20)
+            lines.append(record["stage"][:31].ljust(32) + ("%.4f" % record["wall_seconds"]).rjust(10)
+                         + ("%.4f" % record["cpu_seconds"]).rjust(10) + rows.rjust(12) + rows_per_second.rjust(14)
+                         + peak_rss.rjust(14))
+        return "\n".join(lines)
+
+    def write_trace(self, fname):
+        """
+        Writes the records as a json trace
+        :param fname: (str) name of the json file to write
+        """
+        with open(fname, "w") as file_out:
+            json.dump({"stages": self.records}, file_out, indent=2)
+
+
+def add_stage_timing_arguments(parser):
+    """
+    Adds the command line options that time and profile the stages of a run to an argument parser
+    :param parser: (argparse.ArgumentParser) the parser of a command line
+    """
+    parser.add_argument("--timings", action="store_true", help="print the time taken by every stage of the run")
+    parser.add_argument("--trace", metavar="FILE", help="write the timings of every stage to a json file")
+    parser.add_argument("--profile", metavar="STAGE", nargs="+", default=[],
+                        help="profile the named stages, or all of them with 'all'. One stage is profiled at a time, "
+                             "so a stage that overlaps a profiled one, such as with --jobs, is only timed")
+    parser.add_argument("--profiler", choices=PROFILERS, default="cprofile", help="the profiler used by --profile")
+
+
+def report_stage_timings(recorder, args):
+    """
+    Prints and writes the stage timings of a run, as asked for on the command line
+    :param recorder: (StageRecorder) the records of the stages of the run
+    :param args: (argparse.Namespace) the parsed command line, see add_stage_timing_arguments
+    """
+    if args.timings:
+        print(recorder.summary_table())
+    if args.trace:
+        recorder.write_trace(args.trace)
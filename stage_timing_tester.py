@@ -0,0 +1,129 @@
+"""
+Tester code for stage_timing.py
+"""
+import json
+import os
+import tempfile
+import threading
+
+from stage_timing import *
+
+
+def test_stage():
+    """
+    Runs a series of tests for StageRecorder.stage and StageRecorder.timed
+    :return: (bool) were all tests successful
+    """
+    recorder = StageRecorder()
+
+    # check that a stage records its rows, given up front or inside the block
+    with recorder.stage("parse income", 3):
+        sum(range(1000))
+    with recorder.stage("parse energy") as record:
+        record["rows"] = 5
+    assert [record["stage"] for record in recorder.records] == ["parse income", "parse energy"]
+    assert [record["rows"] for record in recorder.records] == [3, 5]
+    assert all(record["wall_seconds"] >= 0 and record["cpu_seconds"] >= 0 for record in recorder.records)
+
+    # check that a decorated function is recorded with the length of its result
+    @recorder.timed()
+    def medians():
+        return [1.0, 2.0]
+    assert medians() == [1.0, 2.0]
+    assert recorder.records[-1]["stage"] == "medians" and recorder.records[-1]["rows"] == 2
+
+    # check that a stage that raises is still recorded
+    try:
+        with recorder.stage("plot"):
+            raise ValueError()
+    except ValueError:
+        pass
+    assert recorder.records[-1]["stage"] == "plot"
+
+    return True
+
+
+def test_report():
+    """
+    Runs a series of tests for StageRecorder.summary_table, StageRecorder.write_trace and profiling
+    :return: (bool) were all tests successful
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        recorder = StageRecorder(["spearman"], profile_dir=temp_dir)
+        with recorder.stage("spearman", 10):
+            sorted(range(1000), reverse=True)
+        with recorder.stage("medians"):
+            pass
+
+        # check that only the chosen stage is profiled
+        assert os.path.isfile(recorder.records[0]["profile"])
+        assert "profile" not in recorder.records[1]
+
+        # check the table and the json trace
+        assert recorder.summary_table().splitlines()[1].startswith("spearman")
+        trace_fname = os.path.join(temp_dir, "trace.json")
+        recorder.write_trace(trace_fname)
+        assert [record["stage"] for record in json.load(open(trace_fname))["stages"]] == ["spearman", "medians"]
+
+    return True
+
+
+def test_overlapping_profiles():
+    """
+    Runs a series of tests for profiling stages that overlap, nested or in threads running at once
+    :return: (bool) were all tests successful
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        recorder = StageRecorder(["all"], profile_dir=temp_dir)
+
+        # check that a stage nested in a profiled stage is timed but not profiled
+        with recorder.stage("outer"):
+            with recorder.stage("inner"):
+                sorted(range(1000), reverse=True)
+        inner, outer = recorder.records
+        assert inner["stage"] == "inner" and inner["profile"] is None
+        assert os.path.isfile(outer["profile"])
+
+        # check that of two stages running at once in threads, only the one that started first is profiled
+        first_started = threading.Event()
+        second_finished = threading.Event()
+
+        def first_stage():
+            with recorder.stage("first"):
+                first_started.set()
+                second_finished.wait(10)
+
+        def second_stage():
+            first_started.wait(10)
+            with recorder.stage("second"):
+                sorted(range(1000), reverse=True)
+            second_finished.set()
+
+        threads = [threading.Thread(target=first_stage), threading.Thread(target=second_stage)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        records = {record["stage"]: record for record in recorder.records}
+        assert records["second"]["profile"] is None
+        assert os.path.isfile(records["first"]["profile"])
+
+        # check that profiling works again once the overlapping stages are over
+        with recorder.stage("after"):
+            pass
+        assert os.path.isfile(recorder.records[-1]["profile"])
+
+    return True
+
+
+def main():
+    """
+    For testing purposes
+    """
+    print("test stage ... " + "PASS" if test_stage() else "FAIL")
+    print("test report ... " + "PASS" if test_report() else "FAIL")
+    print("test overlapping profiles ... " + "PASS" if test_overlapping_profiles() else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""
+Pytest suite for finalproject.py, a port of finalproject_tester.py in which every csv is parsed once per session
+"""
+import csv
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import SMALL_INCOME
+from energy_analysis import (average_period_kwh_data, community_month_profiles, heating_and_cooling_by_community,
+                             parse_month_kwh_data)
+from energy_memo import query_memo
+from energy_stream import stream_month_kwh_averages
+from finalproject import *
+
+
+@pytest.fixture(scope="session")
+def small_income(small_income_fname):
+    """
+    :return: (dict) the parsed hand-written socioeconomic csv
+    """
+    return parse_income_data(small_income_fname)
+
+
+@pytest.fixture(scope="session")
+def small_energy(small_energy_fname):
+    """
+    :return: (list) the parsed hand-written energy csv
+    """
+    return parse_energy_data(small_energy_fname)
+
+
+@pytest.fixture(scope="session")
+def small_apartments(small_energy_fname):
+    """
+    :return: (list) the multi-family efficiency values of the hand-written energy csv
+    """
+    return parse_energy_for_apartments(small_energy_fname)
+
+
+@pytest.fixture(scope="session")
+def synthetic_income(synthetic_income_fname):
+    """
+    :return: (dict) the parsed synthetic socioeconomic csv
+    """
+    return parse_income_data(synthetic_income_fname)
+
+
+@pytest.fixture(scope="session")
+def synthetic_energy(synthetic_energy_fname):
+    """
+    :return: (list) the parsed synthetic energy csv
+    """
+    return parse_energy_data(synthetic_energy_fname)
+
+
+def csv_month_means(fname):
+    """
+    Takes an energy csv and returns the mean KWH of a building in every month, read with the csv module rather than the
+    energy_columns parser that the analysis uses
+    :param fname: (str) name of a csv file containing KWH energy usage
+    :return: (dict) a dictionary of {int(month column index): int(mean KWH of the buildings with a value)}
+    """
+    with open(fname, newline="") as file_in:
+        lines = list(csv.reader(file_in))[1:]
+    month_means = {}
+    for month_index in range(4, 16):
+        month_values = [float(data_lst[month_index]) for data_lst in lines if data_lst and data_lst[month_index]]
+        month_means[month_index] = int(sum(month_values) / len(month_values))
+    return month_means
+
+
+@pytest.fixture(scope="session")
+def real_month_averages(real_energy_fname):
+    """
+    :return: (dict) the month averages of the real 2010 energy csv
+    """
+    return parse_month_kwh_data(real_energy_fname)
+
+
+def test_lazy_imports():
+    """
+    Runs a series of tests that importing finalproject doesn't import the plotting or statistics libraries
+    """
+    loaded = subprocess.run([sys.executable, "-c", "import sys, finalproject\n"
+                             "print(sorted({'matplotlib', 'scipy', 'pandas'} & set(sys.modules)))"],
+                            capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+    assert loaded.strip() == "[]"
+
+
+# *** QUESTION 1 *** #
+
+
+def test_average_month_kwh_data(synthetic_energy_fname):
+    """
+    Runs a series of tests for average_month_kwh_data
+    """
+    # check accuracy against the line-by-line scan
+    month_averages = stream_month_kwh_averages(synthetic_energy_fname)
+    assert average_month_kwh_data(synthetic_energy_fname, 4) == month_averages[4]
+    assert average_month_kwh_data(synthetic_energy_fname, 10) == month_averages[10]
+
+    # check type
+    assert type(average_month_kwh_data(synthetic_energy_fname, 4)) == int
+
+
+def test_small_month_averages(small_energy_fname):
+    """
+    Runs a series of tests for parse_month_kwh_data on the hand-written buildings
+    """
+    # the mean of the three buildings with KWH values, (100 + 57 + 31) / 3, leaving out the empty data values
+    assert parse_month_kwh_data(small_energy_fname)[4] == 62
+
+
+def test_parse_month_kwh_data(synthetic_energy_fname):
+    """
+    Runs a series of tests for parse_month_kwh_data
+    """
+    month_averages = parse_month_kwh_data(synthetic_energy_fname)
+
+    # check that every month column is averaged in the one pass
+    assert list(month_averages.keys()) == list(range(4, 16))
+    assert month_averages == stream_month_kwh_averages(synthetic_energy_fname)
+    assert month_averages == csv_month_means(synthetic_energy_fname)
+    assert type(month_averages[4]) == int
+
+
+def test_real_month_averages(real_month_averages):
+    """
+    Runs a series of tests for parse_month_kwh_data on the real 2010 csv
+    """
+    assert real_month_averages == csv_month_means(real_energy_fname)
+
+
+def test_average_season_kwh_data(synthetic_energy_fname):
+    """
+    Runs a series of tests for average_season_kwh_data
+    """
+    month_averages = parse_month_kwh_data(synthetic_energy_fname)
+    assert average_season_kwh_data(4, 5, 15, synthetic_energy_fname) == int(
+        (month_averages[4] + month_averages[5] + month_averages[15]) / 3)
+    assert type(average_season_kwh_data(9, 10, 11, synthetic_energy_fname)) == int
+
+
+def test_real_average_season_kwh_data(real_energy_fname):
+    """
+    Runs a series of tests for average_season_kwh_data on the real 2010 csv
+    """
+    month_means = csv_month_means(real_energy_fname)
+    assert average_season_kwh_data(4, 5, 15, real_energy_fname) == int((month_means[4] + month_means[5]
+                                                                         + month_means[15]) / 3)
+    assert average_season_kwh_data(9, 10, 11, real_energy_fname) == int((month_means[9] + month_means[10]
+                                                                          + month_means[11]) / 3)
+
+
+def test_average_period_kwh_data(synthetic_energy_fname):
+    """
+    Runs a series of tests for average_period_kwh_data
+    """
+    # check that the order of the months doesn't matter, and that a wrap-around season is a float mean
+    assert average_period_kwh_data([15, 4, 5], synthetic_energy_fname) == average_period_kwh_data(
+        [4, 5, 15], synthetic_energy_fname)
+    assert type(average_period_kwh_data([15, 4, 5], synthetic_energy_fname)) == float
+
+    # check that every community has a heating and a cooling mean
+    heating_and_cooling = heating_and_cooling_by_community(synthetic_energy_fname)
+    assert len(heating_and_cooling) > 0
+    assert all(len(means) == 2 for means in heating_and_cooling.values())
+
+
+def test_average_energy_list(synthetic_energy_fname):
+    """
+    Runs a series of tests for average_energy_list
+    """
+    energy_list = average_energy_list(synthetic_energy_fname)
+    assert type(energy_list) == list and len(energy_list) == 12
+    assert type(energy_list[0]) == int
+
+    # check that asking again answers from the memo without reading the file
+    hits = query_memo.stats()["hits"]
+    assert average_energy_list(synthetic_energy_fname) == energy_list
+    assert query_memo.stats()["hits"] > hits
+
+
+def test_community_month_profiles(synthetic_energy_fname):
+    """
+    Runs a series of tests for community_month_profiles
+    """
+    profiles = community_month_profiles(synthetic_energy_fname)
+    assert profiles["total"].shape == (len(profiles["names"]), 12)
+    assert profiles["names"] == sorted(profiles["names"])
+
+
+# *** QUESTION 2 *** #
+
+
+def test_parse_income_data(small_income, synthetic_income):
+    """
+    Runs a series of tests for parse_income_data
+    """
+    # check accuracy
+    assert small_income == SMALL_INCOME
+
+    # check the data type of the return values
+    assert type(synthetic_income) == dict
+    assert all(type(key) == str and type(value) == int for key, value in synthetic_income.items())
+
+
+def test_parse_energy_data(small_energy, synthetic_energy):
+    """
+    Runs a series of tests for parse_energy_data
+    """
+    # only creates data entries if all necessary data is present
+    assert small_energy == [("Ashburn", 732.7142857142857)]
+
+    # check the data type of the return values
+    assert type(synthetic_energy) == list
+    assert all(type(community) == str and type(kwh_per_person) == float
+               for community, kwh_per_person in synthetic_energy)
+
+
+def test_income_and_energy_correlate_data(small_income, small_energy, synthetic_income, synthetic_energy):
+    """
+    Runs a series of tests for income_and_energy_correlate_data
+    """
+    # check that the list doesn't make entries if community names don't match up
+    assert income_and_energy_correlate_data({"Rogers Park": 23939}, small_energy) == []
+
+    # check that the list only has entries for buildings with all their data
+    assert income_and_energy_correlate_data(small_income, small_energy) == [[23482, 732.7142857142857]]
+
+    # check the type of the items in the returned list
+    correlated = income_and_energy_correlate_data(synthetic_income, synthetic_energy)
+    assert len(correlated) == len(synthetic_energy)
+    assert type(correlated[0][0]) == int
+    assert type(correlated[0][1]) == float
+
+
+def test_spearman_income_and_energy():
+    """
+    Runs a series of tests for spearman_income_and_energy
+    """
+    assert spearman_income_and_energy([[1, 2], [3, 4], [5, 6]]).tolist() == [[1.0, 1.0], [1.0, 1.0]]
+    assert spearman_income_and_energy([[1, 6], [3, 4], [5, 2]]).tolist() == [[1.0, -1.0], [-1.0, 1.0]]
+
+
+# *** QUESTION 3 *** #
+
+
+def test_parse_energy_for_apartments(small_apartments):
+    """
+    Runs a series of tests for parse_energy_for_apartments
+    """
+    # check that it doesn't create a data entry if the data is 0 or nothing for the specified columns
+    assert small_apartments == [[10258 / 5000], [3.0]]
+
+    # check that it is a list of lists of floats
+    assert type(small_apartments) == list
+    assert type(small_apartments[0]) == list
+    assert type(small_apartments[0][0]) == float
+
+
+def test_parse_energy_for_apartments_helper():
+    """
+    Runs a series of tests for parse_energy_for_apartments_helper
+    """
+    # check that it doesn't add anything if the building sub-type is incorrect
+    assert parse_energy_for_apartments_helper([['Building', 5], ['Building 1', 6], ['Building 2', 9]]) == [[], []]
+
+    # check for accuracy
+    helper = parse_energy_for_apartments_helper([['Multi 7+', 5], ['Multi 7+', 6], ['Multi < 7', 9]])
+    assert helper == [[5, 6], [9]]
+    assert all(type(item) == list for item in helper)
+
+
+def test_energy_efficiency_medians():
+    """
+    Runs a series of tests for energy_efficiency_medians
+    """
+    medians = energy_efficiency_medians([[1, 2, 3, 4], [5, 6, 7, 8, 9]])
+
+    # check that the median can be calculated for even and odd length lists
+    assert medians == [2.5, 7]
+    assert type(medians) == list and len(medians) == 2
@@ -0,0 +1,53 @@
+"""
+Pytest suite for income_and_energy_usage.py, a port of income_and_energy_tester.py. The functions the script imports
+are those of energy_analysis, tested once in test_finalproject.py, so only the script itself is tested here
+"""
+import os
+import subprocess
+import sys
+
+import energy_analysis
+import income_and_energy_usage
+
+# the functions of question 2 and 3 that the script re-exports
+INCOME_AND_ENERGY_FUNCTIONS = ["parse_income_data", "parse_energy_data", "income_and_energy_correlate_data",
+                               "spearman_income_and_energy", "income_and_energy_correlation_lines",
+                               "print_income_and_energy_correlations", "plot_income_and_energy",
+                               "parse_energy_for_apartments", "parse_energy_for_apartments_helper",
+                               "energy_efficiency_medians", "plot_high_and_low_rise", "run_analysis"]
+
+
+def run_script(*arguments):
+    """
+    :param arguments: (str) the command line arguments of the script
+    :return: (str) what the script printed
+    """
+    return subprocess.run([sys.executable, "income_and_energy_usage.py"] + list(arguments), capture_output=True,
+                          text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+
+
+def test_reexported_functions():
+    """
+    Runs a series of tests that the script re-exports the functions of energy_analysis rather than copies of them
+    """
+    for name in INCOME_AND_ENERGY_FUNCTIONS:
+        assert getattr(income_and_energy_usage, name) is getattr(energy_analysis, name)
+    assert income_and_energy_usage.ENERGY_FNAME == energy_analysis.ENERGY_FNAME
+    assert income_and_energy_usage.INCOME_FNAME == energy_analysis.INCOME_FNAME
+
+
+def test_default_questions(synthetic_energy_fname, synthetic_income_fname, tmp_path):
+    """
+    Runs a series of tests that the script answers only questions 2 and 3 unless others are chosen
+    """
+    output = run_script("--energy", synthetic_energy_fname, "--income", synthetic_income_fname, "--output-dir",
+                        str(tmp_path))
+    assert "winter months" not in output
+    assert "have no matching community in the socioeconomic data" in output
+    assert "Median energy efficiencies" in output
+    assert sorted(os.listdir(tmp_path)) == ["visualization2.png", "visualization3.png"]
+
+    # check that --questions still chooses any of the questions
+    output = run_script("--energy", synthetic_energy_fname, "--questions", "1", "--output-dir", str(tmp_path / "1"))
+    assert output.startswith("The average KWH used in Chicago during the winter months")
+    assert os.listdir(tmp_path / "1") == ["visualization1.png"]
@@ -0,0 +1,250 @@
+"""
+    Drawing the visualizations of the analysis on explicit matplotlib Figures
+
+    Every visualization is drawn on a Figure object of its own rather than on the implicit global pyplot figure, so no
+    axes, labels or legends leak from one plot into the next. Figures are rendered by the Agg backend and written to
+    their png files from a thread pool without ever opening a window, which lets a batch run finish with no display.
+    With show=True the figures are made through pyplot instead and displayed once all of them are drawn. matplotlib is
+    only imported when the first figure is made, so that importing the analysis to run a parser doesn't pay for it.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+import numpy as np
+
+from quantile_sketch import as_sketch
+
+# the labels of the months on the x axis of the average energy plot
+MONTH_LABELS = ["Jan", "Feb", "Mar", "Apr", "May", "June", "Jul", "Aug", "Sept", "Oct", "Nov", "Dec"]
+
+# scatter plots of up to this many points draw every point
+RAW_POINT_LIMIT = 20000
+
+# scatter plots of up to this many points draw a stratified sample of RAW_POINT_LIMIT points, larger ones are binned
+SAMPLE_POINT_LIMIT = 200000
+
+# the number of income strata a scatter plot is sampled from, and the number of (x, y) bins of a binned plot
+SAMPLE_STRATA = 64
+BIN_COUNTS = (80, 60)
+
+
+def new_figure(show=False):
+    """
+    Returns a new empty figure
+    :param show: (bool) True to make the figure through pyplot so that it can be displayed in a window
+    :return: (matplotlib.figure.Figure) the figure
+    """
+    if show:
+        import matplotlib.pyplot as plt
+        return plt.figure()
+    from matplotlib.figure import Figure
+    return Figure()
+
+
+def draw_average_energy(figure, energy_list, format):
+    """
+    Draws the average energy of each month relative to the corresponding month of the year
+    :param figure: (matplotlib.figure.Figure) the figure to draw on
+    :param energy_list: (list) the average energy for each month, January through December
+    :param format: (str) specifies the color and format of the data
+    """
+    axes = figure.add_subplot()
+    axes.plot(MONTH_LABELS, energy_list, format)
+
+    axes.set_xlabel("Month")
+    axes.set_ylabel("Average Energy Usage (KWH)")
+    axes.set_title("Month of the Year v. Average Energy Usage in Chicago")
+    axes.legend(["Average Energy Usage"])
+
+
+def draw_average_energy_by_year(figure, years, month_matrix):
+    """
+    Draws the mean energy of a building in each month of several years, with a line of its own for every year
+    :param figure: (matplotlib.figure.Figure) the figure to draw on
+    :param years: (list) the year of every row of month_matrix
+    :param month_matrix: (array) the mean energy of a building in each month of each year, of shape (years, 12)
+    """
+    axes = figure.add_subplot()
+    for year, energy_list in zip(years, np.asarray(month_matrix).tolist()):
+        axes.plot(MONTH_LABELS, energy_list, ".-", label=str(year))
+
+    axes.set_xlabel("Month")
+    axes.set_ylabel("Mean Energy Usage of a Building (KWH)")
+    axes.set_title("Month of the Year v. Mean Energy Usage in Chicago by Year")
+    axes.legend()
+
+
+def scatter_mode(point_count):
+    """
+    Takes the number of points of a scatter plot and returns how they should be drawn
+    :param point_count: (int) the number of points
+    :return: (str) "raw" to draw every point, "sample" to draw a stratified sample of them, or "bins" to draw the
+    number of points in each bin of a 2-D histogram
+    """
+    if point_count <= RAW_POINT_LIMIT:
+        return "raw"
+    if point_count <= SAMPLE_POINT_LIMIT:
+        return "sample"
+    return "bins"
+
+
+def _bin_indices(values, bin_count):
+    """
+    Takes an array of values and returns the equal-width bin of each value and the edges of the bins
+    :param values: (array) float64 values
+    :param bin_count: (int) the number of bins between the smallest and largest value
+    :return: (tuple) an int64 array of the bin of each value, from 0 to bin_count - 1, and a float64 array of the
+    bin_count + 1 bin edges
+    """
+    low = float(values.min())
+    high = float(values.max())
+    if high == low:
+        high = low + 1.0
+    edges = np.linspace(low, high, bin_count + 1)
+    indices = ((values - low) * (bin_count / (high - low))).astype(np.int64)
+    return np.minimum(indices, bin_count - 1), edges
+
+
+def stratified_sample(x_values, y_values, sample_size, strata=SAMPLE_STRATA, seed=0):
+    """
+    Takes the points of a scatter plot and returns a random sample of them that keeps the share of points in each
+    x stratum, and at least one point of every stratum, so that sparse parts of the plot don't disappear
+    :param x_values: (array) float64 x value of each point
+    :param y_values: (array) float64 y value of each point
+    :param sample_size: (int) about how many points to keep
+    :param strata: (int) the number of equal-width x strata
+    :param seed: (int) seed of the random sample, for reproducible plots
+    :return: (tuple) float64 arrays of the x and y values of the sampled points
+    """
+    if len(x_values) <= sample_size:
+        return x_values, y_values
+    stratum_of_point = _bin_indices(x_values, strata)[0]
+
+    # each stratum keeps its share of the sample, rounded, and at least one point if it has any
+    stratum_sizes = np.bincount(stratum_of_point, minlength=strata)
+    quotas = np.maximum(np.rint(stratum_sizes * (sample_size / len(x_values))), stratum_sizes > 0).astype(np.int64)
+
+    # shuffle the points within each stratum, then keep the first quota points of every stratum
+    order = np.lexsort((np.random.default_rng(seed).random(len(x_values)), stratum_of_point))
+    sorted_strata = stratum_of_point[order]
+    stratum_starts = np.concatenate(([0], np.cumsum(stratum_sizes)[:-1]))
+    rank_in_stratum = np.arange(len(order)) - stratum_starts[sorted_strata]
+    kept = np.sort(order[rank_in_stratum < quotas[sorted_strata]])
+    return x_values[kept], y_values[kept]
+
+
+def bin_points(x_values, y_values, bin_counts=BIN_COUNTS):
+    """
+    Takes the points of a scatter plot and returns the number of points in each cell of an equal-width 2-D grid
+    :param x_values: (array) float64 x value of each point
+    :param y_values: (array) float64 y value of each point
+    :param bin_counts: (tuple) the number of x bins and of y bins
+    :return: (tuple) an int64 array of shape bin_counts of the number of points in each cell, and float64 arrays of
+    the x and y bin edges
+    """
+    x_bins, x_edges = _bin_indices(x_values, bin_counts[0])
+    y_bins, y_edges = _bin_indices(y_values, bin_counts[1])
+    counts = np.bincount(x_bins * bin_counts[1] + y_bins, minlength=bin_counts[0] * bin_counts[1])
+    return counts.reshape(bin_counts), x_edges, y_edges
+
+
+def draw_income_and_energy(figure, data, format, mode=None):
+    """
+    Draws average income on the x-axis and a building's annual energy consumption in kw/person on the y-axis. Large
+    data is drawn as a stratified sample or as a 2-D histogram, so the time to draw it stays about the same however
+    many buildings there are
+    :param figure: (matplotlib.figure.Figure) the figure to draw on
+    :param data: (list) a list where each entry is a list of [avg annual income of a community, annual energy usage
+    (kw/person) of a residential building in that community], or an array of shape (n, 2)
+    :param format: (str) a matplotlib format string
+    :param mode: (str) "raw", "sample" or "bins", see scatter_mode, or None to pick by the number of buildings
+    """
+    data_array = np.asarray(data, dtype=np.float64).reshape(-1, 2)
+    income_values = data_array[:, 0]
+    energy_values = data_array[:, 1]
+    if mode is None:
+        mode = scatter_mode(len(data_array))
+
+    axes = figure.add_subplot()
+    if mode == "raw" or len(data_array) == 0:
+        axes.plot(income_values, energy_values, format, label="Residential Household")
+    elif mode == "sample":
+        sample_income, sample_energy = stratified_sample(income_values, energy_values, RAW_POINT_LIMIT)
+        axes.plot(sample_income, sample_energy, format, label="Residential Household (sample of " + str(
+            len(sample_income)) + " of " + str(len(data_array)) + ")")
+    elif mode == "bins":
+        counts, income_edges, energy_edges = bin_points(income_values, energy_values)
+        mesh = axes.pcolormesh(income_edges, energy_edges, np.ma.masked_equal(counts.T, 0), cmap="Blues")
+        figure.colorbar(mesh, ax=axes, label="Residential Households")
+    else:
+        raise ValueError("unknown scatter mode " + str(mode))
+
+    axes.set_xlabel("Average Community Income ($)")
+    axes.set_ylabel("Personal Energy Usage (kw/person/year)")
+    axes.set_title("Average Community Income v. Personal Energy Usage in Chicago Communities")
+    if mode != "bins":
+        axes.legend()
+
+
+def draw_high_and_low_rise(figure, efficiency_values_list):
+    """
+    Draws box plots of the efficiency values of low and high-rise multifamily buildings, without outliers, from the
+    quartiles and whiskers of their quantile sketches
+    :param figure: (matplotlib.figure.Figure) the figure to draw on
+    :param efficiency_values_list: (list) a list of lists of efficiency values, or of their quantile sketches, for
+    high and low-rise multifamily buildings
+    """
+    sketch_7_plus = as_sketch(efficiency_values_list[0])
+    sketch_less_than_7 = as_sketch(efficiency_values_list[1])
+
+    axes = figure.add_subplot()
+    axes.bxp([sketch_less_than_7.box_stats("Low-Rise"), sketch_7_plus.box_stats("High-Rise")], showfliers=False,
+             patch_artist=True)
+
+    axes.set_xlabel("Building Type")
+    axes.set_ylabel("Energy Efficiency (KWH/sq feet)")
+    axes.set_title("Multi-Family Building Type v. Energy Efficiency in Chicago")
+
+
+def _render_figure(draw, arguments, fname, show, recorder=None):
+    """
+    Draws one visualization on a new figure and writes it to a png file
+    :param draw: (function) a function that takes a figure and the arguments and draws on the figure
+    :param arguments: (tuple) the arguments of draw after the figure
+    :param fname: (str) name of the png file to write, or None to not write one
+    :param show: (bool) True to make the figure through pyplot so that it can be displayed
+    :param recorder: (StageRecorder) the recorder that times the drawing as a stage, see stage_timing, or None
+    :return: (matplotlib.figure.Figure) the drawn figure
+    """
+    with recorder.stage("plot " + str(fname)) if recorder is not None else nullcontext():
+        figure = new_figure(show)
+        draw(figure, *arguments)
+        if fname is not None:
+            figure.savefig(fname)
+    return figure
+
+
+def render_figures(figure_jobs, show=False, workers=None, recorder=None):
+    """
+    Draws every visualization on a figure of its own and writes them to their png files, concurrently unless they
+    are to be shown
+    :param figure_jobs: (list) a list of (draw function, tuple of its arguments after the figure, png file name)
+    :param show: (bool) True to display the figures in windows after they are written, which blocks until they are
+    closed
+    :param workers: (int) the number of threads rendering figures, or None for one per figure
+    :param recorder: (StageRecorder) the recorder that times each figure as a stage, see stage_timing, or None
+    :return: (list) the drawn figures, in the order of figure_jobs
+    """
+    if show:
+        # pyplot and the window toolkits it drives are only used from the main thread
+        figures = [_render_figure(draw, arguments, fname, True, recorder) for draw, arguments, fname in figure_jobs]
+        import matplotlib.pyplot as plt
+        plt.show()
+        return figures
+
+    if not figure_jobs:
+        return []
+    with ThreadPoolExecutor(max_workers=workers or len(figure_jobs)) as executor:
+        futures = [executor.submit(_render_figure, draw, arguments, fname, False, recorder)
+                   for draw, arguments, fname in figure_jobs]
+        return [future.result() for future in futures]
@@ -0,0 +1,142 @@
+"""
+Tester code for visualizations.py
+"""
+import os
+import shutil
+import tempfile
+
+from visualizations import *
+
+
+def test_render_figures():
+    """
+    Runs a series of tests for render_figures
+    :return: (bool) were all tests successful
+    """
+    temp_dir = tempfile.mkdtemp()
+    try:
+        figure_jobs = [(draw_average_energy, (list(range(12)), "b."), os.path.join(temp_dir, "visualization1.png")),
+                       (draw_income_and_energy, ([[10000, 2.5], [20000, 3.5]], "b."),
+                        os.path.join(temp_dir, "visualization2.png")),
+                       (draw_high_and_low_rise, ([[1.0, 2.0, 3.0], [2.0, 3.0, 4.0]],),
+                        os.path.join(temp_dir, "visualization3.png"))]
+        figures = render_figures(figure_jobs)
+
+        # check that every plot was written to its own file
+        for draw, arguments, fname in figure_jobs:
+            assert os.path.getsize(fname) > 0
+
+        # check that every plot was drawn on a figure of its own, with nothing left over from the other plots
+        assert len(set(id(figure) for figure in figures)) == 3
+        assert [len(figure.axes) for figure in figures] == [1, 1, 1]
+        assert figures[0].axes[0].get_title() == "Month of the Year v. Average Energy Usage in Chicago"
+        assert [label.get_text() for label in figures[2].axes[0].get_xticklabels()] == ["Low-Rise", "High-Rise"]
+    finally:
+        shutil.rmtree(temp_dir)
+
+    # check that nothing is drawn without jobs
+    assert render_figures([]) == []
+
+    return True
+
+
+def test_scatter_mode():
+    """
+    Runs a series of tests for scatter_mode
+    :return: (bool) were all tests successful
+    """
+    assert scatter_mode(10) == "raw"
+    assert scatter_mode(RAW_POINT_LIMIT) == "raw"
+    assert scatter_mode(RAW_POINT_LIMIT + 1) == "sample"
+    assert scatter_mode(SAMPLE_POINT_LIMIT + 1) == "bins"
+
+    return True
+
+
+def test_stratified_sample():
+    """
+    Runs a series of tests for stratified_sample
+    :return: (bool) were all tests successful
+    """
+    x_values = np.arange(1000, dtype=np.float64)
+    x_values[-1] = 1000000.0
+    y_values = 2 * x_values
+
+    sample_x, sample_y = stratified_sample(x_values, y_values, 100, seed=1)
+
+    # check that about sample_size points are kept, still paired, and that the lone far point is kept
+    assert 90 <= len(sample_x) <= 110
+    assert (sample_y == 2 * sample_x).all()
+    assert 1000000.0 in sample_x.tolist()
+
+    # check that a sample is reproducible, and that small data is kept whole
+    assert stratified_sample(x_values, y_values, 100, seed=1)[0].tolist() == sample_x.tolist()
+    assert len(stratified_sample(x_values, y_values, 1000)[0]) == 1000
+
+    return True
+
+
+def test_bin_points():
+    """
+    Runs a series of tests for bin_points
+    :return: (bool) were all tests successful
+    """
+    counts, x_edges, y_edges = bin_points(np.array([0.0, 1.0, 1.0, 0.2]), np.array([0.0, 1.0, 1.0, 0.9]), (2, 2))
+    assert counts.tolist() == [[1, 1], [0, 2]]
+    assert x_edges.tolist() == [0.0, 0.5, 1.0]
+    assert y_edges.tolist() == [0.0, 0.5, 1.0]
+
+    # check that every point lands in a bin
+    counts = bin_points(np.random.default_rng(0).random(500), np.random.default_rng(1).random(500))[0]
+    assert counts.shape == BIN_COUNTS and counts.sum() == 500
+
+    return True
+
+
+def test_draw_income_and_energy():
+    """
+    Runs a series of tests for draw_income_and_energy
+    :return: (bool) were all tests successful
+    """
+    data = np.column_stack((np.arange(100, dtype=np.float64), np.arange(100, dtype=np.float64)))
+
+    # check that every mode draws the buildings, binned ones as a mesh with a color bar
+    for mode, line_count, collection_count in [("raw", 1, 0), ("sample", 1, 0), ("bins", 0, 1)]:
+        figure = new_figure()
+        draw_income_and_energy(figure, data, "b.", mode)
+        assert len(figure.axes[0].lines) == line_count
+        assert len(figure.axes[0].collections) == collection_count
+
+    return True
+
+
+def test_draw_average_energy_by_year():
+    """
+    Runs a series of tests for draw_average_energy_by_year
+    :return: (bool) were all tests successful
+    """
+    figure = new_figure()
+    draw_average_energy_by_year(figure, [2010, 2011, 2012], np.arange(36, dtype=np.float64).reshape(3, 12))
+
+    # check that every year is a line of its own, named in the legend
+    assert len(figure.axes[0].lines) == 3
+    assert [text.get_text() for text in figure.axes[0].get_legend().get_texts()] == ["2010", "2011", "2012"]
+    assert figure.axes[0].lines[1].get_ydata().tolist() == list(range(12, 24))
+
+    return True
+
+
+def main():
+    """
+    For testing purposes
+    """
+    print("test render_figures ... " + "PASS" if test_render_figures() else "FAIL")
+    print("test scatter_mode ... " + "PASS" if test_scatter_mode() else "FAIL")
+    print("test stratified_sample ... " + "PASS" if test_stratified_sample() else "FAIL")
+    print("test bin_points ... " + "PASS" if test_bin_points() else "FAIL")
+    print("test draw_income_and_energy ... " + "PASS" if test_draw_income_and_energy() else "FAIL")
+    print("test draw_average_energy_by_year ... " + "PASS" if test_draw_average_energy_by_year() else "FAIL")
+
+
+if __name__ == "__main__":
+    main()